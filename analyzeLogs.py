@@ -0,0 +1,59 @@
+"""
+analyzeLogs.py - Regresi sin(theta) vs theta'' + estimasi L_rod untuk semua log
+
+Semua file di logs/ (csv, bin, segmen terkompres) dianalisis paralel di
+process pool (lib_analysis). Output: tabel a, b, L_rod per sesi, opsional
+CSV per sliding window.
+
+Usage:
+    python analyzeLogs.py [logs_dir] [window_s] [step_s] [windows_out.csv]
+"""
+
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from lib_analysis import analyze_file
+from lib_index import LogIndex
+
+
+def _fmt_l(value):
+    return "     n/a" if value is None else f"{value:8.3f}"
+
+
+def main():
+    log_dir = sys.argv[1] if len(sys.argv) > 1 else "logs"
+    window_s = float(sys.argv[2]) if len(sys.argv) > 2 else 10.0
+    step_s = float(sys.argv[3]) if len(sys.argv) > 3 else 5.0
+    windows_out = sys.argv[4] if len(sys.argv) > 4 else None
+
+    t0 = time.perf_counter()
+    index = LogIndex(log_dir)
+    index.update()
+    paths = [os.path.join(log_dir, name) for name, entry in sorted(index.files.items()) if entry["rows"]]
+
+    with ProcessPoolExecutor() as pool:
+        results = list(pool.map(analyze_file, paths, [window_s] * len(paths), [step_s] * len(paths)))
+
+    print(f"{'file':40s} {'rows':>7s} {'a':>10s} {'b':>9s} {'L_rod':>8s} {'win':>4s}")
+    for res in results:
+        s = res["session"]
+        print(f"{os.path.basename(res['file']):40s} {res['rows']:7d} {s['a']:10.4f} {s['b']:9.4f} "
+              f"{_fmt_l(s['L_rod'])} {len(res['windows']):4d}")
+
+    if windows_out:
+        with open(windows_out, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["file", "t0", "t1", "n", "a", "b", "L_rod"])
+            for res in results:
+                name = os.path.basename(res["file"])
+                for w in res["windows"]:
+                    writer.writerow([name, w["t0"], w["t1"], w["n"], w["a"], w["b"], w["L_rod"]])
+
+    print(f"{len(paths)} files in {time.perf_counter() - t0:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,548 @@
+"""
+benchCom.py - Benchmark parser frame serial STM32
+
+Log CSV di logs/ diubah jadi byte stream serial sintetis (frame 0xAA 0xCC),
+lalu dipotong per chunk 128 byte seperti ser.read(128).
+
+Dibandingkan:
+- legacy : loop lama read_control_status (3x find + del buffer[:n])
+- decoder: lib_com.FrameDecoder.feed (state machine + cursor)
+- batch  : lib_com.FrameDecoder.feed_batch (NumPy, CRC vektor)
+- runtime: lib_com.handle_chunk (feed untuk chunk kecil, feed_batch untuk
+           chunk >= BATCH_MIN_BYTES) sampai callback ControlStatus
+
+Mode latency: frame dikirim lewat serial loopback (loop://) dengan pacing
+sesuai baud, lalu diukur latency tiba -> callback dan tulis -> callback
+untuk read_mode "poll" dan "blocking".
+
+Mode replay: log diputar lewat lib_replay ke PendulumMonitor lengkap
+(history, logger, UDP, GUI dengan GraphView jalan), speed 0 = secepatnya
+-> throughput pipeline RX -> GUI.
+
+Usage:
+    python benchCom.py [logs_dir] [chunk_size]
+    python benchCom.py latency [baud] [rate_hz] [n_frames]
+    python benchCom.py replay [log_file] [speed]
+    python benchCom.py sim [rate_hz] [seconds] [crc_error_rate] [noise_rate]
+    python benchCom.py rigs [n_rigs] [rate_hz] [seconds]
+    python benchCom.py udprx [rate_hz] [batch] [seconds]
+
+Mode sim: lib_sim.STM32Sim (board virtual, port in-process) ->
+PendulumMonitor lengkap; diukur frames/s, CRC reject, latency
+tulis board -> callback, dan ACK gains/reset.
+
+Mode rigs: lib_cartpole.CartPoleBank (N rig cart-pole, DEFAULT_GAINS) ->
+throughput fisika (rig-step/s, setara sample/s pada 1 kHz), lalu rig 0
+dijalankan lewat STM32Sim -> PendulumMonitor; gains baru dari
+apply_gains dan reset dicek sampai ke model.
+
+Mode udprx: proses terpisah mengirim datagram lib_wire (batch sample per
+datagram) ke loopback dengan rate sample tertentu; diterima oleh loop
+lama (recvfrom + parse + CSV per paket) dan lib_udprx.BatchReceiver +
+RecordSink. Dicetak sample/s, loss dari seq dan CPU receiver.
+"""
+
+import csv
+import glob
+import multiprocessing
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+
+import numpy as np
+import serial
+
+from lib_com import (FrameDecoder, FRAME_STATUS, STATUS_FRAME_LEN, STATUS_STRUCT,
+                     LatencyStats, handle_chunk, make_status_packet, read_control_status)
+
+
+def load_log_rows(path):
+    """Baca CSV log → list of (logtick, [8 values])."""
+    rows = []
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        next(reader, None)  # header
+        for row in reader:
+            if not row:
+                continue
+            try:
+                logtick = int(float(row[0]))
+                values = [float(v) for v in row[1:9]]
+            except ValueError:
+                continue
+            rows.append((logtick, values))
+    return rows
+
+
+def build_stream(log_dir="logs"):
+    """Gabung semua log jadi satu byte stream serial."""
+    parts = []
+    for path in sorted(glob.glob(os.path.join(log_dir, "*.csv"))):
+        for logtick, values in load_log_rows(path):
+            parts.append(make_status_packet(logtick, values))
+    return b"".join(parts), len(parts)
+
+
+def split_chunks(stream, chunk_size=128):
+    return [stream[i:i + chunk_size] for i in range(0, len(stream), chunk_size)]
+
+
+def legacy_parse(chunks):
+    """Salinan loop parser lama (hanya bagian control status + header lain)."""
+    HEADER_STATUS = b'\xAA\xCC'
+    HEADER_ACK = b'\xAA\xDD'
+    HEADER_RESET = b'\xAA\xEE'
+    status_total_len = 4 + 68 + 2
+    fmt_status = "<Idddddddd"
+
+    buffer = bytearray()
+    count = 0
+    for chunk in chunks:
+        buffer.extend(chunk)
+        while len(buffer) >= 4:
+            idx_status = buffer.find(HEADER_STATUS)
+            idx_ack = buffer.find(HEADER_ACK)
+            idx_reset = buffer.find(HEADER_RESET)
+            first_idx = min([i for i in [idx_status, idx_ack, idx_reset] if i >= 0], default=-1)
+            if first_idx < 0:
+                buffer.clear()
+                break
+            if first_idx == idx_status:
+                if idx_status > 0:
+                    del buffer[:idx_status]
+                if len(buffer) < status_total_len:
+                    break
+                pkt = buffer[:status_total_len]
+                del buffer[:status_total_len]
+                crc_recv = pkt[-2] | (pkt[-1] << 8)
+                crc_calc = sum(pkt[4:-2]) & 0xFFFF
+                if crc_recv != crc_calc:
+                    continue
+                struct.unpack(fmt_status, pkt[4:-2])
+                count += 1
+            else:
+                # stream benchmark hanya berisi status frame
+                del buffer[:first_idx + 2]
+    return count
+
+
+def decoder_parse(chunks):
+    decoder = FrameDecoder()
+    count = 0
+    for chunk in chunks:
+        for typ, data in decoder.feed(chunk):
+            if typ == FRAME_STATUS:
+                STATUS_STRUCT.unpack(data)
+                count += 1
+    return count
+
+
+def batch_parse(chunks):
+    decoder = FrameDecoder()
+    count = 0
+    for chunk in chunks:
+        status, _ = decoder.feed_batch(chunk)
+        count += len(status.tolist())
+    return count
+
+
+def runtime_parse(chunks):
+    # jalur runtime (read_control_status / lib_aio): feed atau feed_batch tergantung ukuran chunk
+    decoder = FrameDecoder()
+    count = [0]
+
+    def on_sample(sample):
+        count[0] += 1
+
+    for chunk in chunks:
+        handle_chunk(decoder, chunk, 0.0, callback=on_sample)
+    return count[0]
+
+
+def run(name, fn, chunks, expected, repeat=3):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        count = fn(chunks)
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    ok = "OK" if count == expected else f"MISMATCH ({count}/{expected})"
+    print(f"{name:10s}: {expected / best:12,.0f} frames/s  ({best * 1000:8.1f} ms)  {ok}")
+    return expected / best
+
+
+def latency_run(read_mode, baud, rate_hz, n_frames):
+    """
+    Writer thread mengirim frame dengan timestamp kirim di field terakhir,
+    reader thread = read_control_status asli.
+    """
+    timeout = 0.0 if read_mode == "poll" else 0.05
+    ser = serial.serial_for_url("loop://", baudrate=baud, timeout=timeout)
+    latency = LatencyStats(size=n_frames)
+    e2e = []
+    done = threading.Event()
+
+    def on_sample(sample):
+        e2e.append(time.perf_counter() - sample.mode)
+        if len(e2e) >= n_frames:
+            done.set()
+
+    rx = threading.Thread(
+        target=read_control_status,
+        args=(ser,),
+        kwargs={"callback": on_sample, "read_mode": read_mode, "latency": latency},
+        daemon=True,
+    )
+    rx.start()
+
+    byte_time = 10.0 / baud           # 8N1
+    frame_time = STATUS_FRAME_LEN * byte_time
+    period = max(1.0 / rate_hz, frame_time)
+    t_next = time.perf_counter()
+    for i in range(n_frames):
+        t_next += period
+        dt = t_next - time.perf_counter()
+        if dt > 0:
+            time.sleep(dt)   # jangan busy-wait: GIL harus bebas untuk reader
+        ser.write(make_status_packet(i, [0.0] * 7 + [time.perf_counter()]))
+    done.wait(5.0)
+
+    lat = latency.summary()
+    e2e_ms = np.asarray(e2e) * 1000.0
+    p50, p99 = np.percentile(e2e_ms, [50, 99]) if len(e2e_ms) else (0.0, 0.0)
+    print(f"{read_mode:9s}: frames={len(e2e):5d}  "
+          f"arrival->callback p50={lat['p50_ms']:.3f} p99={lat['p99_ms']:.3f} ms  |  "
+          f"write->callback p50={p50:.3f} p99={p99:.3f} ms")
+
+
+def latency_main(argv):
+    baud = int(argv[0]) if len(argv) > 0 else 115200
+    rate_hz = float(argv[1]) if len(argv) > 1 else 500.0
+    n_frames = int(argv[2]) if len(argv) > 2 else 2000
+    print(f"Latency: baud={baud} rate={rate_hz:.0f} Hz frames={n_frames} (loop://)")
+    for mode in ("poll", "blocking"):
+        latency_run(mode, baud, rate_hz, n_frames)
+
+
+def replay_main(argv):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    import main as monitor
+    from lib_replay import LogReplay
+
+    if argv:
+        path = argv[0]
+    else:
+        path = max(glob.glob(os.path.join("logs", "*.csv")), key=os.path.getsize)
+    speed = float(argv[1]) if len(argv) > 1 else 0.0
+    replay = LogReplay(path, speed=speed)
+    app = monitor.PendulumMonitor(replay=replay)
+    gv = app.gui.graph_view
+    gv.handle_event(pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=gv.btn_start.rect.center),
+                    app.history)
+
+    t0 = time.perf_counter()
+    app.setup_replay()
+    frames = 0
+    while not replay.done.is_set():
+        pygame.event.pump()
+        ctx = {"is_running": False, "gains_sent": False, "gains_ack": False, "reset_ack": False,
+               "cmX": 0.0, "theta": 0.0, "mode": app.mode, "log_stats": app.data_logger.stats()}
+        app.gui.draw(ctx, app.history)
+        frames += 1
+    dt = time.perf_counter() - t0
+
+    lat = app.rx_latency.summary()
+    print(f"{os.path.basename(path)}: {replay.sent} samples in {dt:.2f} s -> {replay.sent / dt:,.0f} samples/s, "
+          f"GUI {frames / dt:.1f} fps (graph draw avg {gv.draw_ms_avg:.2f} ms)")
+    print(f"batch->callback p50={lat['p50_ms']:.3f} p99={lat['p99_ms']:.3f} ms")
+    pygame.quit()
+
+
+def sim_main(argv):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    import main as monitor
+    from lib_sim import STM32Sim, port_pair
+
+    rate_hz = float(argv[0]) if len(argv) > 0 else 1000.0
+    seconds = float(argv[1]) if len(argv) > 1 else 5.0
+    crc_rate = float(argv[2]) if len(argv) > 2 else 0.01
+    noise_rate = float(argv[3]) if len(argv) > 3 else 0.01
+
+    host, dev = port_pair(timeout=monitor.READ_TIMEOUT)
+    sim = STM32Sim(dev, rate_hz=rate_hz, crc_error_rate=crc_rate, noise_rate=noise_rate, seed=1)
+    app = monitor.PendulumMonitor(ser=host)
+    gv = app.gui.graph_view
+    gv.handle_event(pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=gv.btn_start.rect.center),
+                    app.history)
+
+    # latency tulis board -> selesai callback pipeline (history, logger, UDP)
+    e2e = np.zeros(int(rate_hz * seconds * 2) + 1024)
+    received = [0]
+    on_status = app.on_control_status
+
+    def measured(sample):
+        on_status(sample)
+        i = received[0]
+        if i < len(e2e):
+            e2e[i] = time.perf_counter() - sim.sent_time(sample.logtick)
+        received[0] = i + 1
+
+    app.on_control_status = measured
+    app.setup_serial()
+    sim.start()
+
+    t0 = time.perf_counter()
+    frames = 0
+    sent_cmds = False
+    while time.perf_counter() - t0 < seconds:
+        pygame.event.pump()
+        if not sent_cmds and time.perf_counter() - t0 > seconds / 2:
+            app.apply_gains()
+            app.reset_system()
+            sent_cmds = True
+        with monitor.state_lock:
+            ctx = {"is_running": monitor.pendulum_state["running"], "gains_sent": app.gains_sent,
+                   "gains_ack": monitor.pendulum_state["gains_ack"],
+                   "reset_ack": monitor.pendulum_state["reset_ack"],
+                   "cmX": monitor.pendulum_state["cmX"], "theta": monitor.pendulum_state["theta"],
+                   "mode": app.mode, "log_stats": app.data_logger.stats()}
+        app.gui.draw(ctx, app.history)
+        app.clock.tick(monitor.FPS)
+        frames += 1
+    sim.stop()
+    time.sleep(0.1)
+    dt = time.perf_counter() - t0
+
+    st = sim.stats()
+    dec = app.rx_decoder
+    n = min(received[0], len(e2e))
+    p50, p99, pmax = np.percentile(e2e[:n] * 1000.0, [50, 99, 100]) if n else (0.0, 0.0, 0.0)
+    print(f"rate={rate_hz:.0f} Hz  {dt:.1f} s  crc_error_rate={crc_rate}  noise_rate={noise_rate}")
+    print(f"frames: sent={st['frames_sent']} corrupted={st['frames_corrupted']} received={received[0]} "
+          f"-> {received[0] / dt:,.0f} frames/s")
+    print(f"decoder: crc_rejects={dec.crc_errors} ({dec.crc_errors / max(st['frames_sent'], 1):.2%}) "
+          f"skipped_bytes={dec.skipped_bytes} (noise injected {st['noise_bytes']})")
+    print(f"write->callback: p50={p50:.3f} p99={p99:.3f} max={pmax:.3f} ms   GUI {frames / dt:.1f} fps")
+    with monitor.state_lock:
+        print(f"ACK: gains={monitor.pendulum_state['gains_ack']} ({st['gains_acks']} sent by board) "
+              f"reset={monitor.pendulum_state['reset_ack']} ({st['reset_acks']})")
+    pygame.quit()
+
+
+def rigs_main(argv):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    import main as monitor
+    from lib_cartpole import MODE_BALANCING, MODE_WAITING, CartPoleBank, CartPoleSource
+    from lib_sim import STM32Sim, port_pair
+
+    n_rigs = int(argv[0]) if len(argv) > 0 else 256
+    rate_hz = float(argv[1]) if len(argv) > 1 else 1000.0
+    seconds = float(argv[2]) if len(argv) > 2 else 5.0
+
+    # 1) fisika saja
+    bank = CartPoleBank(n_rigs, gains=monitor.DEFAULT_GAINS, sensor_noise_deg=0.05, seed=1)
+    t0 = time.perf_counter()
+    bank.advance_to(seconds)
+    dt = time.perf_counter() - t0
+    steps = round(seconds / 0.001) * n_rigs
+    balancing = int((bank.mode == MODE_BALANCING).sum())
+    print(f"physics: {n_rigs} rigs x {seconds:.1f} s sim in {dt:.2f} s -> {steps / dt:,.0f} rig-steps/s "
+          f"({seconds / dt:.1f}x real time), balancing {balancing}/{n_rigs}, "
+          f"max |theta| {np.degrees(np.abs(bank.theta)).max():.3f} deg")
+
+    # 2) rig 0 lewat board virtual -> monitor
+    bank = CartPoleBank(n_rigs, gains=monitor.DEFAULT_GAINS, sensor_noise_deg=0.05, seed=2)
+    host, dev = port_pair(timeout=monitor.READ_TIMEOUT)
+    sim = STM32Sim(dev, rate_hz=rate_hz, source=CartPoleSource(bank, rig=0), seed=1)
+    app = monitor.PendulumMonitor(ser=host)
+    received = [0]
+    on_status = app.on_control_status
+
+    def counted(sample):
+        on_status(sample)
+        received[0] += 1
+
+    app.on_control_status = counted
+    app.setup_serial()
+    sim.start()
+
+    new_k_th = monitor.DEFAULT_GAINS["K_TH"] * 1.2
+    t0 = time.perf_counter()
+    frames = 0
+    phase = 0
+    while time.perf_counter() - t0 < seconds:
+        pygame.event.pump()
+        elapsed = time.perf_counter() - t0
+        if phase == 0 and elapsed > seconds / 3:
+            app.gui.inputs["K_TH"].value = f"{new_k_th:.1f}"
+            app.apply_gains()
+            phase = 1
+        elif phase == 1 and elapsed > 2 * seconds / 3:
+            balancing = int(bank.mode[0] == MODE_BALANCING)
+            app.reset_system()
+            phase = 2
+        with monitor.state_lock:
+            ctx = {"is_running": monitor.pendulum_state["running"], "gains_sent": app.gains_sent,
+                   "gains_ack": monitor.pendulum_state["gains_ack"],
+                   "reset_ack": monitor.pendulum_state["reset_ack"],
+                   "cmX": monitor.pendulum_state["cmX"], "theta": monitor.pendulum_state["theta"],
+                   "mode": app.mode, "log_stats": app.data_logger.stats()}
+        app.gui.draw(ctx, app.history)
+        app.clock.tick(monitor.FPS)
+        frames += 1
+    sim.stop()
+    time.sleep(0.1)
+    dt = time.perf_counter() - t0
+
+    with monitor.state_lock:
+        gains_ack = monitor.pendulum_state["gains_ack"]
+        reset_ack = monitor.pendulum_state["reset_ack"]
+    print(f"sim: rate={rate_hz:.0f} Hz received={received[0]} -> {received[0] / dt:,.0f} frames/s, "
+          f"GUI {frames / dt:.1f} fps")
+    print(f"gains: K_TH sent={new_k_th:.1f} model={bank.gains[0, 0]:.1f} ack={gains_ack}, "
+          f"rig 0 still balancing before reset: {bool(phase == 2 and balancing)}")
+    print(f"reset: model mode={int(bank.mode[0])} (expected {MODE_WAITING}) ack={reset_ack}")
+    pygame.quit()
+
+
+def _udp_blaster(port, rate_hz, batch, seconds):
+    """Proses pengirim mode udprx: burst tiap 1 ms supaya rate rata-rata = rate_hz sample/s."""
+    from lib_data import RECORD_DTYPE
+    from lib_wire import encode_datagram
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    records = np.zeros(batch, dtype=RECORD_DTYPE)
+    dst = ("127.0.0.1", port)
+    n_dgrams = int(rate_hz * seconds / batch)
+    t0 = time.perf_counter()
+    seq = 0
+    while seq < n_dgrams:
+        due = min(n_dgrams, int((time.perf_counter() - t0) * rate_hz / batch) + 1)
+        while seq < due:
+            records["logtick"] = np.arange(seq * batch, (seq + 1) * batch)
+            sock.sendto(encode_datagram(seq, records), dst)
+            seq += 1
+        time.sleep(0.001)
+    sock.close()
+
+
+def udprx_run(name, receive, port, rate_hz, batch, seconds):
+    """receive(sender_done) -> (samples, seq_lost); socket sudah di-bind sebelum sender jalan."""
+    sender = multiprocessing.Process(target=_udp_blaster, args=(port, rate_hz, batch, seconds))
+    c0 = time.process_time()
+    t0 = time.perf_counter()
+    sender.start()
+    samples, lost = receive(lambda: not sender.is_alive())
+    sender.join()
+    dt = time.perf_counter() - t0
+    cpu = time.process_time() - c0
+    expected = int(rate_hz * seconds / batch) * batch
+    print(f"{name:7s}: {samples:9d}/{expected} samples -> {samples / dt:10,.0f} samples/s, "
+          f"lost {expected - samples} (seq gap {lost}), receiver CPU {cpu / dt:.0%}")
+
+
+def udprx_main(argv):
+    import tempfile
+    from lib_udprx import BatchReceiver, RecordSink, open_socket, rcvbuf_size
+    from lib_wire import SeqTracker, decode_datagram, mask_fields
+
+    rate_hz = float(argv[0]) if len(argv) > 0 else 50000.0
+    batch = int(argv[1]) if len(argv) > 1 else 1
+    seconds = float(argv[2]) if len(argv) > 2 else 5.0
+    out_dir = tempfile.mkdtemp(prefix="udprx_")
+    print(f"UDP RX: rate={rate_hz:,.0f} samples/s batch={batch} ({rate_hz / batch:,.0f} datagram/s) "
+          f"{seconds:.1f} s, output {out_dir}")
+
+    legacy_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    legacy_sock.bind(("", 47300))
+    legacy_sock.settimeout(0.2)
+    batch_sock = open_socket(47301)
+    print(f"SO_RCVBUF: legacy {rcvbuf_size(legacy_sock) // 1024} KB, batch {rcvbuf_size(batch_sock) // 1024} KB")
+
+    def legacy(sender_done):
+        # loop trialUDPuser lama: satu recvfrom + parse + baris CSV (time.time()) per paket
+        sock = legacy_sock
+        seq_tracker = SeqTracker()
+        samples = 0
+        with open(os.path.join(out_dir, "legacy.csv"), "w", newline="") as f:
+            writer = csv.writer(f)
+            while True:
+                try:
+                    data, _ = sock.recvfrom(2048)
+                except socket.timeout:
+                    if sender_done():
+                        break
+                    continue
+                seq, mask, records = decode_datagram(data)
+                seq_tracker.update(seq)
+                names = mask_fields(mask)
+                for rec in records.tolist():
+                    sample = dict(zip(names, rec))
+                    writer.writerow([time.time()] + [sample.get(name, "") for name in names])
+                samples += len(records)
+        sock.close()
+        return samples, seq_tracker.lost
+
+    def batched(sender_done):
+        sock = batch_sock
+        rx = BatchReceiver(sock)
+        sink = RecordSink(out_dir, prefix="batch")
+        while True:
+            if rx.wait(0.2):
+                sink.write(rx.drain())
+            elif sender_done():
+                break
+        sink.close()
+        sock.close()
+        return rx.sample_count, rx.seq.lost
+
+    udprx_run("legacy", legacy, 47300, rate_hz, batch, seconds)
+    udprx_run("batch", batched, 47301, rate_hz, batch, seconds)
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] in ("-h", "--help"):
+        print(__doc__)
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == "udprx":
+        udprx_main(sys.argv[2:])
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == "rigs":
+        rigs_main(sys.argv[2:])
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == "sim":
+        sim_main(sys.argv[2:])
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == "latency":
+        latency_main(sys.argv[2:])
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == "replay":
+        replay_main(sys.argv[2:])
+        return
+
+    log_dir = sys.argv[1] if len(sys.argv) > 1 else "logs"
+    chunk_size = int(sys.argv[2]) if len(sys.argv) > 2 else 128
+
+    stream, n_frames = build_stream(log_dir)
+    if n_frames == 0:
+        print(f"Tidak ada frame dari log CSV di {log_dir!r}\n")
+        print(__doc__)
+        return
+    chunks = split_chunks(stream, chunk_size)
+    print(f"Stream: {n_frames} frames, {len(stream)} bytes, {len(chunks)} chunks of {chunk_size} B")
+
+    before = run("legacy", legacy_parse, chunks, n_frames)
+    after = run("decoder", decoder_parse, chunks, n_frames)
+    batch = run("batch", batch_parse, chunks, n_frames)
+    runtime = run("runtime", runtime_parse, chunks, n_frames)
+    print(f"speedup   : decoder {after / before:.2f}x, batch {batch / before:.2f}x, runtime {runtime / before:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
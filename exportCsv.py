@@ -0,0 +1,39 @@
+"""
+exportCsv.py - Export log biner (.bin) DataLogger ke CSV format lama
+
+Usage:
+    python exportCsv.py logs/log_20251210_151404.bin [out.csv]
+    python exportCsv.py logs            (semua .bin / .bin.gz|.lz4|.zst di folder)
+"""
+
+import glob
+import os
+import sys
+import time
+
+from lib_data import CODECS, export_csv, load_log
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return
+    src = sys.argv[1]
+    if os.path.isdir(src):
+        # segmen .bin + segmen terkompres; bukan *.tmp yang sedang ditulis rotasi
+        paths = sorted(p for ext in [".bin"] + [".bin" + c for c in CODECS]
+                       for p in glob.glob(os.path.join(src, "*" + ext)))
+        out = None
+    else:
+        paths = [src]
+        out = sys.argv[2] if len(sys.argv) > 2 else None
+
+    for path in paths:
+        t0 = time.perf_counter()
+        data = load_log(path)
+        out_path = export_csv(path, out, data=data)
+        print(f"{path} -> {out_path}  ({len(data)} rows, {time.perf_counter() - t0:.2f} s)")
+
+
+if __name__ == "__main__":
+    main()
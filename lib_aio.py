@@ -0,0 +1,204 @@
+"""
+lib_aio.py - Core asyncio: serial RX/TX, UDP dan logger dalam satu event loop
+
+Pengganti thread daemon di PendulumMonitor.setup_serial (RX, joystick TX,
+worker DataLogger):
+- serial RX: fd non-blocking + loop.add_reader (POSIX, port pyserial/pty),
+  atau read_available() di executor 1 thread (Windows COM, lib_sim.SimPort).
+  Decode + callback selalu jalan di thread event loop.
+- joystick TX: task 50 Hz, pygame dipakai dari thread yang sama dengan GUI.
+- UDP: socket UDPBroadcaster dibungkus DatagramTransport (sendto tidak
+  blocking), queue broadcaster dikirim oleh task udp_sender.
+- logger: DataLogger(threaded=False), batch + kompresi ditulis lewat executor.
+
+AsyncCore.close() membatalkan semua task, menunggu selesai, lalu menjalankan
+closer (port, socket) dengan urutan terbalik -> tidak perlu os._exit.
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from lib_com import handle_chunk, read_available
+from lib_replay import handle_records
+from lib_stick import joystick_packet
+
+
+class AsyncCore:
+    """
+    Pemilik task I/O di satu event loop.
+
+        core = AsyncCore()
+        core.spawn(serial_reader(ser, decoder, callback=...), "rx")
+        core.on_close(ser.close)
+        ...
+        await core.close()
+    """
+
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self._tasks = []
+        self._closers = []
+
+    def spawn(self, coro, name=None) -> asyncio.Task:
+        task = self.loop.create_task(coro, name=name)
+        self._tasks.append(task)
+        task.add_done_callback(self._task_done)
+        return task
+
+    def on_close(self, fn):
+        """fn() dipanggil saat close(), setelah semua task berhenti (LIFO)."""
+        self._closers.append(fn)
+
+    def _task_done(self, task):
+        if task in self._tasks:
+            self._tasks.remove(task)
+        if task.cancelled():
+            return
+        exc = task.exception()
+        # Ctrl+C / exit yang kebetulan jatuh di task = shutdown biasa, bukan error
+        if exc is not None and not isinstance(exc, (KeyboardInterrupt, SystemExit)):
+            print(f"[AIO] task {task.get_name()} error: {exc!r}")
+
+    async def close(self):
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        while self._closers:
+            try:
+                self._closers.pop()()
+            except Exception as e:
+                print(f"[AIO] close error: {e!r}")
+
+
+async def serial_reader(ser, decoder, callback=None, ack_callback=None, reset_ack_callback=None,
+                        debug: bool = False, latency=None):
+    """
+    Versi asyncio read_control_status (kontrak callback sama).
+    Berhenti kalau task dibatalkan; port tidak ditutup di sini.
+    """
+    loop = asyncio.get_running_loop()
+    perf_counter = time.perf_counter
+
+    if os.name == "posix" and hasattr(ser, "fileno"):
+        # fd non-blocking: callback dipanggil loop saat ada data
+        fd = ser.fileno()
+        old_timeout = ser.timeout
+        ser.timeout = 0
+        failed = loop.create_future()
+
+        def on_readable():
+            try:
+                chunk = ser.read(ser.in_waiting or 1)
+            except Exception as e:
+                if not failed.done():
+                    failed.set_exception(e)
+                return
+            if chunk:
+                handle_chunk(decoder, chunk, perf_counter(), callback, ack_callback, reset_ack_callback,
+                             debug, latency)
+
+        loop.add_reader(fd, on_readable)
+        try:
+            await failed
+        finally:
+            loop.remove_reader(fd)
+            ser.timeout = old_timeout
+        return
+
+    # tanpa fd: read blocking (timeout port) di 1 thread executor
+    if not ser.timeout:
+        ser.timeout = 0.05
+    pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="serial-rx")
+    try:
+        while True:
+            chunk = await loop.run_in_executor(pool, read_available, ser)
+            if chunk:
+                handle_chunk(decoder, chunk, perf_counter(), callback, ack_callback, reset_ack_callback,
+                             debug, latency)
+    finally:
+        # read yang sedang jalan selesai paling lama ser.timeout; ditunggu di
+        # thread lain supaya event loop tidak ikut tertahan
+        await loop.run_in_executor(None, pool.shutdown)
+
+
+async def replay_reader(replay, callback=None, debug: bool = False, latency=None):
+    """Versi asyncio lib_replay.replay_control_status."""
+    loop = asyncio.get_running_loop()
+    pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="replay")
+    try:
+        while True:
+            records = await loop.run_in_executor(pool, replay.next_batch)
+            if len(records) == 0:
+                break
+            handle_records(records, time.perf_counter(), callback, debug, latency)
+            replay.sent += len(records)
+        replay.done.set()
+    finally:
+        replay.stop()
+        await loop.run_in_executor(None, pool.shutdown)
+
+
+async def joystick_sender(js, ser, fps=50):
+    """Task pengirim joystick -> STM32. Event pygame di-pump oleh loop GUI."""
+    period = 1.0 / fps
+    loop = asyncio.get_running_loop()
+    next_t = loop.time()
+    seq = 0
+    while True:
+        ser.write(joystick_packet(js, seq))
+        seq = (seq + 1) & 0xFF
+        next_t += period
+        delay = next_t - loop.time()
+        if delay < 0:
+            next_t = loop.time()
+            delay = 0
+        await asyncio.sleep(delay)
+
+
+class _UDPProtocol(asyncio.DatagramProtocol):
+    def __init__(self, broadcaster):
+        self.broadcaster = broadcaster
+
+    def error_received(self, exc):
+        self.broadcaster.report_error(exc)
+
+
+async def attach_udp(broadcaster):
+    """Bungkus socket UDPBroadcaster dengan DatagramTransport."""
+    loop = asyncio.get_running_loop()
+    transport, _ = await loop.create_datagram_endpoint(lambda: _UDPProtocol(broadcaster), sock=broadcaster.sock)
+    broadcaster.attach_transport(transport)
+    return transport
+
+
+async def udp_sender(broadcaster):
+    """Pengganti thread sender UDPBroadcaster(threaded=False): pump() tiap max_delay."""
+    try:
+        while True:
+            await asyncio.sleep(broadcaster.max_delay)
+            broadcaster.pump()
+    finally:
+        broadcaster.pump()
+
+
+async def log_sink(logger, interval=0.1):
+    """
+    Penulis DataLogger(threaded=False): drain queue tiap interval dan
+    kompres segmen tertutup, dua-duanya di executor default (file I/O
+    tidak memblok loop). Saat dibatalkan: sisa queue ditulis, sesi ditutup.
+    """
+    loop = asyncio.get_running_loop()
+    compress_job = None
+    try:
+        while True:
+            await asyncio.sleep(interval)
+            await loop.run_in_executor(None, logger.drain)
+            if logger.has_compress_backlog() and (compress_job is None or compress_job.done()):
+                compress_job = loop.run_in_executor(None, logger.compress_pending)
+    finally:
+        if compress_job is not None:
+            await asyncio.wait([compress_job])
+        await loop.run_in_executor(None, logger.close)
@@ -0,0 +1,181 @@
+"""
+lib_analysis.py - Analisis offline log rekaman (tanpa pygame)
+
+Versi NumPy dari perhitungan panel REGRESI di GraphView:
+  x = sin(theta), y = theta'' (smoothing sama dengan _second_derivative),
+  fit y = a*x + b (sama dengan _linreg), L_rod = -3g / (2a).
+Bisa per sesi (satu file) atau per sliding window.
+"""
+
+import numpy as np
+
+from lib_com import TICK_SECONDS
+from lib_data import load_log
+
+
+G = 9.781               # sama dengan GraphView
+DD_LIMIT = 90.0         # |theta''| di atas ini dianggap spike (pakai nilai sebelumnya)
+_CHUNK = 512            # 2**512 masih aman di float64
+
+
+def to_seconds(t_raw):
+    """logtick (ms, lib_com.TICK_SECONDS) -> detik relatif ke sample pertama."""
+    t_raw = np.asarray(t_raw, dtype=np.float64)
+    if len(t_raw) == 0:
+        return t_raw
+    return (t_raw - t_raw[0]) * TICK_SECONDS
+
+
+def _smooth(raw, gain, carry):
+    # dd[i] = gain[i] * dd[i-1] + (1 - gain[i]) * raw[i], gain 0.5 (normal) / 1 (spike).
+    # Bentuk tertutup per chunk: dd[i] = 2^-c[i] * (carry + cumsum(raw/2 * 2^c)),
+    # c = jumlah sample normal s/d i.
+    out = np.empty(len(raw))
+    for s in range(0, len(raw), _CHUNK):
+        r = raw[s:s + _CHUNK]
+        normal = gain[s:s + _CHUNK] < 1.0
+        c = np.cumsum(normal)
+        w = np.exp2(c.astype(np.float64))
+        acc = carry + np.cumsum(np.where(normal, 0.5 * r, 0.0) * w)
+        out[s:s + _CHUNK] = acc / w
+        carry = out[s + len(r) - 1]
+    return out
+
+
+def second_derivative(y, t):
+    """
+    theta'' dengan smoothing persis _second_derivative (lib_gui_graph):
+    beda hingga non-uniform, spike |dd| > 90 ditahan, rata-rata dengan
+    sample sebelumnya, dt <= 0 -> 0 (dan smoothing mulai ulang).
+    """
+    y = np.asarray(y, dtype=np.float64)
+    t = np.asarray(t, dtype=np.float64)
+    n = min(len(y), len(t))
+    if n < 5:
+        return np.zeros(n)
+    y, t = y[:n], t[:n]
+    dt = np.diff(t)
+    dt1, dt2 = dt[:-1], dt[1:]
+    valid = (dt1 > 0) & (dt2 > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dy = np.diff(y) / dt
+        raw = (dy[1:] - dy[:-1]) / ((dt1 + dt2) * 0.5)
+    gain = np.where(np.abs(raw) > DD_LIMIT, 1.0, 0.5)
+
+    inner = np.zeros(n - 2)
+    # segmen antar dt tidak valid: smoothing mulai dari 0 lagi
+    bad = np.flatnonzero(~valid)
+    bounds = np.concatenate(([-1], bad, [n - 2]))
+    for a, b in zip(bounds[:-1] + 1, bounds[1:]):
+        if b > a:
+            inner[a:b] = _smooth(raw[a:b], gain[a:b], 0.0)
+
+    dd = np.empty(n)
+    dd[1:-1] = inner
+    dd[0] = dd[1]
+    dd[-1] = dd[-2]
+    return dd
+
+
+def linreg(x, y):
+    """y = a*x + b (least squares, sama dengan _linreg)."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n < 2:
+        return 0.0, 0.0
+    # jumlah terpusat: x konstan (bukan nol) tidak menyisakan slope palsu
+    mx, my = x.mean(), y.mean()
+    dx = x - mx
+    cxx = dx @ dx
+    if n * cxx < 1e-12 or cxx <= 1e-12 * (x @ x):
+        return 0.0, 0.0
+    a = (dx @ (y - my)) / cxx
+    return float(a), float(my - a * mx)
+
+
+def rod_length(a):
+    """L_rod = -3g/(2a) (batang seragam, pivot di ujung); None kalau a ~ 0."""
+    if abs(a) <= 1e-9:
+        return None
+    return -3.0 * G / (2.0 * a)
+
+
+def pendulum_xy(data):
+    """
+    Dari array RECORD_DTYPE -> (t detik, x = sin(theta), y = theta'').
+    theta dari degree0 (degree + 180, dibungkus ke (-180, 180]) seperti GraphView.
+    """
+    t = to_seconds(data["logtick"])
+    degree0 = np.asarray(data["degree"], dtype=np.float64) + 180.0
+    degree0 = np.where(degree0 > 180, degree0 - 360, degree0)
+    theta = np.radians(degree0)
+    return t, np.sin(theta), second_derivative(theta, t)
+
+
+def _trim(n):
+    # buang tepi seperti GraphView (i0 = max(2, n // 50))
+    return max(2, n // 50)
+
+
+def fit_session(data) -> dict:
+    """Satu fit untuk seluruh data."""
+    n = len(data)
+    row = {"n": n, "a": 0.0, "b": 0.0, "L_rod": None}
+    if n < 5:
+        return row
+    _, x, y = pendulum_xy(data)
+    i0 = _trim(n)
+    a, b = linreg(x[i0:n - i0], y[i0:n - i0])
+    row.update(n=n - 2 * i0, a=a, b=b, L_rod=rod_length(a))
+    return row
+
+
+def fit_windows(data, window_s=10.0, step_s=5.0) -> list:
+    """
+    Fit per sliding window (detik). Jumlah Sx, Sy, Sxx, Sxy lewat cumsum,
+    jadi tiap window O(1).
+    """
+    n = len(data)
+    if n < 5:
+        return []
+    t, x, y = pendulum_xy(data)
+    i0 = _trim(n)
+    t, x, y = t[i0:n - i0], x[i0:n - i0], y[i0:n - i0]
+    if len(t) < 2:
+        return []
+
+    def csum(v):
+        return np.concatenate(([0.0], np.cumsum(v)))
+
+    cx, cy, cxx, cxy = csum(x), csum(y), csum(x * x), csum(x * y)
+    starts_t = np.arange(t[0], max(t[-1] - window_s, t[0]) + 1e-9, step_s)
+    lo = np.searchsorted(t, starts_t, side="left")
+    hi = np.searchsorted(t, starts_t + window_s, side="left")
+    cnt = (hi - lo).astype(np.float64)
+    sx, sy = cx[hi] - cx[lo], cy[hi] - cy[lo]
+    sxx, sxy = cxx[hi] - cxx[lo], cxy[hi] - cxy[lo]
+    den = cnt * sxx - sx * sx
+    # den relatif terhadap cnt*sxx: sisa pembulatan cumsum pada x konstan != fit
+    ok = (cnt >= 2) & (den >= 1e-12) & (den > 1e-9 * cnt * sxx)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        a = np.where(ok, (cnt * sxy - sx * sy) / den, 0.0)
+        b = np.where(ok, (sy - a * sx) / np.maximum(cnt, 1), 0.0)
+
+    rows = []
+    for k in range(len(starts_t)):
+        ak = float(a[k])
+        rows.append({"t0": float(starts_t[k]), "t1": float(starts_t[k] + window_s), "n": int(cnt[k]),
+                     "a": ak, "b": float(b[k]), "L_rod": rod_length(ak) if ok[k] else None})
+    return rows
+
+
+def analyze_file(path, window_s=10.0, step_s=5.0) -> dict:
+    """Fit sesi + sliding window untuk satu file log (csv/bin/terkompres)."""
+    data = load_log(path)
+    return {
+        "file": path,
+        "rows": len(data),
+        "session": fit_session(data),
+        "windows": fit_windows(data, window_s, step_s) if window_s else [],
+    }
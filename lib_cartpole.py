@@ -0,0 +1,216 @@
+"""
+lib_cartpole.py - Simulasi fisik cart-pole (banyak rig sekaligus, NumPy)
+
+CartPoleBank mengintegrasikan N rig sekaligus (state array shape (N,)),
+dengan controller berstruktur sama dengan DEFAULT_GAINS di main.py:
+
+    e_x = x_center - x
+    u   = K_TH*theta + K_TH_D*theta_dot + K_X*e_x + K_X_D*x_dot + K_X_INT*int(e_x)
+    a   = -ACCEL_GAIN * u          (akselerasi cart, m/s^2, dibatasi A_MAX)
+
+theta dari posisi tegak (rad), x dalam meter. Pendulum = batang seragam
+dengan pivot di ujung: theta'' = 3g/(2L) sin(theta) - 3/(2L) a cos(theta).
+Konversi unit/sign firmware tidak diketahui; ACCEL_GAIN dan konvensi
+e_x di atas dipilih supaya DEFAULT_GAINS stabil di model ini.
+
+CartPoleSource menyambungkan satu rig ke lib_sim.STM32Sim (gains dari
+send_gains dan reset dari send_reset diteruskan ke model).
+"""
+
+import math
+import threading
+
+import numpy as np
+
+from lib_data import RECORD_DTYPE
+
+
+G = 9.781
+ROD_LENGTH = 0.39        # m (estimasi L_rod dari log)
+ACCEL_GAIN = 0.02        # m/s^2 per unit u
+A_MAX = 20.0             # m/s^2
+X_LIMIT = 0.40           # m, ujung rail (+-40 cm)
+DAMPING = 0.05           # 1/s, gesekan pivot
+FALL_RAD = math.radians(45.0)
+PHYS_DT = 0.001          # s, langkah integrasi (loop controller 1 kHz)
+
+MODE_WAITING = 1
+MODE_READY = 3
+MODE_FINISH = 5
+MODE_BALANCING = 7
+
+GAIN_KEYS = ("K_TH", "K_TH_D", "K_X", "K_X_D", "K_X_INT")
+
+
+class CartPoleBank:
+    """
+    N rig cart-pole, semua state berupa array (N,).
+
+        bank = CartPoleBank(64, gains=DEFAULT_GAINS, seed=1)
+        bank.advance_to(1.0)
+        rec = bank.records(logtick=1000)   # array RECORD_DTYPE (N,)
+
+    set_gains / reset / balance boleh dipanggil dari thread lain (RX
+    STM32Sim) selama bank di-advance: semuanya lewat _lock.
+    """
+
+    def __init__(self, n=1, gains=None, rod_length=ROD_LENGTH, x_center_cm=0.0, sensor_noise_deg=0.0,
+                 seed=None):
+        self.n = int(n)
+        self.rng = np.random.default_rng(seed)
+        self.rod_length = np.full(self.n, float(rod_length))
+        self.x_center = np.full(self.n, x_center_cm / 100.0)
+        self.sensor_noise = math.radians(sensor_noise_deg)
+        self._lock = threading.RLock()
+        self.gains = np.zeros((self.n, len(GAIN_KEYS)))
+        if gains is not None:
+            self.set_gains(gains)
+
+        self.t = 0.0
+        self.x = np.zeros(self.n)
+        self.x_dot = np.zeros(self.n)
+        self.theta = np.zeros(self.n)
+        self.theta_dot = np.zeros(self.n)
+        self.x_int = np.zeros(self.n)
+        self.u = np.zeros(self.n)
+        self.mode = np.full(self.n, MODE_BALANCING)
+        self.balance()
+
+    # ---------------- kontrol rig ----------------
+
+    def _rigs(self, rigs):
+        return slice(None) if rigs is None else np.atleast_1d(rigs)
+
+    def set_gains(self, gains, rigs=None):
+        """gains: dict DEFAULT_GAINS atau tuple 5 nilai (urutan GAIN_KEYS)."""
+        if isinstance(gains, dict):
+            gains = [gains[k] for k in GAIN_KEYS]
+        gains = np.asarray(gains, dtype=np.float64)
+        with self._lock:
+            self.gains[self._rigs(rigs)] = gains
+
+    def balance(self, rigs=None, angle_deg=3.0):
+        """Mulai balancing dari dekat tegak (seperti selesai swing-up)."""
+        r = self._rigs(rigs)
+        with self._lock:
+            k = len(self.theta[r])
+            self.theta[r] = np.radians(self.rng.uniform(-angle_deg, angle_deg, k))
+            self.theta_dot[r] = 0.0
+            self.x[r] = self.x_center[r]
+            self.x_dot[r] = 0.0
+            self.x_int[r] = 0.0
+            self.mode[r] = MODE_BALANCING
+
+    def reset(self, rigs=None):
+        """Seperti reset STM32: controller mati, pendulum tergantung, cart di tengah."""
+        r = self._rigs(rigs)
+        with self._lock:
+            self.theta[r] = math.pi
+            self.theta_dot[r] = 0.0
+            self.x[r] = self.x_center[r]
+            self.x_dot[r] = 0.0
+            self.x_int[r] = 0.0
+            self.u[r] = 0.0
+            self.mode[r] = MODE_WAITING
+
+    # ---------------- integrasi ----------------
+
+    def step(self, dt=PHYS_DT):
+        """Satu langkah semi-implicit Euler untuk semua rig."""
+        L = self.rod_length
+        active = self.mode == MODE_BALANCING
+        K = self.gains
+        e_x = self.x_center - self.x
+        self.x_int += np.where(active, e_x * dt, 0.0)
+        u = (K[:, 0] * self.theta + K[:, 1] * self.theta_dot + K[:, 2] * e_x
+             + K[:, 3] * self.x_dot + K[:, 4] * self.x_int)
+        self.u = np.where(active, u, 0.0)
+        a = np.clip(-ACCEL_GAIN * self.u, -A_MAX, A_MAX)
+        # controller mati -> cart direm
+        a = np.where(active, a, -self.x_dot / max(dt, 0.05))
+
+        theta_dd = (1.5 * G / L) * np.sin(self.theta) - (1.5 / L) * a * np.cos(self.theta) \
+            - DAMPING * self.theta_dot
+        self.x_dot += a * dt
+        self.x += self.x_dot * dt
+        self.theta_dot += theta_dd * dt
+        self.theta += self.theta_dot * dt
+        self.theta = (self.theta + math.pi) % (2 * math.pi) - math.pi
+
+        # rail: cart berhenti di ujung
+        hit = np.abs(self.x) > X_LIMIT
+        if hit.any():
+            self.x = np.clip(self.x, -X_LIMIT, X_LIMIT)
+            self.x_dot[hit] = 0.0
+        # jatuh -> FINISH (controller mati)
+        fell = active & (np.abs(self.theta) > FALL_RAD)
+        if fell.any():
+            self.mode[fell] = MODE_FINISH
+        self.t += dt
+
+    def advance_to(self, t, dt=PHYS_DT):
+        """Integrasi sampai waktu simulasi t (detik)."""
+        with self._lock:
+            steps = int((t - self.t) / dt)
+            for _ in range(steps):
+                self.step(dt)
+
+    # ---------------- output ----------------
+
+    def records(self, logtick=None) -> np.ndarray:
+        """State semua rig sebagai array RECORD_DTYPE (sama dengan log biner)."""
+        rec = np.zeros(self.n, dtype=RECORD_DTYPE)
+        theta = self.theta
+        if self.sensor_noise:
+            theta = theta + self.rng.normal(0.0, self.sensor_noise, self.n)
+        rec["logtick"] = int(round(self.t * 1000)) if logtick is None else logtick
+        rec["degree"] = np.degrees(theta)
+        rec["cmX"] = self.x * 100.0
+        rec["setspeed"] = self.x_dot * 100.0
+        rec["r1"] = self.u
+        rec["theta_dot"] = self.theta_dot
+        rec["theta"] = theta
+        rec["x_center"] = self.x_center * 100.0
+        rec["mode"] = self.mode
+        return rec
+
+    def values(self, rig=0) -> tuple:
+        """8 nilai setelah logtick untuk satu rig (format make_status_packet)."""
+        theta = float(self.theta[rig])
+        if self.sensor_noise:
+            theta += float(self.rng.normal(0.0, self.sensor_noise))
+        return (math.degrees(theta), float(self.x[rig]) * 100.0, float(self.x_dot[rig]) * 100.0,
+                float(self.u[rig]), float(self.theta_dot[rig]), theta,
+                float(self.x_center[rig]) * 100.0, float(self.mode[rig]))
+
+
+class CartPoleSource:
+    """
+    Sumber data untuk lib_sim.STM32Sim dari satu rig CartPoleBank.
+
+        bank = CartPoleBank(1, gains=DEFAULT_GAINS)
+        sim = STM32Sim(dev, rate_hz=1000, source=CartPoleSource(bank))
+
+    Beberapa STM32Sim boleh berbagi satu bank (rig berbeda); bank
+    di-advance sekali untuk semua rig.
+    """
+
+    def __init__(self, bank: CartPoleBank, rig=0):
+        self.bank = bank
+        self.rig = rig
+        self._sim = None
+
+    def attach(self, sim):
+        sim.on_gains = lambda gains: self.bank.set_gains(gains, self.rig)
+        sim.on_reset = lambda: self.bank.reset(self.rig)
+        self._sim = sim
+
+    def __call__(self, t, sim):
+        if self._sim is not sim:
+            self.attach(sim)
+        with self.bank._lock:
+            if t > self.bank.t:
+                self.bank.advance_to(t)
+            values = self.bank.values(self.rig)
+        sim.mode = int(values[-1])
+        return values
@@ -1,22 +1,363 @@
 import serial
 import struct
 import time
+import numpy as np
 from serial.tools import list_ports
 
 
+# ============================================================
+# FRAME STM32 -> PC
+# ============================================================
+FRAME_SYNC = 0xAA
+FRAME_STATUS = 0xCC      # control status
+FRAME_GAINS_ACK = 0xDD   # gains confirmation
+FRAME_RESET_ACK = 0xEE   # reset confirmation
 
-def open_serial(port: str, baud: int, timeout: float = 0.0):
-    """Buka port serial."""
-    return serial.Serial(port, baud, timeout=timeout)
+# type -> (byte tambahan setelah header, panjang payload)
+# CRC = sum(payload) & 0xFFFF, byte tambahan tidak ikut CRC.
+FRAME_SPECS = {
+    FRAME_STATUS: (2, 68),     # uint32 logtick + 8x double
+    FRAME_GAINS_ACK: (0, 20),  # 5x float
+    FRAME_RESET_ACK: (0, 1),   # 1 byte status
+}
+
+STATUS_FRAME_LEN = 2 + 2 + 68 + 2   # header + extra + payload + crc = 74
+TICK_SECONDS = 0.001  # logtick = HAL_GetTick() STM32, 1 tick = 1 ms (juga di lib_sim)
+BATCH_MIN_BYTES = 8 * STATUS_FRAME_LEN  # chunk lebih kecil -> FrameDecoder.feed (skalar), lihat handle_chunk
+
+# Struct precompiled (format string tidak diparse ulang tiap paket)
+STATUS_STRUCT = struct.Struct("<Idddddddd")     # uint32 + 8x double
+GAINS_ACK_STRUCT = struct.Struct("<fffff")      # 5x float
+CRC_STRUCT = struct.Struct("<H")
+JOY_BODY_STRUCT = struct.Struct("<BBhhhhH")
+GAINS_BODY_STRUCT = struct.Struct("<BBfffff")
+RESET_BODY_STRUCT = struct.Struct("<BB")
+
+STATUS_FIELDS = ("logtick", "degree", "cmX", "setspeed",
+                 "r1", "theta_dot", "theta", "x_center", "mode")
+
+# Record control status langsung di atas frame 74 byte (tanpa header/crc),
+# urutan field sama dengan tuple callback.
+STATUS_DTYPE = np.dtype({
+    "names": list(STATUS_FIELDS),
+    "formats": ["<u4"] + ["<f8"] * 8,
+    "offsets": [4] + [8 + 8 * i for i in range(8)],
+    "itemsize": STATUS_FRAME_LEN,
+})
+
+
+class ControlStatus:
+    """
+    Satu sample control status dari STM32.
+
+    Field di-decode sekali; payload mentah 68 byte (<Idddddddd) disimpan
+    di `raw` (memoryview, tanpa copy) supaya UDP / logger biner bisa
+    meneruskan bytes apa adanya tanpa struct.pack ulang.
+    Tetap bisa di-unpack seperti tuple 9 elemen lama.
+    """
+
+    __slots__ = STATUS_FIELDS + ("raw",)
+
+    def __init__(self, raw, logtick, degree, cmX, setspeed, r1, theta_dot, theta, x_center, mode):
+        self.raw = raw
+        self.logtick = logtick
+        self.degree = degree
+        self.cmX = cmX
+        self.setspeed = setspeed
+        self.r1 = r1
+        self.theta_dot = theta_dot
+        self.theta = theta
+        self.x_center = x_center
+        self.mode = mode
+
+    @classmethod
+    def from_payload(cls, raw):
+        """Dari payload 68 byte (setelah header, tanpa CRC)."""
+        return cls(raw, *STATUS_STRUCT.unpack(raw))
+
+    @classmethod
+    def from_batch(cls, status) -> list:
+        """Dari hasil FrameDecoder.feed_batch, raw = view ke frame asli."""
+        if len(status) == 0:
+            return []
+        mv = memoryview(status.view(np.uint8))
+        size = STATUS_FRAME_LEN
+        return [cls(mv[i * size + 4:i * size + 72], *values)
+                for i, values in enumerate(status.tolist())]
+
+    @classmethod
+    def from_records(cls, records) -> list:
+        """Dari array record 68 byte packed (lib_data.RECORD_DTYPE, log rekaman)."""
+        if len(records) == 0:
+            return []
+        size = STATUS_STRUCT.size
+        if records.dtype.itemsize != size:
+            raise ValueError(f"record harus {size} byte, bukan {records.dtype.itemsize}")
+        mv = memoryview(np.ascontiguousarray(records).view(np.uint8))
+        return [cls(mv[i * size:(i + 1) * size], *values)
+                for i, values in enumerate(records.tolist())]
+
+    def as_tuple(self) -> tuple:
+        return (self.logtick, self.degree, self.cmX, self.setspeed, self.r1,
+                self.theta_dot, self.theta, self.x_center, self.mode)
+
+    def __iter__(self):
+        return iter(self.as_tuple())
+
+    def __len__(self):
+        return len(STATUS_FIELDS)
+
+    def __repr__(self):
+        return (f"ControlStatus(tick={self.logtick}, deg={self.degree:.3f}, "
+                f"cmX={self.cmX:.3f}, mode={self.mode:g})")
+
+
+class FrameDecoder:
+    """
+    Parser frame STM32 berbasis state machine yang bisa dilanjutkan
+    antar chunk: SYNC -> TYPE -> LENGTH -> PAYLOAD -> CRC.
+
+    - Buffer dibaca pakai cursor, tidak di-del dari depan per frame
+      (compact sesekali saja).
+    - Header yang terpotong di antara dua read tetap disimpan.
+    - Kalau CRC salah, scan ulang mulai byte setelah sync, jadi frame
+      valid yang "tertutup" sampah tidak ikut hilang.
+    """
+
+    _SYNC, _TYPE, _LENGTH, _PAYLOAD, _CRC = range(5)
+
+    def __init__(self, specs=None, compact_at: int = 4096):
+        self.specs = dict(FRAME_SPECS if specs is None else specs)
+        self.compact_at = compact_at
+
+        self._buf = bytearray()
+        self._pos = 0       # cursor baca
+        self._start = 0     # posisi sync frame yang sedang diparse
+        self._state = self._SYNC
+        self._typ = 0
+        self._extra = 0
+        self._plen = 0
+
+        # Stats
+        self.frame_count = 0
+        self.crc_errors = 0
+        self.skipped_bytes = 0
+
+    def reset(self):
+        """Buang semua data yang belum lengkap."""
+        self._buf.clear()
+        self._pos = 0
+        self._start = 0
+        self._state = self._SYNC
+
+    def feed(self, data) -> list:
+        """
+        Masukkan bytes dari serial.
+
+        Returns:
+            list of (type, payload_bytes) untuk tiap frame yang CRC-nya valid
+        """
+        return self._run(data, None)
+
+    def feed_batch(self, data):
+        """
+        Seperti feed(), tapi semua control status dalam chunk di-decode
+        sekaligus. Deretan frame status yang rapat dicek (sync + CRC)
+        dan di-unpack secara vektor dengan NumPy.
+
+        Returns:
+            (status, others)
+            status: np.ndarray dtype STATUS_DTYPE (urut sesuai datang)
+            others: list of (type, payload_bytes) untuk ACK
+        """
+        pieces = []
+        others = self._run(data, pieces)
+        if not pieces:
+            return np.empty(0, dtype=STATUS_DTYPE), others
+        raw = pieces[0] if len(pieces) == 1 else b"".join(pieces)
+        return np.frombuffer(raw, dtype=STATUS_DTYPE), others
+
+    def _bulk_status(self, buf, pos, n):
+        """
+        Cek k frame status berurutan mulai pos sekaligus.
+        Return bytes dari frame-frame awal yang valid (bisa kosong).
+        """
+        k = (n - pos) // STATUS_FRAME_LEN
+        if k < 2:
+            return b""
+        block = bytes(buf[pos:pos + k * STATUS_FRAME_LEN])
+        raw = np.frombuffer(block, dtype=np.uint8).reshape(k, STATUS_FRAME_LEN)
+        crc_calc = raw[:, 4:72].sum(axis=1, dtype=np.uint32) & 0xFFFF
+        crc_recv = raw[:, 72].astype(np.uint32) | (raw[:, 73].astype(np.uint32) << 8)
+        good = (raw[:, 0] == FRAME_SYNC) & (raw[:, 1] == FRAME_STATUS) & (crc_calc == crc_recv)
+        if good.all():
+            m = k
+        else:
+            m = int(np.argmin(good))
+        return block[:m * STATUS_FRAME_LEN]
+
+    def _run(self, data, status_pieces):
+        buf = self._buf
+        buf += data
+        n = len(buf)
+        pos = self._pos
+        start = self._start
+        state = self._state
+        typ, extra, plen = self._typ, self._extra, self._plen
+        specs = self.specs
+        bulk = status_pieces is not None and specs.get(FRAME_STATUS) == FRAME_SPECS[FRAME_STATUS]
+        frames = []
+
+        while True:
+            if state == self._SYNC:
+                if bulk and n - pos >= 2 * STATUS_FRAME_LEN \
+                        and buf[pos] == FRAME_SYNC and buf[pos + 1] == FRAME_STATUS:
+                    block = self._bulk_status(buf, pos, n)
+                    if block:
+                        status_pieces.append(block)
+                        self.frame_count += len(block) // STATUS_FRAME_LEN
+                        pos += len(block)
+                        continue
+                idx = buf.find(FRAME_SYNC, pos)
+                if idx < 0:
+                    self.skipped_bytes += n - pos
+                    pos = n
+                    break
+                self.skipped_bytes += idx - pos
+                start = idx
+                pos = idx + 1
+                state = self._TYPE
+
+            if state == self._TYPE:
+                if pos >= n:
+                    break
+                typ = buf[pos]
+                spec = specs.get(typ)
+                if spec is None:
+                    # bukan header valid, cari sync lagi mulai byte ini
+                    self.skipped_bytes += 1
+                    state = self._SYNC
+                    continue
+                extra, plen = spec
+                pos += 1
+                state = self._LENGTH
+
+            if state == self._LENGTH:
+                if n - pos < extra:
+                    break
+                pos += extra
+                state = self._PAYLOAD
+
+            if state == self._PAYLOAD:
+                if n - pos < plen:
+                    break
+                pos += plen
+                state = self._CRC
+
+            if state == self._CRC:
+                if n - pos < 2:
+                    break
+                payload = bytes(buf[pos - plen:pos])
+                crc_recv = buf[pos] | (buf[pos + 1] << 8)
+                if crc_recv != (sum(payload) & 0xFFFF):
+                    self.crc_errors += 1
+                    self.skipped_bytes += 1
+                    pos = start + 1
+                    state = self._SYNC
+                    continue
+                pos += 2
+                state = self._SYNC
+                self.frame_count += 1
+                if bulk and typ == FRAME_STATUS:
+                    status_pieces.append(bytes(buf[start:pos]))
+                else:
+                    frames.append((typ, payload))
+
+        # compact: buang byte yang sudah pasti tidak dipakai lagi
+        keep_from = pos if state == self._SYNC else start
+        if keep_from >= n:
+            buf.clear()
+            pos = start = 0
+        elif keep_from >= self.compact_at:
+            del buf[:keep_from]
+            pos -= keep_from
+            start -= keep_from
+
+        self._pos = pos
+        self._start = start
+        self._state = state
+        self._typ, self._extra, self._plen = typ, extra, plen
+        return frames
+
+
+class LatencyStats:
+    """
+    Statistik latency per frame: waktu dari data tiba (ser.read selesai)
+    sampai callback dipanggil. Menyimpan `size` sampel terakhir untuk
+    persentil.
+    """
+
+    def __init__(self, size: int = 4096):
+        self._samples = np.zeros(size, dtype=np.float64)
+        self._size = size
+        self._idx = 0
+        self.count = 0
+        self.max = 0.0
+
+    def add(self, dt: float):
+        self._samples[self._idx] = dt
+        self._idx = (self._idx + 1) % self._size
+        self.count += 1
+        if dt > self.max:
+            self.max = dt
+
+    def summary(self) -> dict:
+        """Ringkasan dalam milidetik."""
+        n = min(self.count, self._size)
+        if n == 0:
+            return {"count": 0, "mean_ms": 0.0, "p50_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+        s = self._samples[:n] * 1000.0
+        p50, p99 = np.percentile(s, [50, 99])
+        return {
+            "count": self.count,
+            "mean_ms": float(s.mean()),
+            "p50_ms": float(p50),
+            "p99_ms": float(p99),
+            "max_ms": self.max * 1000.0,
+        }
+
+
+def open_serial(port: str, baud: int, timeout: float = 0.0, inter_byte_timeout=None):
+    """
+    Buka port serial.
+
+    timeout=0.0 -> non-blocking (mode "poll").
+    timeout>0   -> read() blocking sampai ada data (mode "blocking").
+    """
+    return serial.Serial(port, baud, timeout=timeout, inter_byte_timeout=inter_byte_timeout)
+
+
+def read_available(ser, max_read: int = 4096):
+    """
+    Baca blocking: tunggu minimal 1 byte (sampai ser.timeout), lalu ambil
+    sisa yang sudah ada di buffer OS sesuai ser.in_waiting.
+    """
+    first = ser.read(1)
+    if not first:
+        return first
+    n = ser.in_waiting
+    if n <= 0:
+        return first
+    return first + ser.read(min(n, max_read))
 
 
 def make_packet(seq, ax, ay, rx, ry, buttons):
     """Buat paket joystick → STM32."""
     header = b'\xAA\x55'
     typ = 0x01
-    body = struct.pack('<BBhhhhH', typ, seq, ax, ay, rx, ry, buttons)
+    body = JOY_BODY_STRUCT.pack(typ, seq, ax, ay, rx, ry, buttons)
     s = sum(body) % 65535
-    chksum = struct.pack('<H', s)
+    chksum = CRC_STRUCT.pack(s)
     return header + body + chksum
 
 
@@ -35,13 +376,12 @@ def make_gains_packet(seq, K_TH, K_TH_D, K_X, K_X_D, K_X_INT):
     typ = 0x02
     
     # Pack: type(1) + seq(1) + 5 floats(20)
-    body = struct.pack('<BBfffff', 
-                       typ, seq,
-                       K_TH, K_TH_D, K_X, K_X_D, K_X_INT)
+    body = GAINS_BODY_STRUCT.pack(typ, seq,
+                                  K_TH, K_TH_D, K_X, K_X_D, K_X_INT)
     
     # CRC = sum(body) % 65536
     s = sum(body) % 65536
-    chksum = struct.pack('<H', s)
+    chksum = CRC_STRUCT.pack(s)
     
     return header + body + chksum
 
@@ -69,11 +409,11 @@ def make_reset_packet(seq=0):
     typ = 0x03
     
     # Pack: type(1) + seq(1), no payload
-    body = struct.pack('<BB', typ, seq)
+    body = RESET_BODY_STRUCT.pack(typ, seq)
     
     # CRC = sum(body) % 65536
     s = sum(body) % 65536
-    chksum = struct.pack('<H', s)
+    chksum = CRC_STRUCT.pack(s)
     
     return header + body + chksum
 
@@ -89,7 +429,27 @@ def send_reset(ser, seq=0):
     print("[TX] Reset command sent to STM32")
 
 
-def read_control_status(ser, callback=None, ack_callback=None, reset_ack_callback=None, debug: bool = False):
+
+
+def make_status_packet(logtick, values):
+    """
+    Buat paket control status (sisi STM32) → untuk simulasi / benchmark.
+
+    Format:
+    - Header: 0xAA 0xCC
+    - 2 byte tambahan (tidak dicek receiver, diisi 0)
+    - Payload: uint32 logtick + 8x double (68 bytes)
+    - CRC: 2 bytes = sum(payload) & 0xFFFF
+    """
+    vals = list(values)[:8]
+    vals += [0.0] * (8 - len(vals))
+    body = STATUS_STRUCT.pack(int(logtick) & 0xFFFFFFFF, *vals)
+    chksum = CRC_STRUCT.pack(sum(body) & 0xFFFF)
+    return b'\xAA\xCC\x00\x00' + body + chksum
+
+
+def read_control_status(ser, callback=None, ack_callback=None, reset_ack_callback=None, debug: bool = False,
+                        read_mode: str = "poll", latency: LatencyStats = None, decoder: FrameDecoder = None):
     """
     Thread pembaca data dari STM32.
     
@@ -98,145 +458,99 @@ def read_control_status(ser, callback=None, ack_callback=None, reset_ack_callbac
     2. Gains ACK (0xAA 0xDD) - gains confirmation
     3. Reset ACK (0xAA 0xEE) - reset confirmation (NEW!)
     
-    Format control_status: <Idddddd>
-    uint32 logtick + 6x double (degree, cmX, setspeed, reserved[3])
+    Format control_status: <Idddddddd>
+    uint32 logtick + 8x double (degree, cmX, setspeed, reserved[5])
     
     Format gains_ack: 5x float (K_TH, K_TH_D, K_X, K_X_D, K_X_INT)
     
     Format reset_ack: 1 byte status
-    """
-    HEADER_STATUS = b'\xAA\xCC'
-    HEADER_ACK = b'\xAA\xDD'
-    HEADER_RESET = b'\xAA\xEE'
-    
-    status_total_len = 4 + 68 + 2  # header + payload + crc = 58
-    ack_total_len = 2 + 20 + 2     # header + payload + crc = 24
-    reset_total_len = 2 + 1 + 2    # header + payload + crc = 5
-    
-    fmt_status = "<Idddddddd"   # uint32 + 7x double
-    fmt_ack = "<fffff"        # 5x float
 
-    buffer = bytearray()
+    Parsing frame lewat handle_chunk: read kecil (< BATCH_MIN_BYTES) pakai
+    FrameDecoder.feed, read besar pakai feed_batch (semua control status
+    di-decode sekaligus dengan NumPy), lalu callback dipanggil per sample
+    dengan ControlStatus (bisa di-unpack
+    seperti tuple 9 elemen lama, plus payload mentah di .raw).
+
+    read_mode:
+    - "poll"     : read(128), sleep 10 ms kalau kosong (port timeout=0)
+    - "blocking" : tunggu data di read() (port timeout>0), ukuran read
+                   mengikuti ser.in_waiting -> tidak ada sleep tambahan
+    latency: LatencyStats opsional, diisi waktu tiba -> callback per frame.
+    decoder: FrameDecoder opsional (dari caller supaya stats frame_count /
+             crc_errors / skipped_bytes bisa dibaca dari luar).
+    """
+    if decoder is None:
+        decoder = FrameDecoder()
+    perf_counter = time.perf_counter
 
     while True:
-        chunk = ser.read(128)
-        if not chunk:
-            time.sleep(0.01)
-            continue
-        buffer.extend(chunk)
-        #print(f"[RX] Received {len(chunk)} bytes, buffer size: {len(buffer)} bytes")
-
-        # Process buffer
-        while len(buffer) >= 4:  # minimal header length
-            # Try all headers
-            idx_status = buffer.find(HEADER_STATUS)
-            idx_ack = buffer.find(HEADER_ACK)
-            idx_reset = buffer.find(HEADER_RESET)
-            
-            # Pilih header yang muncul duluan
-            first_idx = min([i for i in [idx_status, idx_ack, idx_reset] if i >= 0], default=-1)
-            
-            if first_idx < 0:
-                buffer.clear()
-                break
-            
-            # Process Control Status
-            if first_idx == idx_status:
-                if idx_status > 0:
-                    del buffer[:idx_status]
-                
-                if len(buffer) < status_total_len:
-                    break
-                
-                pkt = buffer[:status_total_len]
-                del buffer[:status_total_len]
-                
-                # Validate CRC
-                crc_recv = pkt[-2] | (pkt[-1] << 8)
-                crc_calc = sum(pkt[4:-2]) & 0xFFFF
-                if crc_recv != crc_calc:
-                    if debug:
-                        print("CRC mismatch (control_status)")
-                    continue
-                
-                # Parse data
-                data = pkt[4:-2]
-                
-                #print (pkt)
-                #print (len(data))
-                unpacked = struct.unpack(fmt_status, data)
-                logtick = unpacked[0]
-                degree, cmX, setspeed = unpacked[1:4]
-                r1, r2, r3, r4, r5 = unpacked[4:9] #?
-                #print (f"r5={r5}")
-                
-                if debug:
-                    print(f"[RX] tick={logtick:8d} deg={degree:8.3f} "
-                          f"cmX={cmX:8.3f} set={setspeed:8.3f}")
-                
-                if callback is not None:
-                    callback((logtick, degree, cmX, setspeed, r1, r2, r3, r4, r5))
-            
-            # Process Gains ACK
-            elif first_idx == idx_ack:
-                print("ACK detected")
-                if idx_ack > 0:
-                    del buffer[:idx_ack]
-                
-                if len(buffer) < ack_total_len:
-                    break
-                
-                pkt = buffer[:ack_total_len]
-                del buffer[:ack_total_len]
-                
-                # Validate CRC
-                crc_recv = pkt[-2] | (pkt[-1] << 8)
-                crc_calc = sum(pkt[2:-2]) & 0xFFFF
-                if crc_recv != crc_calc:
-                    if debug:
-                        print("CRC mismatch (gains_ack)")
-                    continue
-                
-                # Parse gains
-                data = pkt[2:-2]
-                gains = struct.unpack(fmt_ack, data)
-                K_TH, K_TH_D, K_X, K_X_D, K_X_INT = gains
-                
-                if debug:
-                    print(f"[RX] Gains ACK: K_TH={K_TH:.2f}, K_TH_D={K_TH_D:.4f}, "
-                          f"K_X={K_X:.2f}, K_X_D={K_X:.2f}, K_X_INT={K_X_INT:.2f}")
-                
-                if ack_callback is not None:
-                    ack_callback(gains)
-            
-            # Process Reset ACK (NEW!)
-            elif first_idx == idx_reset:
-                if idx_reset > 0:
-                    del buffer[:idx_reset]
-                
-                if len(buffer) < reset_total_len:
-                    break
-                
-                pkt = buffer[:reset_total_len]
-                del buffer[:reset_total_len]
-                
-                # Validate CRC
-                crc_recv = pkt[-2] | (pkt[-1] << 8)
-                crc_calc = sum(pkt[2:-2]) & 0xFFFF
-                if crc_recv != crc_calc:
-                    if debug:
-                        print("CRC mismatch (reset_ack)")
-                    continue
-                
-                # Parse status
-                status = pkt[2]
-                
-                print(f"[RX] *** RESET ACK RECEIVED *** status={status}")
-                
-                if reset_ack_callback is not None:
-                    reset_ack_callback(status)
-            
+        if read_mode == "blocking":
+            chunk = read_available(ser)
+            if not chunk:
+                continue
+        else:
+            chunk = ser.read(128)
+            if not chunk:
+                time.sleep(0.01)
+                continue
+        handle_chunk(decoder, chunk, perf_counter(), callback, ack_callback, reset_ack_callback, debug, latency)
+
+
+def handle_chunk(decoder, chunk, t_arrival, callback=None, ack_callback=None, reset_ack_callback=None,
+                 debug: bool = False, latency: LatencyStats = None):
+    """
+    Decode satu chunk hasil read lalu panggil callback (dipakai
+    read_control_status dan lib_aio.serial_reader).
+    t_arrival: perf_counter saat chunk selesai dibaca.
+    """
+    perf_counter = time.perf_counter
+    crc_errors = decoder.crc_errors
+    if len(chunk) < BATCH_MIN_BYTES:
+        # read serial biasa (1-2 frame): feed() skalar lebih murah dari NumPy
+        frames = decoder.feed(chunk)
+        from_payload = ControlStatus.from_payload
+        samples = [from_payload(data) for typ, data in frames if typ == FRAME_STATUS]
+        others = [f for f in frames if f[0] != FRAME_STATUS] if len(samples) != len(frames) else ()
+    else:
+        status, others = decoder.feed_batch(chunk)
+        samples = ControlStatus.from_batch(status)
+    if debug and decoder.crc_errors != crc_errors:
+        print(f"CRC mismatch ({decoder.crc_errors - crc_errors} frame)")
+
+    # Process Control Status
+    if samples:
+        if debug:
+            for s in samples:
+                print(f"[RX] tick={s.logtick:8d} deg={s.degree:8.3f} "
+                      f"cmX={s.cmX:8.3f} set={s.setspeed:8.3f}")
+        if callback is not None:
+            if latency is not None:
+                for sample in samples:
+                    latency.add(perf_counter() - t_arrival)
+                    callback(sample)
             else:
-                # No valid header found, clear garbage
-                buffer.clear()
-                break
\ No newline at end of file
+                for sample in samples:
+                    callback(sample)
+
+    for typ, data in others:
+        # Process Gains ACK
+        if typ == FRAME_GAINS_ACK:
+            print("ACK detected")
+            gains = GAINS_ACK_STRUCT.unpack(data)
+            K_TH, K_TH_D, K_X, K_X_D, K_X_INT = gains
+
+            if debug:
+                print(f"[RX] Gains ACK: K_TH={K_TH:.2f}, K_TH_D={K_TH_D:.4f}, "
+                      f"K_X={K_X:.2f}, K_X_D={K_X:.2f}, K_X_INT={K_X_INT:.2f}")
+
+            if ack_callback is not None:
+                ack_callback(gains)
+
+        # Process Reset ACK
+        elif typ == FRAME_RESET_ACK:
+            status_byte = data[0]
+
+            print(f"[RX] *** RESET ACK RECEIVED *** status={status_byte}")
+
+            if reset_ack_callback is not None:
+                reset_ack_callback(status_byte)
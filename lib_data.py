@@ -1,29 +1,332 @@
 import csv
+import gzip
+import io
+import json
 import os
+import queue
+import struct
 import time
 import threading
-import queue
+from collections import deque
+
+import numpy as np
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame
+except ImportError:
+    lz4 = None
+
+from lib_com import STATUS_FIELDS, STATUS_STRUCT
+
+
+# ============================================================
+# FORMAT BINER (.bin)
+# ============================================================
+# Header 64 byte, lalu record fixed-width = payload status frame apa adanya
+# (68 byte, "<Idddddddd"), jadi rekam = memcpy payload dan baca = memmap.
+# Jumlah record dihitung dari ukuran file (tidak ada count di header),
+# sehingga file yang terpotong (crash) tetap terbaca sampai record utuh terakhir.
+LOG_MAGIC = b"PMLOG\x00\x00\x01"
+LOG_VERSION = 1
+LOG_HEADER_SIZE = 64
+LOG_HEADER_STRUCT = struct.Struct("<8sHHHHd")  # magic, version, header, record, n_fields, created
+
+RECORD_DTYPE = np.dtype([("logtick", "<u4")] + [(name, "<f8") for name in STATUS_FIELDS[1:]])
+assert RECORD_DTYPE.itemsize == STATUS_STRUCT.size
+
+FLUSH_INTERVAL = 1.0  # detik, flush file berbasis waktu (bukan per N baris)
+QUEUE_POLICIES = ("block", "drop_oldest", "drop_newest")
+
+# header CSV lama (baris tetap berisi 9 nilai)
+CSV_HEADER = ["logtick", "degree", "cmX", "setspeed", "reserved1", "reserved2", "reserved3"]
+
+
+# ============================================================
+# KOMPRESI SEGMEN
+# ============================================================
+# ext -> (compress(bytes), decompress(bytes)); zstd/lz4 kalau terpasang
+CODECS = {".gz": (lambda data: gzip.compress(data, compresslevel=6), gzip.decompress)}
+if lz4 is not None:
+    CODECS[".lz4"] = (lz4.frame.compress, lz4.frame.decompress)
+if zstandard is not None:
+    CODECS[".zst"] = (lambda data: zstandard.ZstdCompressor(level=6).compress(data),
+                      lambda data: zstandard.ZstdDecompressor().decompress(data))
+
+
+def default_codec() -> str:
+    """Codec terbaik yang tersedia: .zst > .lz4 > .gz"""
+    for ext in (".zst", ".lz4", ".gz"):
+        if ext in CODECS:
+            return ext
+    return ".gz"
+
+
+def _split_codec(path):
+    """'x.bin.zst' -> ('x.bin', '.zst'); tanpa kompresi -> (path, None)"""
+    base, ext = os.path.splitext(path)
+    if ext in (".gz", ".lz4", ".zst"):
+        return base, ext
+    return path, None
+
+
+def make_log_header(created=None) -> bytes:
+    head = LOG_HEADER_STRUCT.pack(LOG_MAGIC, LOG_VERSION, LOG_HEADER_SIZE, RECORD_DTYPE.itemsize,
+                                  len(RECORD_DTYPE.names), time.time() if created is None else created)
+    return head.ljust(LOG_HEADER_SIZE, b"\x00")
+
+
+def _read_log_header(path, head=None):
+    if head is None:
+        with open(path, "rb") as f:
+            head = f.read(LOG_HEADER_STRUCT.size)
+    head = head[:LOG_HEADER_STRUCT.size]
+    if len(head) < LOG_HEADER_STRUCT.size:
+        raise ValueError(f"{path}: header terlalu pendek")
+    magic, version, header_size, record_size, _n_fields, created = LOG_HEADER_STRUCT.unpack(head)
+    if magic != LOG_MAGIC or record_size != RECORD_DTYPE.itemsize:
+        raise ValueError(f"{path}: bukan log biner PMLOG v{LOG_VERSION}")
+    return header_size, created
+
+
+def _load_csv(path, text=None) -> np.ndarray:
+    """CSV lama -> array RECORD_DTYPE (baris 7-9 nilai, kekurangan diisi 0)."""
+    rows = []
+    width = len(RECORD_DTYPE.names)
+    with (open(path, newline="") if text is None else io.StringIO(text, newline="")) as f:
+        reader = csv.reader(f)
+        next(reader, None)  # header
+        for row in reader:
+            if not row:
+                continue
+            try:
+                values = [float(v) for v in row[:width]]
+            except ValueError:
+                continue
+            values += [0.0] * (width - len(values))
+            values[0] = int(values[0])
+            rows.append(tuple(values))
+    return np.array(rows, dtype=RECORD_DTYPE)
+
+
+def load_log(path) -> np.ndarray:
+    """
+    Buka log rekaman sebagai array RECORD_DTYPE.
+    - .bin : numpy.memmap read-only (tanpa parsing, instan)
+    - .csv : diparse (format lama)
+    - segmen terkompres (.gz/.lz4/.zst): didekompres ke memori
+    """
+    base, codec = _split_codec(path)
+    if codec is not None:
+        if codec not in CODECS:
+            raise ValueError(f"{path}: codec {codec} tidak tersedia (modul belum terpasang)")
+        with open(path, "rb") as f:
+            data = CODECS[codec][1](f.read())
+        if base.endswith(".csv"):
+            return _load_csv(path, data.decode())
+        header_size, _ = _read_log_header(path, data)
+        n = (len(data) - header_size) // RECORD_DTYPE.itemsize
+        return np.frombuffer(data, dtype=RECORD_DTYPE, count=max(n, 0), offset=header_size)
+    if path.endswith(".csv"):
+        return _load_csv(path)
+    header_size, _ = _read_log_header(path)
+    n = (os.path.getsize(path) - header_size) // RECORD_DTYPE.itemsize
+    if n <= 0:
+        return np.empty(0, dtype=RECORD_DTYPE)
+    return np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=header_size, shape=(n,))
+
+
+def export_csv(path, out_path=None, data=None) -> str:
+    """
+    Export log .bin ke layout CSV lama (header 7 kolom, baris 9 nilai).
+    data: hasil load_log(path) kalau sudah dibaca (tidak dibaca ulang).
+    Return path file CSV.
+    """
+    if out_path is None:
+        out_path = os.path.splitext(_split_codec(path)[0])[0] + ".csv"
+    if data is None:
+        data = load_log(path)
+    with open(out_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADER)
+        chunk = 65536
+        for i in range(0, len(data), chunk):
+            writer.writerows(data[i:i + chunk].tolist())
+    return out_path
+
+
+def load_session(manifest_path, tick_range=None) -> np.ndarray:
+    """
+    Baca sesi rekaman dari manifest. Kalau tick_range=(t0, t1) diberikan,
+    hanya segmen yang overlap yang dibuka/didekompres, lalu difilter.
+    """
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    folder = os.path.dirname(manifest_path)
+    parts = []
+    for seg in manifest["segments"]:
+        if tick_range is not None and seg["rows"]:
+            if seg["tick_max"] < tick_range[0] or seg["tick_min"] > tick_range[1]:
+                continue
+        data = load_log(os.path.join(folder, seg["file"]))
+        if tick_range is not None:
+            tick = data["logtick"]
+            data = data[(tick >= tick_range[0]) & (tick <= tick_range[1])]
+        parts.append(data)
+    if not parts:
+        return np.empty(0, dtype=RECORD_DTYPE)
+    return np.concatenate(parts)
+
+
+def _sample_tick(sample):
+    tick = getattr(sample, "logtick", None)
+    return sample[0] if tick is None else tick
+
+
+class SampleQueue:
+    """
+    Antrian bounded thread RX -> writer.
+
+    - Satu producer (thread RX) dan satu consumer (worker).
+    - deque.append/popleft atomik (GIL) -> put() tanpa lock; worker
+      polling tiap poll_interval kalau kosong.
+    - Penuh: "block" tunggu ruang (RX ikut tertahan), "drop_oldest"
+      buang sample tertua, "drop_newest" buang sample baru.
+    - Counter enqueued/dropped hanya ditulis producer, written hanya
+      ditulis consumer (lihat DataLogger.stats()).
+    """
+
+    def __init__(self, maxsize=65536, policy="drop_oldest", poll_interval=0.01):
+        if policy not in QUEUE_POLICIES:
+            raise ValueError(f"policy harus salah satu {QUEUE_POLICIES}, bukan {policy!r}")
+        self.maxsize = int(maxsize)
+        self.policy = policy
+        self.poll_interval = poll_interval
+        self._dq = deque()
+        self.enqueued = 0
+        self.dropped = 0
+        self.max_depth = 0
+
+    def __len__(self):
+        return len(self._dq)
+
+    def put(self, item) -> bool:
+        dq = self._dq
+        if len(dq) >= self.maxsize:
+            if self.policy == "drop_newest":
+                self.dropped += 1
+                return False
+            if self.policy == "drop_oldest":
+                try:
+                    dq.popleft()
+                    self.dropped += 1
+                except IndexError:
+                    pass  # worker sudah mengosongkan
+            else:
+                while len(dq) >= self.maxsize:
+                    time.sleep(self.poll_interval)
+        dq.append(item)
+        self.enqueued += 1
+        depth = len(dq)
+        if depth > self.max_depth:
+            self.max_depth = depth
+        return True
+
+    def get_batch(self, timeout: float) -> list:
+        """Ambil semua item yang ada; tunggu maksimal timeout kalau kosong."""
+        dq = self._dq
+        if not dq:
+            deadline = time.monotonic() + timeout
+            while not dq:
+                if time.monotonic() >= deadline:
+                    return []
+                time.sleep(self.poll_interval)
+        batch = []
+        try:
+            for _ in range(len(dq)):
+                batch.append(dq.popleft())
+        except IndexError:
+            pass
+        return batch
 
 
 class DataLogger:
     """
-    Logger data dari STM32 ke CSV.
+    Logger data dari STM32 ke file.
 
     - Data masuk lewat handle_sample(tuple)
     - Penulisan ke file dipisah di thread worker + queue,
       supaya aman di-rate ~20 ms (50 Hz).
+    - fmt="bin": record 68 byte mentah (lihat load_log/export_csv),
+      fmt="csv": format teks lama.
+    - Queue bounded (queue_size, policy: lihat SampleQueue), counter
+      lewat stats(); "discarded" = sample yang sudah antre tapi recording
+      keburu dimatikan sebelum ditulis.
+    - Rotasi: rotate_bytes / rotate_seconds -> sesi dipecah jadi segmen
+      log_<ts>_000.bin, _001, ... Segmen yang sudah ditutup dikompres di
+      thread terpisah (compress=True) dan dicatat di log_<ts>.manifest.json
+      beserta rentang logtick-nya (lihat load_session).
+    - threaded=False: tanpa thread worker/kompresi, pemilik logger yang
+      memanggil drain() dan compress_pending() (lib_aio.log_sink), atau
+      start() untuk menyalakan thread belakangan. close() menulis sisa
+      queue dan menutup sesi. policy="block" tidak boleh di mode ini:
+      put() dan drain() jalan di thread (event loop) yang sama -> deadlock.
     """
 
-    def __init__(self, base_dir="logs"):
+    def __init__(self, base_dir="logs", fmt="csv", queue_size=65536, policy="drop_oldest",
+                 rotate_bytes=None, rotate_seconds=None, compress=False, codec=None, threaded=True):
+        if fmt not in ("csv", "bin"):
+            raise ValueError(f"fmt harus 'csv' atau 'bin', bukan {fmt!r}")
+        if policy == "block" and not threaded:
+            raise ValueError("policy 'block' butuh threaded=True (tanpa thread worker, queue penuh tidak pernah dikosongkan)")
         self.base_dir = base_dir
+        self.fmt = fmt
         os.makedirs(self.base_dir, exist_ok=True)
 
         self._lock = threading.Lock()
         self._recording = False
         self._file = None
         self._writer = None
-        self._queue = queue.Queue()
+        self._queue = SampleQueue(maxsize=queue_size, policy=policy)
+        self._written = 0
+        self._discarded = 0  # sudah di queue, tapi recording dimatikan sebelum ditulis
         self._row_count = 0
+        self._last_flush = time.monotonic()
+
+        # rotasi + manifest
+        self.rotate_bytes = rotate_bytes
+        self.rotate_seconds = rotate_seconds
+        self.compress = compress
+        self.codec = codec or default_codec()
+        if self.compress and self.codec not in CODECS:
+            raise ValueError(f"codec {self.codec} tidak tersedia")
+        self._session = None
+        self._manifest = None
+        self._manifest_lock = threading.Lock()
+        self._segment = None  # entry manifest segmen yang sedang ditulis
+        self._seg_t0 = 0.0
+
+        self._compress_queue = queue.Queue()
+        self._compress_thread = None
+        self._worker_thread = None
+        if threaded:
+            self.start()
+
+    # ---------------- API ----------------
+
+    def start(self):
+        """Nyalakan thread worker + kompresi (sekali saja)."""
+        if self._worker_thread is not None:
+            return
+        self._compress_thread = threading.Thread(
+            target=self._compress_loop,
+            daemon=True
+        )
+        self._compress_thread.start()
 
         self._worker_thread = threading.Thread(
             target=self._worker_loop,
@@ -31,7 +334,40 @@ class DataLogger:
         )
         self._worker_thread.start()
 
-    # ---------------- API ----------------
+    def drain(self) -> int:
+        """Tulis semua sample yang antre sekarang (tanpa menunggu), return jumlahnya."""
+        batch = self._queue.get_batch(timeout=0)
+        self._write_batch(batch)
+        return len(batch)
+
+    def compress_pending(self) -> int:
+        """Kompres semua segmen tertutup yang antre (mode tanpa thread)."""
+        done = 0
+        while True:
+            try:
+                manifest, seg = self._compress_queue.get_nowait()
+            except queue.Empty:
+                return done
+            self._compress_segment(manifest, seg)
+            self._compress_queue.task_done()
+            done += 1
+
+    def has_compress_backlog(self) -> bool:
+        return not self._compress_queue.empty()
+
+    def close(self):
+        """Tulis sisa queue, tutup sesi, tunggu kompresi segmen terakhir."""
+        if self._worker_thread is None:
+            self.drain()
+        else:
+            deadline = time.monotonic() + 2.0
+            while len(self._queue) and time.monotonic() < deadline:
+                time.sleep(0.01)
+        self.set_recording(False)
+        if self._compress_thread is None:
+            self.compress_pending()
+        else:
+            self._compress_queue.join()
 
     def is_recording(self) -> bool:
         with self._lock:
@@ -47,9 +383,10 @@ class DataLogger:
                 return
 
             if enabled:
-                self._open_new_file()
+                self._start_session()
             else:
                 self._close_file()
+                self._session = None
 
             self._recording = enabled
 
@@ -58,54 +395,189 @@ class DataLogger:
             new_state = not self._recording
         self.set_recording(new_state)
 
-    def handle_sample(self, sample_tuple):
+    def stats(self) -> dict:
+        """Counter queue/writer (kumulatif sejak logger dibuat)."""
+        q = self._queue
+        return {
+            "enqueued": q.enqueued,
+            "written": self._written,
+            "dropped": q.dropped,
+            "discarded": self._discarded,
+            "depth": len(q),
+            "max_depth": q.max_depth,
+            "capacity": q.maxsize,
+            "policy": q.policy,
+        }
+
+    def handle_sample(self, sample):
         """
         Dipanggil dari thread pembaca serial (lib_com.read_control_status).
-        sample_tuple: (logtick, degree, cmX, setspeed, r1, r2, r3)
+        sample: lib_com.ControlStatus (iterable 9 nilai, payload di .raw)
         """
+        # tidak rekam -> tidak usah masuk queue sama sekali
+        # (baca flag tanpa lock: cukup atomik untuk bool)
+        if not self._recording:
+            return
         # push ke queue supaya tidak blocking thread serial
-        self._queue.put(sample_tuple)
+        self._queue.put(sample)
 
     # ---------------- internal ----------------
 
-    def _open_new_file(self):
+    def _rotating(self) -> bool:
+        return bool(self.rotate_bytes or self.rotate_seconds or self.compress)
+
+    def _start_session(self):
         if self._file is not None:
             self._close_file()
 
         ts = time.strftime("%Y%m%d_%H%M%S")
-        filename = os.path.join(self.base_dir, f"log_{ts}.csv")
-        self._file = open(filename, "w", newline="")
-        self._writer = csv.writer(self._file)
+        self._session = f"log_{ts}"
+        if self._rotating():
+            with self._manifest_lock:
+                self._manifest = {
+                    "session": self._session,
+                    "format": self.fmt,
+                    "record_size": RECORD_DTYPE.itemsize,
+                    "header_size": LOG_HEADER_SIZE if self.fmt == "bin" else None,
+                    "created": time.time(),
+                    "segments": [],
+                }
+                self._write_manifest(self._manifest)
+        self._open_new_file()
+
+    def _open_new_file(self):
+        if self._file is not None:
+            self._close_file()
+
+        if self._rotating():
+            index = len(self._manifest["segments"])
+            name = f"{self._session}_{index:03d}.{self.fmt}"
+        else:
+            name = f"{self._session}.{self.fmt}"
+        filename = os.path.join(self.base_dir, name)
         self._row_count = 0
+        self._last_flush = time.monotonic()
+        self._seg_t0 = time.time()
+        self._segment = {"file": name, "rows": 0, "tick_min": None, "tick_max": None,
+                         "t_start": self._seg_t0, "t_end": None, "bytes": 0, "compressed": False}
 
-        # header
-        self._writer.writerow(
-            ["logtick", "degree", "cmX", "setspeed", "reserved1", "reserved2", "reserved3"]
-        )
+        if self.fmt == "bin":
+            self._file = open(filename, "wb")
+            self._file.write(make_log_header())
+        else:
+            self._file = open(filename, "w", newline="")
+            self._writer = csv.writer(self._file)
+            # header
+            self._writer.writerow(CSV_HEADER)
         print("Recording to:", filename)
 
+    def _format_batch(self, batch):
+        """Batch sample -> list chunk siap writelines()."""
+        if self.fmt == "bin":
+            return [getattr(sample, "raw", None) or STATUS_STRUCT.pack(*sample) for sample in batch]
+        buf = io.StringIO()
+        csv.writer(buf).writerows(batch)
+        return [buf.getvalue()]
+
     def _close_file(self):
         if self._file is not None:
             try:
                 self._file.flush()
+                self._segment["bytes"] = self._file.tell()
                 self._file.close()
             except Exception:
                 pass
+            if self._rotating():
+                self._finish_segment()
         self._file = None
         self._writer = None
         self._row_count = 0
 
     def _worker_loop(self):
         """
-        Loop penulis CSV. Selalu mengosongkan queue supaya
-        tidak numpuk walau recording OFF.
+        Loop penulis file. Ambil semua yang ada di queue sekaligus,
+        format satu batch, satu writelines. Flush tiap FLUSH_INTERVAL detik.
         """
         while True:
-            sample = self._queue.get()   # blocking
-            with self._lock:
-                if self._recording and self._writer is not None:
-                    self._writer.writerow(sample)
-                    self._row_count += 1
-                    # flush per 50 baris (~1 detik @ 50 Hz)
-                    if (self._row_count % 50) == 0:
-                        self._file.flush()
+            self._write_batch(self._queue.get_batch(timeout=FLUSH_INTERVAL))
+
+    def _write_batch(self, batch):
+        with self._lock:
+            if not (self._recording and self._file is not None):
+                self._discarded += len(batch)
+                return
+            if batch:
+                self._file.writelines(self._format_batch(batch))
+                self._row_count += len(batch)
+                self._written += len(batch)
+                self._update_segment(batch)
+            now = time.monotonic()
+            if now - self._last_flush >= FLUSH_INTERVAL:
+                self._file.flush()
+                self._last_flush = now
+            if self._need_rotate():
+                self._open_new_file()
+
+    # ---------------- rotasi / kompresi ----------------
+
+    def _update_segment(self, batch):
+        seg = self._segment
+        ticks = [_sample_tick(sample) for sample in batch]
+        lo, hi = min(ticks), max(ticks)
+        seg["rows"] += len(batch)
+        seg["tick_min"] = lo if seg["tick_min"] is None else min(seg["tick_min"], lo)
+        seg["tick_max"] = hi if seg["tick_max"] is None else max(seg["tick_max"], hi)
+
+    def _need_rotate(self) -> bool:
+        if self.rotate_bytes and self._file.tell() >= self.rotate_bytes:
+            return True
+        if self.rotate_seconds and time.time() - self._seg_t0 >= self.rotate_seconds:
+            return True
+        return False
+
+    def _finish_segment(self):
+        """Segmen ditutup: catat di manifest, antre kompresi."""
+        seg = self._segment
+        seg["t_end"] = time.time()
+        manifest = self._manifest
+        with self._manifest_lock:
+            manifest["segments"].append(seg)
+            self._write_manifest(manifest)
+        if self.compress:
+            self._compress_queue.put((manifest, seg))
+        self._segment = None
+
+    def _write_manifest(self, manifest):
+        # tulis atomik (tmp + replace), pembaca tidak pernah lihat file setengah jadi
+        path = os.path.join(self.base_dir, f"{manifest['session']}.manifest.json")
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(tmp, path)
+
+    def _compress_loop(self):
+        """Thread kompresi segmen (tidak mengganggu worker penulis)."""
+        while True:
+            manifest, seg = self._compress_queue.get()
+            self._compress_segment(manifest, seg)
+            self._compress_queue.task_done()
+
+    def _compress_segment(self, manifest, seg):
+        compress = CODECS[self.codec][0]
+        src = os.path.join(self.base_dir, seg["file"])
+        dst = src + self.codec
+        try:
+            with open(src, "rb") as f:
+                data = compress(f.read())
+            with open(dst + ".tmp", "wb") as f:
+                f.write(data)
+            os.replace(dst + ".tmp", dst)
+        except Exception as e:
+            print(f"[LOG] compress {src} gagal: {e}")
+            return
+        with self._manifest_lock:
+            seg["file"] = os.path.basename(dst)
+            seg["compressed"] = True
+            seg["bytes"] = len(data)
+            self._write_manifest(manifest)
+        os.remove(src)
@@ -2,7 +2,7 @@ import math
 import pygame
 from threading import Lock
 
-from lib_gui_graph import GraphView
+from lib_gui_graph import GraphView, render_text
 
 # ============================================================
 # GUI CONSTANTS
@@ -27,6 +27,18 @@ COLOR_MASS = (255, 80, 80)
 MODE_2D_SIM = 0
 MODE_GRAPH = 1
 
+# mode STM32 -> label state di panel kanan
+STATE_LABELS = {
+    1: "WAITING",
+    2: "HOMING",
+    201: "TO CENTER",
+    3: "READY",
+    4: "SINUS",
+    5: "FINISH",
+    6: "SWING UP",
+    7: "BALANCING",
+}
+
 # ============================================================
 # GUI HELPER CLASSES
 # ============================================================
@@ -55,7 +67,7 @@ class Button:
         pygame.draw.rect(screen, color, self.rect, border_radius=5)
         pygame.draw.rect(screen, COLOR_TEXT, self.rect, 2, border_radius=5)
 
-        text_surf = font.render(self.text, True, COLOR_TEXT)
+        text_surf = render_text(font, self.text, COLOR_TEXT)
         text_rect = text_surf.get_rect(center=self.rect.center)
         screen.blit(text_surf, text_rect)
 
@@ -103,7 +115,7 @@ class ModeButton:
                     
                 )
             pygame.draw.rect(screen, COLOR_TEXT, btn.rect, 2, border_radius=5)
-            text_surf = font.render(btn.text, True, COLOR_TEXT)
+            text_surf = render_text(font, btn.text, COLOR_TEXT)
             text_rect = text_surf.get_rect(center=btn.rect.center)
             screen.blit(text_surf, text_rect)
  
@@ -117,7 +129,7 @@ class InputField:
         self.active = False
 
     def draw(self, screen, font_label, font_input):
-        label_surf = font_label.render(self.label, True, COLOR_TEXT)
+        label_surf = render_text(font_label, self.label, COLOR_TEXT)
         screen.blit(label_surf, (self.rect.x, self.rect.y - 22))
 
         color = (70, 70, 80) if self.enabled else (50, 50, 60)
@@ -128,7 +140,7 @@ class InputField:
         border_color = COLOR_BUTTON if self.active else (100, 100, 110)
         pygame.draw.rect(screen, border_color, self.rect, 2, border_radius=3)
 
-        text_surf = font_input.render(self.value, True, COLOR_TEXT)
+        text_surf = render_text(font_input, self.value, COLOR_TEXT)
         text_rect = text_surf.get_rect(midleft=(self.rect.x + 8, self.rect.centery))
         screen.blit(text_surf, text_rect)
 
@@ -169,11 +181,11 @@ class XboxButton:
         pygame.draw.circle(screen, color, (self.cx, self.cy), self.radius)
         pygame.draw.circle(screen, COLOR_TEXT, (self.cx, self.cy), self.radius, 2)
 
-        label_surf = font_big.render(self.label, True, COLOR_TEXT)
+        label_surf = render_text(font_big, self.label, COLOR_TEXT)
         label_rect = label_surf.get_rect(center=(self.cx, self.cy))
         screen.blit(label_surf, label_rect)
 
-        cap_surf = font_small.render(self.caption, True, COLOR_TEXT)
+        cap_surf = render_text(font_small, self.caption, COLOR_TEXT)
         cap_rect = cap_surf.get_rect(center=(self.cx, self.cy + self.radius + 14))
         screen.blit(cap_surf, cap_rect)
 
@@ -207,6 +219,17 @@ class PendulumGUI:
         self._create_ui_elements()
         self.graph_view = GraphView(self.MAIN_WIDTH, self.WINDOW_HEIGHT, self.font_small, self.font_medium)
 
+        # chrome = semua bagian statis (background, panel, tombol, rail,
+        # kotak grafik) pre-render ke satu surface, dibangun ulang hanya
+        # kalau signature-nya berubah. Per frame cuma region dinamis yang
+        # di-restore dari chrome, digambar ulang, lalu display.update(rects).
+        self._chrome = None
+        self._chrome_sig = None
+        self._pend_rect = None
+        self._pend_key = None
+        # region teks dinamis: slot -> (rect, text)
+        self._text_regions = {}
+
     def _create_ui_elements(self):
         # ===== base design (waktu panel masih fixed) =====
         PANEL_WIDTH_BASE = 280.0
@@ -349,6 +372,9 @@ class PendulumGUI:
         self._update_hover(mouse_pos)
 
         for event in events:
+            if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                self.invalidate()
+
             # input fields
             for inp in self.inputs.values():
                 inp.handle_event(event)
@@ -383,112 +409,172 @@ class PendulumGUI:
                         if key in callbacks:
                             callbacks[key]()  # call the corresponding action
 
-    def draw(self, context, graph_data):
-        self.screen.fill(COLOR_BG)
+    def invalidate(self):
+        """Paksa rebuild chrome + update full screen di frame berikutnya."""
+        self._chrome_sig = None
+
+    def _chrome_signature(self, context):
+        btns = (self.btn_apply, self.btn_start, self.btn_reset, self.btn_record, self.btn_udp)
+        return (
+            self.active_mode,
+            self.mode_group.active_index,
+            bool(context["is_running"]),
+            bool(context.get("gains_sent", False)),
+            bool(context.get("gains_ack", False)),
+            bool(context.get("reset_ack", False)),
+            self.state_label,
+            tuple((b.text, b.hovered, b.enabled) for b in btns),
+            tuple((i.value, i.active, i.enabled) for i in self.inputs.values()),
+            tuple(b.hovered for b in self.xbox_buttons.values()),
+        )
+
+    def _draw_chrome(self, surf, context):
+        surf.fill(COLOR_BG)
 
         is_running = context["is_running"]
         status_text = "RUNNING" if is_running else "STOPPED"
         status_color = COLOR_STATUS_RUN if is_running else COLOR_STATUS_STOP
 
-        pygame.draw.circle(self.screen, status_color, (30, 30), 12)
-        status_surf = self.font_large.render(status_text, True, COLOR_TEXT)
-        self.screen.blit(status_surf, (55, 18))
+        pygame.draw.circle(surf, status_color, (30, 30), 12)
+        status_surf = render_text(self.font_large, status_text, COLOR_TEXT)
+        surf.blit(status_surf, (55, 18))
 
         # top buttons
-        self.btn_record.draw(self.screen, self.font_medium)
-        self.btn_udp.draw(self.screen, self.font_medium)
+        self.btn_record.draw(surf, self.font_medium)
+        self.btn_udp.draw(surf, self.font_medium)
 
         # mode buttons (mutual active)
-        self.mode_group.draw(self.screen, self.font_medium)
+        self.mode_group.draw(surf, self.font_medium)
 
-        # main area
+        # main area (bagian statis)
         if self.active_mode == MODE_2D_SIM:
-            self._draw_pendulum()
+            self._draw_rail(surf)
         else:
-            self.graph_view.draw(self.screen, graph_data)
+            self.graph_view.draw_static(surf)
 
         # right panel
-        pygame.draw.rect(self.screen, COLOR_PANEL, (self.MAIN_WIDTH, 0, self.PANEL_WIDTH, self.WINDOW_HEIGHT))
+        pygame.draw.rect(surf, COLOR_PANEL, (self.MAIN_WIDTH, 0, self.PANEL_WIDTH, self.WINDOW_HEIGHT))
 
         for inp in self.inputs.values():
-            inp.draw(self.screen, self.font_small, self.font_input)
+            inp.draw(surf, self.font_small, self.font_input)
 
-        self.btn_apply.draw(self.screen, self.font_medium)
-        self.btn_start.draw(self.screen, self.font_medium)
-        self.btn_reset.draw(self.screen, self.font_medium)
+        self.btn_apply.draw(surf, self.font_medium)
+        self.btn_start.draw(surf, self.font_medium)
+        self.btn_reset.draw(surf, self.font_medium)
 
         for btn in self.xbox_buttons.values():
-            btn.draw(self.screen, self.font_medium, self.font_small)
+            btn.draw(surf, self.font_medium, self.font_small)
 
         label_y = max(btn.cy for btn in self.xbox_buttons.values()) + 80
         label_x = self.MAIN_WIDTH + (self.PANEL_WIDTH // 2)
 
-        label_surf = self.font_medium.render(self.state_label, True, COLOR_TEXT)
+        label_surf = render_text(self.font_medium, self.state_label, COLOR_TEXT)
         label_rect = label_surf.get_rect(center=(label_x, label_y))
-        self.screen.blit(label_surf, label_rect)
+        surf.blit(label_surf, label_rect)
 
         # acks
         if context.get("gains_sent", False):
             ack_text = "✓ Gains Applied" if context.get("gains_ack", False) else "Waiting Gains ACK..."
             ack_color = COLOR_STATUS_RUN if context.get("gains_ack", False) else (200, 150, 50)
-            ack_surf = self.font_small.render(ack_text, True, ack_color)
-            self.screen.blit(ack_surf, (self.MAIN_WIDTH + 15, int(self.WINDOW_HEIGHT * 0.78)))
+            ack_surf = render_text(self.font_small, ack_text, ack_color)
+            surf.blit(ack_surf, (self.MAIN_WIDTH + 15, int(self.WINDOW_HEIGHT * 0.78)))
 
         if (not is_running) and context.get("reset_ack", False):
-            reset_surf = self.font_small.render("✓ System Ready", True, COLOR_STATUS_RUN)
-            self.screen.blit(reset_surf, (self.MAIN_WIDTH + 15, int(self.WINDOW_HEIGHT * 0.81)))
+            reset_surf = render_text(self.font_small, "✓ System Ready", COLOR_STATUS_RUN)
+            surf.blit(reset_surf, (self.MAIN_WIDTH + 15, int(self.WINDOW_HEIGHT * 0.81)))
+
+    def _restore(self, rect):
+        # kembalikan region dari chrome (hapus gambar dinamis frame lalu)
+        self.screen.blit(self._chrome, rect, rect)
+
+    def draw(self, context, graph_data):
+        self.state_label = STATE_LABELS.get(context.get("mode", 0), "UNDEFINED")
+
+        dirty = []
+        sig = self._chrome_signature(context)
+        full = sig != self._chrome_sig
+        if full:
+            if self._chrome is None:
+                self._chrome = self.screen.copy()
+            self._draw_chrome(self._chrome, context)
+            self._chrome_sig = sig
+            self.screen.blit(self._chrome, (0, 0))
+            self._pend_rect = None
+            self._text_regions.clear()
+            dirty.append(self.screen.get_rect())
+
+        # main area (dinamis)
+        if self.active_mode == MODE_2D_SIM:
+            with self.state_lock:
+                cmX = self.state["cmX"]
+                theta = self.state["theta"]
+            if full or (cmX, theta) != self._pend_key:
+                if self._pend_rect is not None:
+                    self._restore(self._pend_rect)
+                rect = self._draw_pendulum(cmX, theta)
+                dirty.append(rect.union(self._pend_rect) if self._pend_rect else rect)
+                self._pend_rect = rect
+                self._pend_key = (cmX, theta)
+        elif full or self.graph_view.needs_redraw():
+            area = self.graph_view.area
+            if not full:
+                self._restore(area)
+            self.graph_view.draw(self.screen, graph_data)
+            dirty.append(area)
 
         # bottom info
         cmX = context["cmX"]
         theta = context["theta"]
         theta_deg = math.degrees(theta)
         info_text = f"Position: {cmX:.1f} cm  |  Angle: {theta_deg:.2f}°"
-        info_surf = self.font_medium.render(info_text, True, COLOR_TEXT)
-        self.screen.blit(info_surf, (20, self.WINDOW_HEIGHT - 35))
-        mode = context.get("mode", 0)
-        print(mode)
-        if mode == 1:
-            self.state_label = "WAITING"
-        elif mode == 2:
-            self.state_label = "HOMING"
-        elif mode == 201:
-            self.state_label = "TO CENTER"
-        elif mode == 3:
-            self.state_label = "READY"
-        elif mode == 4:
-            self.state_label = "SINUS"
-        elif mode == 5:
-            self.state_label = "FINISH"
-        elif mode == 6:
-            self.state_label = "SWING UP"
-        elif mode == 7:
-            self.state_label = "BALANCING"
-        else:
-            self.state_label = "UNDEFINED"
-
-
-        pygame.display.flip()
-
-    def _draw_pendulum(self):
+        self._draw_text_region("info", info_text, (20, self.WINDOW_HEIGHT - 35), self.font_medium, COLOR_TEXT, dirty)
+
+        # logger queue stats (status area, di bawah RUNNING/STOPPED)
+        log_stats = context.get("log_stats")
+        if log_stats:
+            log_text = (f"LOG q {log_stats['depth']}/{log_stats['capacity']}  max {log_stats['max_depth']}  "
+                        f"wr {log_stats['written']}  drop {log_stats['dropped']}  disc {log_stats['discarded']}")
+            log_color = COLOR_STATUS_STOP if log_stats["dropped"] else COLOR_TEXT
+            self._draw_text_region("log", log_text, (55, 46), self.font_small, log_color, dirty)
+
+        if dirty:
+            pygame.display.update(dirty)
+
+    def _draw_text_region(self, slot, text, pos, font, color, dirty):
+        """Teks dinamis: gambar ulang hanya kalau isinya berubah."""
+        prev = self._text_regions.get(slot)
+        if prev is not None and prev[1] == (text, color):
+            return
+        if prev is not None:
+            self._restore(prev[0])
+        rect = self.screen.blit(render_text(font, text, color), pos)
+        dirty.append(rect.union(prev[0]) if prev is not None else rect)
+        self._text_regions[slot] = (rect, (text, color))
+
+    def _rail_geometry(self):
         ground_y = self.WINDOW_HEIGHT * 0.5
         left_margin = self.MAIN_WIDTH * 0.25
         right_margin = self.MAIN_WIDTH * 0.75
+        return ground_y, left_margin, right_margin
 
-        size_compare = (right_margin - left_margin) / 80.0
+    def _draw_rail(self, surf):
+        ground_y, left_margin, right_margin = self._rail_geometry()
 
-        pygame.draw.line(self.screen, COLOR_RAIL, (left_margin, ground_y), (right_margin, ground_y), 4)
+        pygame.draw.line(surf, COLOR_RAIL, (left_margin, ground_y), (right_margin, ground_y), 4)
 
-        pygame.draw.line(self.screen, COLOR_RAIL, (left_margin, ground_y - 10), (left_margin, ground_y + 10), 3)
-        pygame.draw.line(self.screen, COLOR_RAIL, (right_margin, ground_y - 10), (right_margin, ground_y + 10), 3)
+        pygame.draw.line(surf, COLOR_RAIL, (left_margin, ground_y - 10), (left_margin, ground_y + 10), 3)
+        pygame.draw.line(surf, COLOR_RAIL, (right_margin, ground_y - 10), (right_margin, ground_y + 10), 3)
 
-        text_min = self.font_small.render(f"{self.X_MIN_CM:.0f} cm", True, COLOR_TEXT)
-        text_max = self.font_small.render(f"{self.X_MAX_CM:.0f} cm", True, COLOR_TEXT)
-        self.screen.blit(text_min, (left_margin - 15, ground_y + 15))
-        self.screen.blit(text_max, (right_margin - 15, ground_y + 15))
+        text_min = render_text(self.font_small, f"{self.X_MIN_CM:.0f} cm", COLOR_TEXT)
+        text_max = render_text(self.font_small, f"{self.X_MAX_CM:.0f} cm", COLOR_TEXT)
+        surf.blit(text_min, (left_margin - 15, ground_y + 15))
+        surf.blit(text_max, (right_margin - 15, ground_y + 15))
 
-        with self.state_lock:
-            cmX = self.state["cmX"]
-            theta = self.state["theta"]
+    def _draw_pendulum(self, cmX, theta):
+        """Gambar cart + pendulum, return bounding rect (untuk dirty rect)."""
+        ground_y, left_margin, right_margin = self._rail_geometry()
+
+        size_compare = (right_margin - left_margin) / 80.0
 
         alpha = (cmX - self.X_MIN_CM) / (self.X_MAX_CM - self.X_MIN_CM)
         alpha = max(0.0, min(1.0, alpha))
@@ -498,11 +584,12 @@ class PendulumGUI:
         cart_w = 80
         cart_h = 30
         cart_rect = pygame.Rect(cart_x - cart_w // 2, cart_y - cart_h // 2, cart_w, cart_h)
-        pygame.draw.rect(self.screen, COLOR_CART, cart_rect, border_radius=6)
+        r = pygame.draw.rect(self.screen, COLOR_CART, cart_rect, border_radius=6)
 
         pend_length = 38 * size_compare
         pend_x = int(cart_x + pend_length * math.sin(theta))
         pend_y = int(cart_y - pend_length * math.cos(theta))
 
-        pygame.draw.line(self.screen, COLOR_PENDULUM, (cart_x, cart_y), (pend_x, pend_y), 8)
-        pygame.draw.circle(self.screen, COLOR_MASS, (pend_x, pend_y), 4)
+        r = r.union(pygame.draw.line(self.screen, COLOR_PENDULUM, (cart_x, cart_y), (pend_x, pend_y), 8))
+        r = r.union(pygame.draw.circle(self.screen, COLOR_MASS, (pend_x, pend_y), 4))
+        return r
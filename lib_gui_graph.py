@@ -1,6 +1,12 @@
 import math
+import time
+from collections import deque
+
+import numpy as np
 import pygame
 
+from lib_com import TICK_SECONDS
+
 COLOR_TEXT = (220, 220, 220)
 COLOR_BGBOX = (25, 25, 35)
 COLOR_BORDER = (200, 60, 60)
@@ -11,29 +17,21 @@ COLOR_BTN_ON = (70, 130, 170)
 COLOR_BTN_OFF = (55, 55, 65)
 COLOR_BTN_STOP = (75, 85, 95)
 
-
-def _safe_median_diff(xs):
-	if xs is None or len(xs) < 3:
-		return None
-	d = [xs[i] - xs[i - 1] for i in range(1, len(xs))]
-	d = [v for v in d if v is not None]
-	if not d:
-		return None
-	return sorted(d)[len(d) // 2]
+# cache surface teks: (font, text, color) -> Surface
+_TEXT_CACHE = {}
+_TEXT_CACHE_MAX = 1024
 
 
-def _to_seconds(t_raw):
-	# Heuristic:
-	# - if median diff > 5 => likely milliseconds
-	# - else treat as seconds already
-	if t_raw is None or len(t_raw) == 0:
-		return []
-	md = _safe_median_diff(t_raw)
-	if md is None:
-		return [0.0 for _ in t_raw]
-	scale = 0.001 if md > 5 else 1.0
-	t0 = t_raw[0]
-	return [(v - t0) * scale for v in t_raw]
+def render_text(font, text, color):
+	# font.render cuma sekali per (font, text, color). Cache dikosongkan
+	# kalau penuh (teks angka yang berubah tiap frame tidak menumpuk).
+	key = (font, text, color)
+	surf = _TEXT_CACHE.get(key)
+	if surf is None:
+		if len(_TEXT_CACHE) >= _TEXT_CACHE_MAX:
+			_TEXT_CACHE.clear()
+		surf = _TEXT_CACHE[key] = font.render(text, True, color)
+	return surf
 
 
 def _second_derivative(y, t):
@@ -83,6 +81,234 @@ def _linreg(x, y):
 	return a, b
 
 
+def _m4_decimate(t, y, tmin, tmax, w):
+	# M4: per kolom pixel simpan first, min, max, last -> maksimal 4*(w+1) titik,
+	# spike tetap terlihat. t harus naik (urut waktu).
+	# Return (kolom pixel relatif x0, nilai y).
+	cols = ((t - tmin) * (w / (tmax - tmin))).astype(np.int64)
+	starts = np.concatenate(([0], np.flatnonzero(np.diff(cols)) + 1))
+	ends = np.append(starts[1:], len(t))
+	out_c = np.repeat(cols[starts], 4)
+	out_y = np.empty(4 * len(starts), dtype=np.float64)
+	out_y[0::4] = y[starts]
+	out_y[1::4] = np.minimum.reduceat(y, starts)
+	out_y[2::4] = np.maximum.reduceat(y, starts)
+	out_y[3::4] = y[ends - 1]
+	return out_c, out_y
+
+
+class _RunningExtrema:
+	# Min/max sliding window incremental (deque monoton per nomor sample).
+	# Tiap frame cukup proses sample baru, tidak scan ulang seluruh window.
+	def __init__(self):
+		self.reset()
+
+	def reset(self):
+		self._max = deque()   # (seq, value), value menurun
+		self._min = deque()   # (seq, value), value naik
+		self.seq_end = None   # sample berikutnya yang belum diproses
+
+	@staticmethod
+	def _push(dq, seqs, y):
+		# kandidat = y[i] yang > semua sample setelahnya di chunk ini
+		suffix = np.maximum.accumulate(y[::-1])[::-1]
+		cand = y > np.append(suffix[1:], -np.inf)
+		top = suffix[0]
+		while dq and dq[-1][1] <= top:
+			dq.pop()
+		dq.extend(zip(seqs[cand].tolist(), y[cand].tolist()))
+
+	def update(self, y_new, seq0):
+		# y_new: nilai untuk sample nomor [seq0, seq0 + len(y_new))
+		n = len(y_new)
+		if n == 0:
+			return
+		seqs = np.arange(seq0, seq0 + n)
+		y = np.asarray(y_new, dtype=np.float64)
+		self._push(self._max, seqs, y)
+		self._push(self._min, seqs, -y)
+		self.seq_end = seq0 + n
+
+	def trim(self, seq_start):
+		while self._max and self._max[0][0] < seq_start:
+			self._max.popleft()
+		while self._min and self._min[0][0] < seq_start:
+			self._min.popleft()
+
+	def get(self):
+		if not self._max:
+			return None
+		return -self._min[0][1], self._max[0][1]
+
+
+class _TimeAxis:
+	# Sumbu waktu (detik) untuk sesi capture: (logtick - logtick sample
+	# pertama sesi) * TICK_SECONDS (logtick STM32 selalu ms). Sample baru
+	# dikonversi sekali saat masuk. Disimpan mirror 2x seperti TelemetryRing
+	# supaya view(start, end) selalu berurutan tanpa copy.
+	def __init__(self, capacity):
+		self.capacity = int(capacity)
+		self._t = np.zeros(2 * self.capacity)
+		self.reset(0)
+
+	def reset(self, seq):
+		self.seq_start = seq
+		self.seq_end = seq
+		self.t0 = None
+
+	def extend(self, history, seq_end):
+		# konversi sample [self.seq_end, seq_end) dari ring
+		if seq_end <= self.seq_end:
+			return self.t0 is not None
+		if self.t0 is None:
+			self.t0 = float(history.window(self.seq_start, self.seq_start + 1)["t_raw"][0])
+		start = max(self.seq_end, seq_end - self.capacity)
+		t = (history.window(start, seq_end)["t_raw"] - self.t0) * TICK_SECONDS
+		idx = np.arange(start, seq_end) % self.capacity
+		self._t[idx] = t
+		self._t[idx + self.capacity] = t
+		self.seq_end = seq_end
+		return True
+
+	def view(self, start, end):
+		if end <= start:
+			return self._t[:0]
+		e = end % self.capacity + self.capacity
+		return self._t[e - (end - start):e]
+
+
+class _StreamingRegression:
+	# Regresi y = a*x + b untuk panel REGRESI, versi streaming:
+	# x = sin(theta), y = theta'' (smoothing sama dengan _second_derivative)
+	# dihitung sekali per sample baru dan disimpan per nomor sample.
+	# Statistik range fit (n, mean x/y, Cxx, Cxy terpusat, gaya Welford/Chan)
+	# digabung/dikurangi per potongan saat range bergeser, jadi fit() =
+	# O(sample baru). Bentuk terpusat: data datar -> Cxx ~ 0, tidak ada
+	# residu pembatalan Sxx - Sx^2/n yang lolos guard. Dihitung ulang penuh
+	# sesekali supaya error floating point tidak menumpuk, dan saat Cxx
+	# jatuh jauh di bawah puncaknya (sisa pengurangan bukan lagi kecil
+	# dibanding Cxx yang tersisa).
+	def __init__(self, capacity):
+		self.capacity = int(capacity)
+		self._x = np.zeros(self.capacity)
+		self._y = np.zeros(self.capacity)
+		self.reset(0)
+
+	def reset(self, seq):
+		self.seq_start = seq
+		self.seq_end = seq       # sample berikutnya yang belum diproses
+		self.ready_end = seq     # dd valid untuk nomor < ready_end
+		self._tail = []          # 2 sample terakhir: (t, theta)
+		self._dd_prev = 0.0
+		self._lo = self._hi = seq
+		self._stats = [0, 0.0, 0.0, 0.0, 0.0]   # n, mean_x, mean_y, cxx, cxy
+		self._peak = 0.0         # cxx terbesar sejak hitung ulang penuh
+		self._ops = 0
+
+	def push(self, t_sec, theta, seq0):
+		# sample baru nomor [seq0, seq0 + len), t dalam detik, theta dalam rad
+		cap = self.capacity
+		tail = self._tail          # [(t, theta, sin(theta)), ...] maks 2
+		dd_prev = self._dd_prev
+		seq = seq0
+		for tc, yc, xc in zip(t_sec.tolist(), theta.tolist(), np.sin(theta).tolist()):
+			if len(tail) == 2:
+				(ta, ya, _), (tb, yb, xb) = tail
+				dt1 = tb - ta
+				dt2 = tc - tb
+				if dt1 <= 0 or dt2 <= 0:
+					dd = 0.0
+				else:
+					dd = ((yc - yb) / dt2 - (yb - ya) / dt1) / ((dt1 + dt2) * 0.5)
+					if dd > 90 or dd < -90:
+						dd = dd_prev
+					dd = (dd + dd_prev) / 2.0
+				dd_prev = dd
+				k = (seq - 1) % cap    # sample tengah
+				self._x[k] = xb
+				self._y[k] = dd
+				self.ready_end = seq
+				tail.pop(0)
+			tail.append((tc, yc, xc))
+			seq += 1
+		self._dd_prev = dd_prev
+		self.seq_end = seq
+
+	def _take(self, a, b):
+		idx = np.arange(a, b) % self.capacity
+		return self._x[idx], self._y[idx]
+
+	def _add(self, a, b, sign):
+		# gabung (sign=1) / keluarkan (sign=-1) sample [a, b) dari statistik
+		if b <= a:
+			return
+		x, y = self._take(a, b)
+		nb = b - a
+		mbx = float(x.mean())
+		mby = float(y.mean())
+		dxb = x - mbx
+		cbxx = float(dxb @ dxb)
+		cbxy = float(dxb @ (y - mby))
+		n, mx, my, cxx, cxy = self._stats
+		if sign > 0:
+			n2 = n + nb
+			dx, dy = mbx - mx, mby - my
+			f = n * nb / n2
+			self._stats = [n2, mx + dx * nb / n2, my + dy * nb / n2,
+						   cxx + cbxx + dx * dx * f, cxy + cbxy + dx * dy * f]
+		else:
+			n2 = n - nb
+			if n2 <= 0:
+				self._stats = [0, 0.0, 0.0, 0.0, 0.0]
+			else:
+				mx2 = (n * mx - nb * mbx) / n2
+				my2 = (n * my - nb * mby) / n2
+				dx, dy = mbx - mx2, mby - my2
+				f = n2 * nb / n
+				self._stats = [n2, mx2, my2, max(cxx - cbxx - dx * dx * f, 0.0), cxy - cbxy - dx * dy * f]
+		self._ops += nb
+
+	def set_range(self, lo, hi):
+		# geser range fit ke sample [lo, hi)
+		hi = min(hi, self.ready_end)
+		lo = max(lo, self.seq_start)
+		if hi <= lo:
+			self._stats = [0, 0.0, 0.0, 0.0, 0.0]
+			self._lo = self._hi = lo
+			return
+		full = lo >= self._hi or hi <= self._lo or self._ops > 4 * self.capacity
+		if not full:
+			self._add(lo, self._lo, 1)
+			self._add(self._hi, hi, 1)
+			self._peak = max(self._peak, self._stats[3])
+			self._add(self._lo, lo, -1)
+			self._add(hi, self._hi, -1)
+			full = self._stats[3] < 1e-8 * self._peak
+		if full:
+			self._stats = [0, 0.0, 0.0, 0.0, 0.0]
+			self._ops = 0
+			self._add(lo, hi, 1)
+			self._peak = self._stats[3]
+		self._lo, self._hi = lo, hi
+
+	def fit(self):
+		# sama dengan _linreg pada range aktif
+		n, mx, my, cxx, cxy = self._stats
+		if n < 2:
+			return 0.0, 0.0
+		# den _linreg = n*Sxx - Sx^2 = n*cxx; guard relatif terhadap n*Sxx
+		# untuk sisa pembulatan saat data (hampir) datar
+		if n * cxx < 1e-12 or cxx <= 1e-12 * (cxx + n * mx * mx):
+			return 0.0, 0.0
+		a = cxy / cxx
+		b = my - a * mx
+		return a, b
+
+	def points(self):
+		# x, y di range aktif (untuk scatter)
+		return self._take(self._lo, self._hi)
+
+
 class Dropdown:
 	def __init__(self, rect: pygame.Rect, options, default_key):
 		self.rect = rect
@@ -112,7 +338,7 @@ class Dropdown:
 	def draw(self, screen, font):
 		pygame.draw.rect(screen, (70, 70, 80), self.rect, border_radius=3)
 		pygame.draw.rect(screen, (110, 110, 120), self.rect, 2, border_radius=3)
-		txt = font.render(self.key, True, COLOR_TEXT)
+		txt = render_text(font, self.key, COLOR_TEXT)
 		screen.blit(txt, (self.rect.x + 8, self.rect.y + 6))
 		pygame.draw.polygon(screen, COLOR_TEXT, [
 			(self.rect.right - 18, self.rect.y + 10),
@@ -124,7 +350,7 @@ class Dropdown:
 				r = pygame.Rect(self.rect.x, self.rect.y + (i + 1) * self.item_h, self.rect.w, self.item_h)
 				pygame.draw.rect(screen, (55, 55, 65), r)
 				pygame.draw.rect(screen, (110, 110, 120), r, 1)
-				screen.blit(font.render(opt, True, COLOR_TEXT), (r.x + 8, r.y + 6))
+				screen.blit(render_text(font, opt, COLOR_TEXT), (r.x + 8, r.y + 6))
 
 
 class _SmallButton:
@@ -153,7 +379,7 @@ class _SmallButton:
 			col = COLOR_BTN_OFF
 		pygame.draw.rect(screen, col, self.rect, border_radius=5)
 		pygame.draw.rect(screen, COLOR_TEXT, self.rect, 2, border_radius=5)
-		t = font.render(self.text, True, COLOR_TEXT)
+		t = render_text(font, self.text, COLOR_TEXT)
 		r = t.get_rect(center=self.rect.center)
 		screen.blit(t, r)
 
@@ -209,70 +435,54 @@ class GraphView:
 		self.btn_start = _SmallButton(pygame.Rect(left_x, btn_y, btn_w, btn_h), "START GRAPH")
 		self.btn_reset = _SmallButton(pygame.Rect(left_x + btn_w + 12, btn_y, 110, btn_h), "RESET")
 
+		# area yang digambar ulang tiap frame (tombol s/d bawah grafik 2).
+		# Kotak + judul digambar sekali ke chrome lewat draw_static().
+		# Lebar area ditambah gutter kiri: label ymin/ymax digambar di kiri rect grafik.
+		self.label_gutter = min(left_x, self.font_small.size("-00000.00")[0] + 6)
+		area_x = left_x - self.label_gutter
+		self.area = pygame.Rect(area_x, btn_y, self.main_width - area_x, self.rect_g2.bottom + 4 - btn_y)
+		# perlu digambar ulang walau tidak running (event / hover berubah)
+		self.dirty = True
+
 		self.running = False
-		self._src_last_n = 0
-		self.buf_t_raw = []
-		self.buf_cmX = []
-		self.buf_deg = []
-		self.buf_deg0 = []
-		self.buf_setspeed = []
-		self.buf_r1 = []
-		self.buf_theta_dot = []
-		self.buf_x_center = []
-		# sliding window (opsi A): keep last N points for display
+		# history = lib_ring.TelemetryRing (diisi dari draw/handle_event).
+		# Window graph = sample nomor [_seq_start, _seq_end), _seq_end ikut
+		# write_idx selama running, dibekukan saat STOP.
+		self.history = None
+		self._seq_start = 0
+		self._seq_end = 0
+		# sliding window (opsi A): keep last N points for display.
+		# Boleh dinaikkan sampai kapasitas ring (plot di-decimate M4).
 		self.max_points = 3000
 
+		# running min/max per field (autoscale tanpa scan ulang window)
+		self._extrema = {}
+		# waktu draw GraphView (ms): frame terakhir & rata-rata (EMA)
+		self.draw_ms = 0.0
+		self.draw_ms_avg = 0.0
+
 		self.last_a = 0.0
 		self.last_b = 0.0
+		self._taxis = None
+		self._reg = None
+		self._session = None
+		self._win_start = 0
 
 	def reset(self):
 		self.running = False
-		self._src_last_n = 0
-		del self.buf_t_raw[:len(self.buf_t_raw)]
-		del self.buf_cmX[:len(self.buf_cmX)]
-		del self.buf_deg[:len(self.buf_deg)]
-		del self.buf_deg0[:len(self.buf_deg0)]
-		del self.buf_setspeed[:len(self.buf_setspeed)]
-		del self.buf_r1[:len(self.buf_r1)]
-		del self.buf_theta_dot[:len(self.buf_theta_dot)]
-		del self.buf_x_center[:len(self.buf_x_center)]
-		self.buf_t_raw.clear()
-		self.buf_cmX.clear()
-		self.buf_deg.clear()
-		self.buf_deg0.clear()
-		self.buf_setspeed.clear()
-		self.buf_r1.clear()
-		self.buf_theta_dot.clear()
-		self.buf_x_center.clear()
+		tail = self.history.write_idx if self.history is not None else 0
+		self._seq_start = tail
+		self._seq_end = tail
 		self.last_a = 0.0
 		self.last_b = 0.0
 
 	def _start_from_now(self, data):
 		# Start plotting from current tail (so next samples start at t=0 in the view)
-		t_raw = data.get("t_raw", [])
-		cmX = data.get("cmX", [])
-		deg = data.get("degree", [])
-		deg0 = data.get("degree0", [])
-		setspeed = data.get("setspeed", [])
-		r1 = data.get("r1", [])
-		theta_dot = data.get("theta_dot", [])
-		x_center = data.get("x_center", [])
-
-		n = min(len(t_raw), len(cmX), len(deg), len(deg0))
-
-		# clear view buffers
-		self.buf_t_raw.clear()
-		self.buf_cmX.clear()
-		self.buf_deg.clear()
-		self.buf_deg0.clear()
-		self.buf_setspeed.clear()
-		self.buf_r1.clear()
-		self.buf_theta_dot.clear()
-		self.buf_x_center.clear()
-		
-
-		# set source cursor to current tail
-		self._src_last_n = n
+		if data is not None:
+			self.history = data
+		tail = self.history.write_idx if self.history is not None else 0
+		self._seq_start = tail
+		self._seq_end = tail
 
 		# reset regression
 		self.last_a = 0.0
@@ -280,8 +490,13 @@ class GraphView:
 
 	def handle_event(self, event, data=None):
 		mouse_pos = pygame.mouse.get_pos() if hasattr(pygame, "mouse") else (0, 0)
+		hover = (self.btn_start.hovered, self.btn_reset.hovered)
 		self.btn_start.update_hover(mouse_pos)
 		self.btn_reset.update_hover(mouse_pos)
+		if hover != (self.btn_start.hovered, self.btn_reset.hovered):
+			self.dirty = True
+		if event.type == pygame.MOUSEBUTTONDOWN:
+			self.dirty = True
 
 		changed = False
 		changed |= self.dd1.handle_event(event)
@@ -294,15 +509,15 @@ class GraphView:
 			if self.btn_start.is_clicked(pos):
 				if not self.running:
 					self.reset()
-					if data is not None:
-						self._start_from_now(data)
+					self._start_from_now(data)
 					self.running = True
 					self.btn_start.text = "STOP"  # switch label
 					
 				else:
 					self.running = False
-					# STOP: clear buffers so the graph becomes empty
-					#self.reset()
+					# STOP: bekukan window di sample terakhir
+					if self.history is not None:
+						self._seq_end = self.history.write_idx
 					self.btn_start.text = "START GRAPH"
 				return True
 			if self.btn_reset.is_clicked(pos):
@@ -311,13 +526,24 @@ class GraphView:
 				return True
 		return changed
 
+	def needs_redraw(self):
+		return self.running or self.dirty
+
+	def draw_static(self, screen):
+		# bagian statis (kotak + judul), cukup sekali per rebuild chrome
+		self._draw_box(screen, self.rect_g1, "GRAFIK 1", COLOR_BORDER)
+		self._draw_box(screen, self.rect_g2, "GRAFIK 2", COLOR_BORDER)
+		self._draw_box(screen, self.rect_reg, "REGRESI", COLOR_BORDER)
+		self._draw_box(screen, self.rect_res, "HASIL REGRESI", COLOR_BORDER_Y)
+
 	def _draw_box(self, screen, rect, title, border_color):
 		pygame.draw.rect(screen, COLOR_BGBOX, rect)
 		pygame.draw.rect(screen, border_color, rect, 3)
 		if title:
-			screen.blit(self.font_small.render(title, True, border_color), (rect.x + 10, rect.y + 8))
+			screen.blit(render_text(self.font_small, title, border_color), (rect.x + 10, rect.y + 8))
 
-	def _plot_timeseries(self, screen, rect, t, y, label, fixed_range=None):
+	def _plot_timeseries(self, screen, rect, t, y, label, fixed_range=None, yrange=None):
+		# t, y: np.ndarray (boleh view ring). yrange: (min, max) dari _RunningExtrema
 		if len(t) < 2:
 			return
 
@@ -339,13 +565,13 @@ class GraphView:
 		pygame.draw.line(screen, COLOR_LINE, (x0, y0), (x0, y0 + h), 1)
 
 		# subtitle in header (no collision with title)
-		screen.blit(self.font_small.render(label, True, COLOR_TEXT), (rect.x + 10, rect.y + 26))
+		screen.blit(render_text(self.font_small, label, COLOR_TEXT), (rect.x + 10, rect.y + 26))
 
 		tmin, tmax = t[0], t[-1]
 		if fixed_range is not None:
 			ymin, ymax = fixed_range
 		else:
-			ymin, ymax = min(y), max(y)
+			ymin, ymax = yrange if yrange is not None else (float(y.min()), float(y.max()))
 			if abs(ymax - ymin) < 1e-12:
 				ymax = ymin + 1.0
 
@@ -353,29 +579,34 @@ class GraphView:
 		py_min = y0 + h      # paling bawah grafik
 
 		# render teks
-		txt_max = self.font_small.render(f"{ymax:.2f}", True, COLOR_TEXT)
-		txt_min = self.font_small.render(f"{ymin:.2f}", True, COLOR_TEXT)
+		txt_max = render_text(self.font_small, f"{ymax:.2f}", COLOR_TEXT)
+		txt_min = render_text(self.font_small, f"{ymin:.2f}", COLOR_TEXT)
 
+		# dijepit ke area supaya label lama selalu terhapus oleh restore chrome
 		screen.blit(
 			txt_max,
-			(rect.x - txt_max.get_width() - 6, py_max - 8)
+			(max(self.area.x, rect.x - txt_max.get_width() - 6), py_max - 8)
 		)
 		screen.blit(
 			txt_min,
-			(rect.x - txt_min.get_width() - 6, py_min - 8)
+			(max(self.area.x, rect.x - txt_min.get_width() - 6), py_min - 8)
 		)
 		
 		if ymin < 0 < ymax:
 			y_zero = y0 + h - int((-ymin) / (ymax - ymin) * h)
 			pygame.draw.line(screen, (120, 120, 120), (x0, y_zero), (x0 + w, y_zero), 1)
 
-		pts = []
-		for i in range(len(t)):
-			xt = (t[i] - tmin) / (tmax - tmin) if tmax != tmin else 0.0
-			yt = (y[i] - ymin) / (ymax - ymin)
-			px = x0 + int(xt * w)
-			py = y0 + h - int(yt * h)
-			pts.append((px, py))
+		# pixel semua titik sekaligus (int() = truncate, sama dengan astype).
+		# Kalau sample jauh lebih banyak dari kolom pixel -> decimation M4.
+		if tmax == tmin:
+			px = np.full(len(t), x0, dtype=np.int64)
+		elif len(t) > 4 * (w + 1):
+			cols, y = _m4_decimate(t, y, tmin, tmax, w)
+			px = x0 + cols
+		else:
+			px = x0 + ((t - tmin) * (w / (tmax - tmin))).astype(np.int64)
+		py = y0 + h - ((y - ymin) * (h / (ymax - ymin))).astype(np.int64)
+		pts = np.column_stack((px, py)).tolist()
 		if len(pts) >= 2:
 			pygame.draw.lines(screen, (120, 200, 255), False, pts, 2)
 
@@ -395,8 +626,8 @@ class GraphView:
 		if w <= 5 or h <= 5:
 			return
 
-		xmin, xmax = min(x), max(x)
-		ymin, ymax = min(y), max(y)
+		xmin, xmax = float(x.min()), float(x.max())
+		ymin, ymax = float(y.min()), float(y.max())
 		if abs(xmax - xmin) < 1e-12:
 			xmax = xmin + 1.0
 		if abs(ymax - ymin) < 1e-12:
@@ -422,93 +653,80 @@ class GraphView:
 		pygame.draw.line(screen, (120, 255, 120), p1, p2, 2)
 
 	
-	def _trim_buffers(self):
-		# Keep only last max_points samples (lightweight realtime)
-		if self.max_points is None:
-			return
-		n = len(self.buf_t_raw)
-		if n <= self.max_points:
-			return
-		cut = n - self.max_points
-		del self.buf_t_raw[:cut]
-		del self.buf_cmX[:cut]
-		del self.buf_deg[:cut]
-		del self.buf_deg0[:cut]
-		del self.buf_setspeed[:cut]
-		del self.buf_r1[:cut]
-		del self.buf_theta_dot[:cut]
-		del self.buf_x_center[:cut]
-
-
-	def _capture_if_running(self, data):
-		if not self.running:
-			return
-		t_raw = data.get("t_raw", [])
-		cmX = data.get("cmX", [])
-		deg = data.get("degree", [])
-		deg0 = data.get("degree0", [])
-		setspeed = data.get("setspeed", [])
-		r1 = data.get("r1", [])
-		theta_dot = data.get("theta_dot", [])
-		x_center = data.get("x_center", [])
-
-		n = min(
-			len(t_raw), len(cmX), len(deg), len(deg0),
-			len(setspeed), len(r1),
-			len(theta_dot), len(x_center)
-		)
-
-		if n <= self._src_last_n:
-			return
-		new_slice = slice(self._src_last_n, n)
-		self.buf_t_raw.extend(t_raw[new_slice])
-		self.buf_cmX.extend(cmX[new_slice])
-		self.buf_deg.extend(deg[new_slice])
-		self.buf_deg0.extend(deg0[new_slice])
-		self.buf_setspeed.extend(setspeed[new_slice])
-		self.buf_r1.extend(r1[new_slice])
-		self.buf_theta_dot.extend(theta_dot[new_slice])
-		self.buf_x_center.extend(x_center[new_slice])
-		self._src_last_n = n
-
-	# helper to pick signal buffer and label based on dropdown key
+	def _window(self):
+		# View (tanpa copy) ke ring untuk sample yang sedang ditampilkan
+		if self.history is None:
+			return None
+		if self.running:
+			self._seq_end = self.history.write_idx
+		# sample < write_idx - capacity sudah tertimpa (window beku saat STOP ikut habis)
+		start = max(self._seq_start, self._seq_end - self.max_points,
+					self.history.write_idx - self.history.capacity)
+		self._win_start = start
+		return self.history.window(start, self._seq_end)
+
+	def _sync_time_axis(self):
+		# Sumbu waktu & regresi mengikuti sesi capture; reset kalau sesi
+		# berganti atau tertinggal lebih jauh dari kapasitas ring.
+		cap = self.history.capacity
+		if self._taxis is None or self._taxis.capacity != cap:
+			self._taxis = _TimeAxis(cap)
+			self._reg = _StreamingRegression(cap)
+			self._session = None
+		ta = self._taxis
+		if self._session != self._seq_start or ta.seq_end > self._seq_end \
+				or ta.seq_end < self._win_start:
+			start = max(self._seq_start, self._win_start)
+			ta.reset(start)
+			self._reg.reset(start)
+			self._session = self._seq_start
+		return ta.extend(self.history, self._seq_end)
+
+	def _yrange(self, field, seq_start, seq_end):
+		# min/max field untuk window [seq_start, seq_end), incremental
+		ext = self._extrema.get(field)
+		if ext is None:
+			ext = self._extrema[field] = _RunningExtrema()
+		if ext.seq_end is None or ext.seq_end < seq_start or ext.seq_end > seq_end \
+				or seq_end - ext.seq_end > self.history.capacity:
+			ext.reset()
+			ext.update(self.history.window(seq_start, seq_end)[field], seq_start)
+		elif ext.seq_end < seq_end:
+			ext.update(self.history.window(ext.seq_end, seq_end)[field], ext.seq_end)
+		ext.trim(seq_start)
+		return ext.get()
+
+	# helper to pick signal field and label based on dropdown key
 	def _pick_signal(self, key):
 		if key == "cmX":
-			return self.buf_cmX, "cmX vs time"
+			return "cmX", "cmX vs time"
 		if key == "degree":
-			return self.buf_deg, "degree vs time"
+			return "degree", "degree vs time"
 		if key == "degree0":
-			return self.buf_deg0, "degree0 vs time"
+			return "degree0", "degree0 vs time"
 		if key == "setspeed":
-			return self.buf_setspeed, "setspeed vs time"
+			return "setspeed", "setspeed vs time"
 		if key == "theta_dot":
-			return self.buf_theta_dot, "theta_dot vs time"
+			return "theta_dot", "theta_dot vs time"
 		if key == "x_center":
-			return self.buf_x_center, "x_center vs time"
+			return "x_center", "x_center vs time"
 		if key == "r1":
-			return self.buf_r1, "r1 (state) vs time"
-		return [], "unknown"
+			return "r1", "r1 (state) vs time"
+		return None, "unknown"
 
 
 	def draw(self, screen, data):
-		# data expected: { "t_raw":[], "cmX":[], "degree":[] }
-		if data is None:
-			data = {}
-        
-		# update capture based on running state
-		self._capture_if_running(data)
-		self._trim_buffers()
+		# data expected: lib_ring.TelemetryRing
+		# bagian dinamis saja: self.area harus sudah di-restore dari chrome
+		t_draw = time.perf_counter()
+		if data is not None:
+			self.history = data
+		win = self._window()
 		# button draw state
 		self.btn_start.text = "STOP" if self.running else "START GRAPH"
 		self.btn_start.draw(screen, self.font_medium, active=self.running, low_sat=self.running)
 		self.btn_reset.draw(screen, self.font_medium, active=False, low_sat=False)
 
-		# draw blocks
-		self._draw_box(screen, self.rect_g1, "GRAFIK 1", COLOR_BORDER)
-		self._draw_box(screen, self.rect_g2, "GRAFIK 2", COLOR_BORDER)
-		self._draw_box(screen, self.rect_reg, "REGRESI", COLOR_BORDER)
-		self._draw_box(screen, self.rect_res, "HASIL REGRESI", COLOR_BORDER_Y)
-
 		# dropdowns (placed in header zones)
 		self.dd1.draw(screen, self.font_small)
 		self.dd2.draw(screen, self.font_small)
@@ -516,38 +734,34 @@ class GraphView:
 		self.dd_reg_y.draw(screen, self.font_small)
 
 		# if not running and buffer empty => show nothing
-		t = _to_seconds(self.buf_t_raw)
-		cmX = self.buf_cmX
-		deg = self.buf_deg
-		deg0 = self.buf_deg0
-		
-		y1, l1 = self._pick_signal(self.dd1.key)
-		y2, l2 = self._pick_signal(self.dd2.key)
-
-
-		n1 = min(len(t), len(y1))
-		n2 = min(len(t), len(y2))
-		if n1 >= 2:
-			self._plot_timeseries(screen, self.rect_g1, t[:n1], y1[:n1], l1)
-		if n2 >= 2:
-			self._plot_timeseries(screen, self.rect_g2, t[:n2], y2[:n2], l2)
-
-		# regression: x=sin(degree), y=accel(degree)
-		if len(t) >= 5 and len(deg0) >= 5:
-			n0 = min(len(t), len(deg0))
-			deg_rad = [math.radians(v) for v in deg0[:n0]]
-			t_use = t[:n0]
-			x = [math.sin(v) for v in deg_rad]
-			dd = _second_derivative(deg_rad, t_use)
-			n = min(len(x), len(dd))
-			if n >= 5:
-				i0 = max(2, n // 50)
-				i1 = n - i0
-				xr = x[:n][i0:i1]
-				yr = dd[:n][i0:i1]
-				a, b = _linreg(xr, yr)
-				self.last_a, self.last_b = a, b
-				self._plot_regression(screen, self.rect_reg, xr, yr, a, b)
+		if win is None or len(win) == 0:
+			win = None
+		t_ok = win is not None and self._sync_time_axis()
+		t_arr = self._taxis.view(self._win_start, self._seq_end) if t_ok else None
+
+		f1, l1 = self._pick_signal(self.dd1.key)
+		f2, l2 = self._pick_signal(self.dd2.key)
+		if t_ok:
+			for rect, field, label in ((self.rect_g1, f1, l1), (self.rect_g2, f2, l2)):
+				if field is None or len(t_arr) < 2:
+					continue
+				yrange = self._yrange(field, self._win_start, self._seq_end)
+				self._plot_timeseries(screen, rect, t_arr, win[field], label, yrange=yrange)
+
+		# regression: x=sin(degree), y=accel(degree), streaming per sample baru
+		if t_ok and len(win) >= 5:
+			reg = self._reg
+			if reg.seq_end < self._seq_end:
+				new = self.history.window(reg.seq_end, self._seq_end)
+				reg.push(self._taxis.view(reg.seq_end, self._seq_end),
+						 np.radians(new["degree0"]), reg.seq_end)
+			n = len(win)
+			i0 = max(2, n // 50)
+			reg.set_range(self._win_start + i0, self._seq_end - i0)
+			a, b = reg.fit()
+			self.last_a, self.last_b = a, b
+			xr, yr = reg.points()
+			self._plot_regression(screen, self.rect_reg, xr, yr, a, b)
 
 		# regression text
 		line1 = f"y = a*x + b"
@@ -573,8 +787,15 @@ class GraphView:
 		# optional: show bias meaning
 		line5 = f"bias b ≈ {b:.4f} rad/s^2 (offset)"
 
-		screen.blit(self.font_small.render(line1, True, COLOR_TEXT), (self.rect_res.x + 10, self.rect_res.y + 42))
-		screen.blit(self.font_small.render(line2, True, COLOR_TEXT), (self.rect_res.x + 10, self.rect_res.y + 64))
-		screen.blit(self.font_small.render(line3, True, COLOR_TEXT), (self.rect_res.x + 10, self.rect_res.y + 86))
-		screen.blit(self.font_small.render(line4, True, COLOR_TEXT), (self.rect_res.x + 10, self.rect_res.y + 108))
-		screen.blit(self.font_small.render(line5, True, COLOR_TEXT), (self.rect_res.x + 10, self.rect_res.y + 130))
+		screen.blit(render_text(self.font_small, line1, COLOR_TEXT), (self.rect_res.x + 10, self.rect_res.y + 42))
+		screen.blit(render_text(self.font_small, line2, COLOR_TEXT), (self.rect_res.x + 10, self.rect_res.y + 64))
+		screen.blit(render_text(self.font_small, line3, COLOR_TEXT), (self.rect_res.x + 10, self.rect_res.y + 86))
+		screen.blit(render_text(self.font_small, line4, COLOR_TEXT), (self.rect_res.x + 10, self.rect_res.y + 108))
+		screen.blit(render_text(self.font_small, line5, COLOR_TEXT), (self.rect_res.x + 10, self.rect_res.y + 130))
+
+		# draw cost readout
+		self.draw_ms = (time.perf_counter() - t_draw) * 1000.0
+		self.draw_ms_avg += (self.draw_ms - self.draw_ms_avg) * 0.1
+		txt = f"draw {self.draw_ms:5.2f} ms (avg {self.draw_ms_avg:5.2f})  n={0 if win is None else len(win)}"
+		screen.blit(render_text(self.font_small, txt, COLOR_TEXT), (self.btn_reset.rect.right + 16, self.btn_reset.rect.y + 10))
+		self.dirty = False
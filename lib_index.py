@@ -0,0 +1,233 @@
+"""
+lib_index.py - Index sesi rekaman di folder logs/
+
+Ringkasan per file log (csv / bin / segmen terkompres) disimpan di sidecar
+logs/.log_index.json, di-update inkremental (hanya file baru / berubah
+berdasarkan size + mtime). Tiap file juga dipecah per blok BLOCK_ROWS baris
+(rentang tick, mode yang muncul, offset byte), sehingga query() bisa
+mengembalikan rentang baris + offset tanpa membuka file.
+"""
+
+import json
+import os
+
+import numpy as np
+
+from lib_data import (LOG_HEADER_SIZE, RECORD_DTYPE, _load_csv, _split_codec,
+                      load_log)
+
+
+INDEX_NAME = ".log_index.json"
+INDEX_VERSION = 1
+BLOCK_ROWS = 256
+LOG_EXTS = (".csv", ".bin")
+
+
+def _mode_key(mode) -> str:
+    return str(int(mode))
+
+
+def _csv_row_offsets(path):
+    """Offset byte awal tiap baris data CSV (urutan sama dengan _load_csv)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    offsets = []
+    pos = data.find(b"\n") + 1  # lewati header
+    while pos < len(data):
+        end = data.find(b"\n", pos)
+        if end < 0:
+            end = len(data)
+        line = data[pos:end].strip()
+        if line:
+            try:
+                float(line.split(b",", 1)[0])
+                offsets.append(pos)
+            except ValueError:
+                pass
+        pos = end + 1
+    return data, offsets
+
+
+def summarize(path) -> dict:
+    """Ringkasan satu file log (tanpa size/mtime)."""
+    base, codec = _split_codec(path)
+    fmt = "csv" if base.endswith(".csv") else "bin"
+    offsets = None
+    if fmt == "csv" and codec is None:
+        text, offsets = _csv_row_offsets(path)
+        data = _load_csv(path, text.decode())
+        if len(offsets) != len(data):
+            offsets = None  # baris aneh: offset tidak bisa dipercaya
+    else:
+        data = load_log(path)
+
+    n = len(data)
+    summary = {
+        "format": fmt,
+        "compressed": codec is not None,
+        "header_size": LOG_HEADER_SIZE if fmt == "bin" else None,
+        "rows": n,
+        "tick_min": None,
+        "tick_max": None,
+        "sorted": True,
+        "modes": {},
+        "columns": {},
+        "blocks": [],
+    }
+    if n == 0:
+        return summary
+
+    tick = np.asarray(data["logtick"], dtype=np.int64)
+    mode = np.asarray(data["mode"])
+    summary["tick_min"] = int(tick.min())
+    summary["tick_max"] = int(tick.max())
+    summary["sorted"] = bool(np.all(tick[1:] >= tick[:-1]))
+    modes, counts = np.unique(mode, return_counts=True)
+    summary["modes"] = {_mode_key(m): int(c) for m, c in zip(modes, counts)}
+    for name in RECORD_DTYPE.names[1:]:
+        col = np.asarray(data[name])
+        summary["columns"][name] = [float(np.nanmin(col)), float(np.nanmax(col))]
+
+    # blok: [row_start, tick_min, tick_max, offset, [modes]]
+    starts = np.arange(0, n, BLOCK_ROWS)
+    tmin = np.minimum.reduceat(tick, starts)
+    tmax = np.maximum.reduceat(tick, starts)
+    for i, row in enumerate(starts.tolist()):
+        if fmt == "bin":
+            offset = LOG_HEADER_SIZE + row * RECORD_DTYPE.itemsize
+        else:
+            offset = offsets[row] if offsets is not None else None
+        block_modes = sorted({_mode_key(m) for m in np.unique(mode[row:row + BLOCK_ROWS])})
+        summary["blocks"].append([row, int(tmin[i]), int(tmax[i]), offset, block_modes])
+    return summary
+
+
+class LogIndex:
+    """
+    Index sidecar folder log.
+
+        idx = LogIndex("logs")
+        idx.update()
+        for hit in idx.query((t0, t1), mode=7):
+            rows = idx.read(hit)
+    """
+
+    def __init__(self, log_dir="logs", path=None):
+        self.log_dir = log_dir
+        self.path = path or os.path.join(log_dir, INDEX_NAME)
+        self.files = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == INDEX_VERSION and data.get("block_rows") == BLOCK_ROWS:
+            self.files = data.get("files", {})
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"version": INDEX_VERSION, "block_rows": BLOCK_ROWS, "files": self.files}, f)
+        os.replace(tmp, self.path)
+
+    def _scan(self):
+        found = {}
+        for name in os.listdir(self.log_dir):
+            base, _ = _split_codec(name)
+            if not base.endswith(LOG_EXTS) or name.endswith(".tmp"):
+                continue
+            st = os.stat(os.path.join(self.log_dir, name))
+            found[name] = (st.st_size, st.st_mtime)
+        return found
+
+    def update(self, save=True):
+        """Index file baru/berubah, buang yang sudah hilang. Return (updated, removed)."""
+        found = self._scan()
+        removed = [name for name in self.files if name not in found]
+        for name in removed:
+            del self.files[name]
+        updated = []
+        for name, (size, mtime) in sorted(found.items()):
+            entry = self.files.get(name)
+            if entry is not None and entry["size"] == size and entry["mtime"] == mtime:
+                continue
+            try:
+                summary = summarize(os.path.join(self.log_dir, name))
+            except (OSError, ValueError) as e:
+                print(f"[INDEX] skip {name}: {e}")
+                continue
+            summary["size"] = size
+            summary["mtime"] = mtime
+            self.files[name] = summary
+            updated.append(name)
+        if save and (updated or removed):
+            self.save()
+        return updated, removed
+
+    def query(self, tick_range=None, mode=None) -> list:
+        """
+        Cari data dengan logtick di tick_range (inklusif) dan/atau mode tertentu.
+        Return list dict: file, row_start, row_stop, offset / offset_stop
+        (byte awal run dan awal blok sesudahnya di stream tak terkompres;
+        offset None kalau tidak diketahui, offset_stop None = sampai akhir
+        file), compressed.
+        Rentang dibulatkan per blok -> pembaca tetap perlu filter persis.
+        """
+        lo, hi = tick_range if tick_range is not None else (None, None)
+        key = None if mode is None else _mode_key(mode)
+        hits = []
+        for name in sorted(self.files):
+            entry = self.files[name]
+            if not entry["rows"]:
+                continue
+            if lo is not None and (entry["tick_max"] < lo or entry["tick_min"] > hi):
+                continue
+            if key is not None and key not in entry["modes"]:
+                continue
+            n = entry["rows"]
+            run = None
+            for row, tmin, tmax, offset, modes in entry["blocks"]:
+                ok = (lo is None or (tmax >= lo and tmin <= hi)) and (key is None or key in modes)
+                if ok and run is None:
+                    run = {"file": os.path.join(self.log_dir, name), "row_start": row,
+                           "row_stop": min(row + BLOCK_ROWS, n), "offset": offset, "offset_stop": None,
+                           "compressed": entry["compressed"]}
+                elif ok:
+                    run["row_stop"] = min(row + BLOCK_ROWS, n)
+                elif run is not None:
+                    run["offset_stop"] = offset
+                    hits.append(run)
+                    run = None
+            if run is not None:
+                hits.append(run)
+        return hits
+
+    def read(self, hit, tick_range=None, mode=None) -> np.ndarray:
+        """
+        Baca baris hasil query() (filter persis kalau tick_range/mode diberikan).
+        File tak terkompres dibaca mulai offset, hanya baris run itu; segmen
+        terkompres / CSV tanpa offset tetap dibuka utuh lewat load_log.
+        """
+        path = hit["file"]
+        n = hit["row_stop"] - hit["row_start"]
+        offset = hit.get("offset")
+        if hit["compressed"] or offset is None:
+            data = load_log(path)[hit["row_start"]:hit["row_stop"]]
+        elif path.endswith(".bin"):
+            data = np.fromfile(path, dtype=RECORD_DTYPE, count=n, offset=offset)
+        else:
+            stop = hit.get("offset_stop")
+            with open(path, "rb") as f:
+                f.seek(offset)
+                text = f.read() if stop is None else f.read(stop - offset)
+            # baris pertama _load_csv = header
+            data = _load_csv(path, "\n" + text.decode())[:n]
+        mask = np.ones(len(data), dtype=bool)
+        if tick_range is not None:
+            mask &= (data["logtick"] >= tick_range[0]) & (data["logtick"] <= tick_range[1])
+        if mode is not None:
+            mask &= data["mode"] == mode
+        return data if mask.all() else data[mask]
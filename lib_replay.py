@@ -0,0 +1,142 @@
+"""
+lib_replay.py - Replay log rekaman lewat pipeline live (tanpa hardware)
+
+LogReplay membaca log (csv / bin / segmen terkompres / manifest sesi) lalu
+memanggil callback dengan ControlStatus, sama seperti
+lib_com.read_control_status. Pacing mengikuti logtick:
+  speed=1.0 real-time, speed=N N kali lebih cepat, speed=0 secepatnya.
+seek(tick) / seek_row(row) boleh dipanggil dari thread lain.
+"""
+
+import threading
+import time
+
+import numpy as np
+
+from lib_com import TICK_SECONDS, ControlStatus, LatencyStats
+from lib_data import load_log, load_session
+
+
+class LogReplay:
+    """
+    Sumber sample dari log rekaman.
+
+        replay = LogReplay("logs/log_20251210_151404.csv", speed=4.0)
+        threading.Thread(target=replay_control_status, args=(replay,),
+                         kwargs={"callback": on_sample}, daemon=True).start()
+    """
+
+    def __init__(self, source, speed=1.0, loop=False, batch=256):
+        if isinstance(source, np.ndarray):
+            self.data = source
+        elif str(source).endswith(".manifest.json"):
+            self.data = load_session(source)
+        else:
+            self.data = load_log(source)
+        self.speed = speed
+        self.loop = loop
+        self.batch = int(batch)
+
+        ticks = np.asarray(self.data["logtick"], dtype=np.float64)
+        self.scale = TICK_SECONDS
+        self._ticks = ticks
+        self._lock = threading.Lock()
+        self._pos = 0
+        self._anchor = None   # (tick, perf_counter) acuan pacing
+        self._stop = threading.Event()
+        self.done = threading.Event()
+        self.sent = 0
+
+    def __len__(self):
+        return len(self.data)
+
+    @property
+    def position(self) -> int:
+        return self._pos
+
+    def seek_row(self, row: int):
+        with self._lock:
+            self._pos = max(0, min(int(row), len(self.data)))
+            self._anchor = None
+
+    def seek(self, tick):
+        """Lompat ke sample pertama dengan logtick >= tick (log diasumsikan urut)."""
+        self.seek_row(int(np.searchsorted(self._ticks, tick, side="left")))
+
+    def set_speed(self, speed):
+        with self._lock:
+            self.speed = speed
+            self._anchor = None
+
+    def stop(self):
+        self._stop.set()
+
+    def next_batch(self):
+        """
+        Blok sampai ada sample yang jatuh tempo, return array record
+        (kosong kalau selesai / stop).
+        """
+        while not self._stop.is_set():
+            with self._lock:
+                pos = self._pos
+                n = len(self.data)
+                if pos >= n:
+                    if not self.loop or n == 0:
+                        return self.data[:0]
+                    self._pos = pos = 0
+                    self._anchor = None
+                speed = self.speed
+                if not speed:
+                    end = min(pos + self.batch, n)
+                    self._pos = end
+                    return self.data[pos:end]
+                now = time.perf_counter()
+                if self._anchor is None:
+                    self._anchor = (self._ticks[pos], now)
+                tick0, t0 = self._anchor
+                # tick yang sudah jatuh tempo sekarang
+                due_tick = tick0 + (now - t0) * speed / self.scale
+                end = int(np.searchsorted(self._ticks, due_tick, side="right"))
+                end = min(max(end, pos), pos + self.batch, n)
+                if end > pos:
+                    self._pos = end
+                    return self.data[pos:end]
+                wait = (self._ticks[pos] - due_tick) * self.scale / speed
+            self._stop.wait(min(max(wait, 0.0), 0.05))
+        return self.data[:0]
+
+
+def replay_control_status(replay, callback=None, ack_callback=None, reset_ack_callback=None, debug: bool = False,
+                          latency: LatencyStats = None):
+    """
+    Pengganti read_control_status(ser, ...) untuk LogReplay: kontrak
+    callback sama (ControlStatus per sample). ack_callback /
+    reset_ack_callback tidak pernah dipanggil (log tidak berisi ACK).
+    Return setelah log habis (kecuali loop=True) atau replay.stop().
+    """
+    perf_counter = time.perf_counter
+    while True:
+        records = replay.next_batch()
+        if len(records) == 0:
+            break
+        handle_records(records, perf_counter(), callback, debug, latency)
+        replay.sent += len(records)
+    replay.done.set()
+
+
+def handle_records(records, t_arrival, callback=None, debug: bool = False, latency: LatencyStats = None):
+    """Satu batch record -> callback per ControlStatus (juga dipakai lib_aio.replay_reader)."""
+    perf_counter = time.perf_counter
+    samples = ControlStatus.from_records(records)
+    if debug:
+        for s in samples:
+            print(f"[REPLAY] tick={s.logtick:8d} deg={s.degree:8.3f} "
+                  f"cmX={s.cmX:8.3f} set={s.setspeed:8.3f}")
+    if callback is not None:
+        if latency is not None:
+            for sample in samples:
+                latency.add(perf_counter() - t_arrival)
+                callback(sample)
+        else:
+            for sample in samples:
+                callback(sample)
@@ -0,0 +1,60 @@
+"""
+lib_ring.py - Ring buffer NumPy untuk history telemetry
+
+Satu buffer structured yang dialokasikan sekali, ditulis oleh thread RX
+dan dibaca GUI lewat view (tanpa copy).
+"""
+
+import numpy as np
+
+
+HIST_FIELDS = ("t_raw", "cmX", "degree", "degree0", "setspeed", "r1", "theta_dot", "x_center")
+HIST_DTYPE = np.dtype([(name, np.float64) for name in HIST_FIELDS])
+
+
+class TelemetryRing:
+    """
+    Ring buffer history telemetry.
+
+    - write_idx monotonic (jumlah sample yang pernah ditulis), jadi
+      pembaca cukup simpan nomor urut sendiri, tidak perlu cursor fix-up.
+    - Tiap sample ditulis dua kali (slot i dan i + capacity), sehingga
+      N sample terakhir selalu berurutan di memori -> window() = view.
+    - Satu penulis (thread RX). write_idx dinaikkan setelah data ditulis,
+      jadi window sampai write_idx yang dibaca selalu lengkap.
+    """
+
+    def __init__(self, capacity: int = 4096):
+        self.capacity = int(capacity)
+        self._buf = np.zeros(2 * self.capacity, dtype=HIST_DTYPE)
+        self.write_idx = 0
+
+    def __len__(self):
+        return min(self.write_idx, self.capacity)
+
+    def append(self, row):
+        """row: tuple sesuai urutan HIST_FIELDS."""
+        i = self.write_idx % self.capacity
+        buf = self._buf
+        buf[i] = row
+        buf[i + self.capacity] = row
+        self.write_idx += 1
+
+    def window(self, start: int, end: int = None):
+        """
+        View structured untuk sample nomor [start, end).
+        Otomatis dipotong ke `capacity` sample terakhir yang ditulis
+        (sample < write_idx - capacity sudah tertimpa -> tidak dikembalikan).
+        """
+        if end is None:
+            end = self.write_idx
+        start = max(start, self.write_idx - self.capacity, 0)
+        if end <= start:
+            return self._buf[:0]
+        e = end % self.capacity + self.capacity
+        return self._buf[e - (end - start):e]
+
+    def latest(self, n: int):
+        """View n sample terakhir."""
+        end = self.write_idx
+        return self.window(end - n, end)
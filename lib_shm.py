@@ -0,0 +1,268 @@
+"""
+lib_shm.py - Bus telemetry shared memory untuk konsumen lokal
+
+Pipeline RX (PendulumMonitor.on_control_status) menulis tiap sample ke
+ring di multiprocessing.shared_memory; proses lain di mesin yang sama
+(notebook analisis, GUI kedua, recorder) membaca lewat ShmReader tanpa
+socket dan tanpa copy.
+
+Layout segmen:
+
+    offset size
+    0      8    magic b"PDSHM\\x00\\x00\\x01"
+    8      2    version (1)
+    10     2    header_size (64)
+    12     4    record_size (68, RECORD_DTYPE)
+    16     4    capacity (sample)
+    20     4    reserved
+    24     8    created (time.time())
+    32     8    begin  \\  counter uint64 (jumlah sample), lihat di bawah
+    40     8    end    /
+    48     8    pid penulis
+    56     8    closed (1 = penulis sudah close)
+    64     ...  2 * capacity record RECORD_DTYPE (payload serial 68 byte)
+
+Seperti lib_ring.TelemetryRing, tiap sample ditulis dua kali (slot i dan
+i + capacity) supaya window <= capacity sample selalu berurutan -> view.
+
+Protokol versi (seqlock per sample, satu penulis, banyak pembaca):
+- penulis: begin = n + 1, tulis slot, end = n + 1
+- pembaca: baca end, pakai sample [start, end), lalu baca begin;
+  data masih utuh kalau start >= begin - capacity (belum tertimpa).
+Counter ditulis sebagai word 8 byte aligned (atomic di x86/ARM64).
+"""
+
+import atexit
+import mmap
+import os
+import struct
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from lib_com import STATUS_STRUCT
+from lib_data import RECORD_DTYPE
+
+SHM_MAGIC = b"PDSHM\x00\x00\x01"
+SHM_VERSION = 1
+SHM_HEADER_SIZE = 64
+SHM_HEADER_STRUCT = struct.Struct("<8sHHII4xd")  # magic, version, header, record, capacity, created
+SHM_NAME = "pendulum_telemetry"
+SHM_CAPACITY = 65536
+
+# index word uint64 di header
+_BEGIN, _END, _PID, _CLOSED = 4, 5, 6, 7
+
+
+def _segment_size(capacity: int) -> int:
+    return SHM_HEADER_SIZE + 2 * capacity * RECORD_DTYPE.itemsize
+
+
+def _pid_alive(pid: int) -> bool:
+    if os.name != "posix":
+        # Windows: segmen hilang saat handle terakhir ditutup -> kalau masih ada, masih dipakai
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _map_readonly(name: str) -> mmap.mmap:
+    """
+    Map segmen yang sudah ada read-only (PROT_READ / FILE_MAP_READ).
+    Tidak lewat SharedMemory: attach di sana ikut mendaftarkan segmen ke
+    resource_tracker, yang lalu meng-unlink segmen milik penulis saat exit.
+    """
+    if os.name == "posix":
+        import _posixshmem
+        fd = _posixshmem.shm_open("/" + name, os.O_RDONLY, mode=0o600)
+        try:
+            return mmap.mmap(fd, os.fstat(fd).st_size, prot=mmap.PROT_READ)
+        finally:
+            os.close(fd)
+    head = mmap.mmap(-1, SHM_HEADER_SIZE, tagname=name, access=mmap.ACCESS_READ)
+    try:
+        capacity = SHM_HEADER_STRUCT.unpack_from(head)[4]
+    finally:
+        head.close()
+    return mmap.mmap(-1, _segment_size(capacity), tagname=name, access=mmap.ACCESS_READ)
+
+
+def _read_header(buf, name):
+    magic, version, header_size, record_size, capacity, created = SHM_HEADER_STRUCT.unpack_from(buf)
+    if magic != SHM_MAGIC or record_size != RECORD_DTYPE.itemsize or header_size != SHM_HEADER_SIZE:
+        raise ValueError(f"{name}: bukan bus telemetry v{SHM_VERSION}")
+    return capacity, created
+
+
+class ShmPublisher:
+    """
+    Penulis bus (satu per nama segmen, dipanggil dari satu thread RX).
+
+        bus = ShmPublisher()
+        bus.publish(sample)   # ControlStatus atau tuple 9 nilai
+        bus.close()           # tandai closed + unlink segmen
+    """
+
+    def __init__(self, name: str = SHM_NAME, capacity: int = SHM_CAPACITY):
+        self.name = name
+        self.capacity = int(capacity)
+        try:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=_segment_size(self.capacity))
+        except FileExistsError:
+            # sisa proses yang crash (POSIX: /dev/shm tidak ikut hilang) -> buang
+            head = _map_readonly(name)
+            words = memoryview(head)[:SHM_HEADER_SIZE].cast("Q")
+            pid, closed = words[_PID], words[_CLOSED]
+            words.release()
+            head.close()
+            if not closed and _pid_alive(pid):
+                raise FileExistsError(f"bus {name} masih dipakai proses {pid}")
+            old = shared_memory.SharedMemory(name=name, create=False)
+            old.close()
+            old.unlink()
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=_segment_size(self.capacity))
+
+        buf = self._shm.buf
+        SHM_HEADER_STRUCT.pack_into(buf, 0, SHM_MAGIC, SHM_VERSION, SHM_HEADER_SIZE, RECORD_DTYPE.itemsize,
+                                    self.capacity, time.time())
+        self._words = buf[:SHM_HEADER_SIZE].cast("Q")
+        self._words[_BEGIN] = 0
+        self._words[_END] = 0
+        self._words[_PID] = os.getpid()
+        self._words[_CLOSED] = 0
+        self._data = buf[SHM_HEADER_SIZE:]
+        self._record_size = RECORD_DTYPE.itemsize
+        self._mirror = self.capacity * self._record_size
+        self.count = 0
+        # pemilik yang tidak sempat close() (mode thread benchCom) -> segmen tetap dibersihkan
+        atexit.register(self.close)
+
+    def publish(self, sample):
+        """Tulis satu sample (payload .raw ControlStatus tanpa repack)."""
+        payload = getattr(sample, "raw", None)
+        if payload is None:
+            payload = STATUS_STRUCT.pack(*sample)
+        n = self.count
+        off = (n % self.capacity) * self._record_size
+        end = off + self._record_size
+        words = self._words
+        words[_BEGIN] = n + 1
+        self._data[off:end] = payload
+        self._data[off + self._mirror:end + self._mirror] = payload
+        words[_END] = n + 1
+        self.count = n + 1
+
+    def close(self):
+        """Tandai closed (pembaca berhenti menunggu), lalu unlink segmen."""
+        if self._shm is None:
+            return
+        self._words[_CLOSED] = 1
+        self._words.release()
+        self._data.release()
+        self._shm.close()
+        try:
+            self._shm.unlink()
+        except FileNotFoundError:
+            pass
+        self._shm = None
+        atexit.unregister(self.close)
+
+
+class ShmReader:
+    """
+    Pembaca bus (proses lain, berapa pun jumlahnya; tidak menulis ke segmen).
+
+        bus = ShmReader()
+        while True:
+            new = bus.poll()        # view read-only RECORD_DTYPE, tanpa copy
+            ...pakai new...
+            if not bus.valid():     # penulis sudah melewati satu putaran ring?
+                ...buang hasil...
+            time.sleep(0.01)
+
+    read() = poll() + copy yang sudah divalidasi (aman disimpan).
+    """
+
+    def __init__(self, name: str = SHM_NAME, from_start: bool = False):
+        self.name = name
+        self._map = _map_readonly(name)
+        self.capacity, self.created = _read_header(self._map, name)
+        self._words = memoryview(self._map)[:SHM_HEADER_SIZE].cast("Q")
+        # mapping read-only -> view juga read-only
+        self._ring = np.frombuffer(self._map, dtype=RECORD_DTYPE, count=2 * self.capacity,
+                                   offset=SHM_HEADER_SIZE)
+        self.cursor = self._oldest() if from_start else self._words[_END]
+        self._view_start = self.cursor
+        self.dropped = 0
+
+    @property
+    def closed(self) -> bool:
+        return self._map is None or bool(self._words[_CLOSED])
+
+    @property
+    def writer_pid(self) -> int:
+        return self._words[_PID]
+
+    def _oldest(self) -> int:
+        """Nomor sample tertua yang masih utuh."""
+        return max(0, self._words[_BEGIN] - self.capacity)
+
+    def _window(self, start, end):
+        e = end % self.capacity + self.capacity
+        return self._ring[e - (end - start):e]
+
+    def available(self) -> int:
+        return self._words[_END] - self.cursor
+
+    def poll(self, max_n: int = None) -> np.ndarray:
+        """
+        View sample baru sejak poll() terakhir (maks max_n, tanpa copy).
+        Pembaca yang tertinggal > capacity melompat ke sample tertua, loncatan
+        dihitung di `dropped`.
+        """
+        end = self._words[_END]
+        start = max(self.cursor, self._oldest())
+        self.dropped += start - self.cursor
+        if max_n is not None:
+            end = min(end, start + max_n)
+        self.cursor = end
+        self._view_start = start
+        return self._window(start, end)
+
+    def valid(self) -> bool:
+        """True kalau view dari poll() terakhir belum tertimpa penulis."""
+        return self._view_start >= self._words[_BEGIN] - self.capacity
+
+    def read(self, max_n: int = None) -> np.ndarray:
+        """Seperti poll(), tapi copy; sample yang tertimpa saat copy dibuang dari depan."""
+        view = self.poll(max_n)
+        out = view.copy()
+        lost = self._oldest() - self._view_start
+        if lost > 0:
+            self.dropped += min(lost, len(out))
+            out = out[lost:]
+        return out
+
+    def latest(self, n: int) -> np.ndarray:
+        """View n sample terakhir (tidak menggeser cursor)."""
+        end = self._words[_END]
+        start = max(end - n, self._oldest())
+        return self._window(start, end)
+
+    def close(self):
+        if self._map is None:
+            return
+        self._words.release()
+        self._ring = None
+        try:
+            self._map.close()
+        except BufferError:
+            # masih ada view poll()/latest() yang dipegang pemanggil; mmap dilepas oleh GC
+            pass
+        self._map = None
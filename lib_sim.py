@@ -0,0 +1,316 @@
+"""
+lib_sim.py - Simulator STM32 di sisi serial (tanpa hardware)
+
+STM32Sim berperan sebagai board: kirim frame control status 0xAA 0xCC
+dengan rate tertentu (50 Hz .. 5 kHz), jawab paket gains (0x02) dengan
+ACK 0xAA 0xDD dan reset (0x03) dengan 0xAA 0xEE, plus injeksi noise
+(byte sampah) dan CRC rusak.
+
+Transport:
+- port_pair(): sepasang port in-process mirip serial.Serial
+  (read/write/in_waiting/timeout), jalan di Windows juga.
+- open_pty() (POSIX): pasangan pty, sisi host dibuka pakai open_serial()
+  seperti port asli.
+Catatan: loop:// pyserial hanya memantulkan tulisan sendiri, jadi tidak
+bisa jadi dua ujung (host <-> board).
+"""
+
+import math
+import os
+import random
+import threading
+import time
+
+import numpy as np
+
+from lib_com import (CRC_STRUCT, GAINS_ACK_STRUCT, GAINS_BODY_STRUCT, JOY_BODY_STRUCT,
+                     RESET_BODY_STRUCT, make_status_packet)
+
+
+# ============================================================
+# TRANSPORT
+# ============================================================
+class _Pipe:
+    def __init__(self):
+        self.buf = bytearray()
+        self.cond = threading.Condition()
+        self.closed = False
+
+
+class SimPort:
+    """Satu ujung port virtual; API minimal serial.Serial yang dipakai lib_com."""
+
+    def __init__(self, rx: _Pipe, tx: _Pipe, timeout=0.05):
+        self._rx = rx
+        self._tx = tx
+        self.timeout = timeout
+        self.is_open = True
+
+    @property
+    def in_waiting(self) -> int:
+        return len(self._rx.buf)
+
+    def read(self, size=1) -> bytes:
+        rx = self._rx
+        with rx.cond:
+            if not rx.buf and self.timeout and not rx.closed:
+                rx.cond.wait_for(lambda: rx.buf or rx.closed, self.timeout)
+            data = bytes(rx.buf[:size])
+            del rx.buf[:size]
+        return data
+
+    def write(self, data) -> int:
+        tx = self._tx
+        with tx.cond:
+            tx.buf += data
+            tx.cond.notify_all()
+        return len(data)
+
+    def reset_input_buffer(self):
+        with self._rx.cond:
+            self._rx.buf.clear()
+
+    def close(self):
+        self.is_open = False
+        for pipe in (self._rx, self._tx):
+            with pipe.cond:
+                pipe.closed = True
+                pipe.cond.notify_all()
+
+
+def port_pair(timeout=0.05):
+    """Return (host_port, device_port)."""
+    a, b = _Pipe(), _Pipe()
+    return SimPort(a, b, timeout), SimPort(b, a, timeout)
+
+
+class _FdPort:
+    """Sisi board dari pty (fd master)."""
+
+    def __init__(self, fd, timeout=0.05):
+        self.fd = fd
+        self.timeout = timeout
+
+    def read(self, size=1) -> bytes:
+        import select
+        ready, _, _ = select.select([self.fd], [], [], self.timeout)
+        if not ready:
+            return b""
+        try:
+            return os.read(self.fd, size)
+        except OSError:
+            return b""
+
+    def write(self, data) -> int:
+        return os.write(self.fd, data)
+
+    def close(self):
+        os.close(self.fd)
+
+
+def open_pty():
+    """
+    (POSIX) Return (device_port, host_path). Host membuka host_path
+    dengan open_serial(host_path, baud, timeout=...).
+    """
+    import tty
+    master, slave = os.openpty()
+    tty.setraw(slave)
+    path = os.ttyname(slave)
+    port = _FdPort(master)
+    port._slave = slave   # tetap terbuka supaya master tidak EIO
+    return port, path
+
+
+# ============================================================
+# SUMBER DATA
+# ============================================================
+def sine_source(t, sim):
+    """Data sintetis: pendulum berayun kecil + cart bergerak sinus."""
+    deg = 180.0 - 5.0 * math.sin(2 * math.pi * 0.8 * t)
+    cmX = 10.0 * math.sin(2 * math.pi * 0.2 * t)
+    theta = math.radians(deg - 180.0)
+    theta_dot = -5.0 * 2 * math.pi * 0.8 * math.cos(2 * math.pi * 0.8 * t) * math.pi / 180.0
+    return (deg, cmX, 0.0, 0.0, theta_dot, theta, 40.0, float(sim.mode))
+
+
+# ============================================================
+# BOARD
+# ============================================================
+# paket PC -> STM32: AA 55 + body(type, seq, ...) + CRC
+_HOST_PACKETS = {
+    0x01: (JOY_BODY_STRUCT.size, 65535),   # joystick, CRC modulo 65535
+    0x02: (GAINS_BODY_STRUCT.size, 65536),
+    0x03: (RESET_BODY_STRUCT.size, 65536),
+}
+
+
+class STM32Sim:
+    """
+    Board STM32 virtual.
+
+        host, dev = port_pair()
+        sim = STM32Sim(dev, rate_hz=1000, crc_error_rate=0.01)
+        sim.start()
+        read_control_status(host, callback=...)
+
+    source(t, sim) -> 8 nilai (degree, cmX, setspeed, r1, theta_dot, theta,
+    x_center, mode), dipanggil per frame dengan t = waktu simulasi (detik).
+    logtick = waktu simulasi dalam ms (floor, seperti HAL_GetTick; di atas
+    1 kHz beberapa frame berbagi tick). Waktu kirim frame pertama tiap tick
+    bisa diambil lagi lewat sent_time(logtick) untuk ukur latency.
+    """
+
+    SENT_RING = 1 << 16
+
+    def __init__(self, port, rate_hz=500.0, source=None, crc_error_rate=0.0, noise_rate=0.0,
+                 seed=None, max_batch=64):
+        self.port = port
+        self.rate_hz = float(rate_hz)
+        self.source = source or sine_source
+        self.crc_error_rate = crc_error_rate
+        self.noise_rate = noise_rate
+        self.max_batch = max_batch
+        self._last_tick = -1
+        self._rng = random.Random(seed)
+
+        self.mode = 7
+        self.gains = None
+        # hook opsional (mis. lib_cartpole.CartPoleSource): on_gains(tuple5), on_reset()
+        self.on_gains = None
+        self.on_reset = None
+        self._sent_at = np.zeros(self.SENT_RING)
+
+        # stats
+        self.frames_sent = 0
+        self.frames_corrupted = 0
+        self.noise_bytes = 0
+        self.gains_acks = 0
+        self.reset_acks = 0
+        self.joystick_packets = 0
+        self.bad_packets = 0
+
+        self._stop = threading.Event()
+        self._threads = []
+
+    # ---------------- API ----------------
+
+    def start(self):
+        for target in (self._tx_loop, self._rx_loop):
+            th = threading.Thread(target=target, daemon=True)
+            th.start()
+            self._threads.append(th)
+        return self
+
+    def stop(self):
+        self._stop.set()
+        for th in self._threads:
+            th.join(1.0)
+
+    def sent_time(self, logtick) -> float:
+        """perf_counter saat frame (pertama) dengan logtick ini ditulis ke port."""
+        return self._sent_at[int(logtick) % self.SENT_RING]
+
+    def stats(self) -> dict:
+        return {
+            "frames_sent": self.frames_sent,
+            "frames_corrupted": self.frames_corrupted,
+            "noise_bytes": self.noise_bytes,
+            "gains_acks": self.gains_acks,
+            "reset_acks": self.reset_acks,
+            "joystick_packets": self.joystick_packets,
+            "bad_packets": self.bad_packets,
+        }
+
+    # ---------------- frame ----------------
+
+    def _frame(self, index):
+        t = index / self.rate_hz
+        pkt = make_status_packet(int(index * 1000.0 / self.rate_hz), self.source(t, self))
+        rng = self._rng
+        if self.crc_error_rate and rng.random() < self.crc_error_rate:
+            pkt = bytearray(pkt)
+            pkt[4 + rng.randrange(68)] ^= 0xFF
+            pkt = bytes(pkt)
+            self.frames_corrupted += 1
+        if self.noise_rate and rng.random() < self.noise_rate:
+            n = rng.randint(1, 16)
+            pkt = bytes(rng.getrandbits(8) for _ in range(n)) + pkt
+            self.noise_bytes += n
+        return pkt
+
+    def _tx_loop(self):
+        perf_counter = time.perf_counter
+        t0 = perf_counter()
+        index = 0
+        while not self._stop.is_set():
+            due = int((perf_counter() - t0) * self.rate_hz) + 1
+            if due <= index:
+                self._stop.wait(min((index - due + 1) / self.rate_hz, 0.002))
+                continue
+            end = min(due, index + self.max_batch)
+            chunk = b"".join(self._frame(i) for i in range(index, end))
+            now = perf_counter()
+            ticks = (np.arange(index, end) * 1000.0 / self.rate_hz).astype(np.int64)
+            new = ticks[ticks > self._last_tick]
+            self._sent_at[new % self.SENT_RING] = now
+            self._last_tick = ticks[-1]
+            self.port.write(chunk)
+            self.frames_sent += end - index
+            index = end
+
+    # ---------------- perintah PC ----------------
+
+    def _rx_loop(self):
+        buf = bytearray()
+        while not self._stop.is_set():
+            data = self.port.read(256)
+            if not data:
+                continue
+            buf += data
+            while True:
+                idx = buf.find(b"\xAA\x55")
+                if idx < 0:
+                    del buf[:max(0, len(buf) - 1)]
+                    break
+                if idx:
+                    del buf[:idx]
+                if len(buf) < 3:
+                    break
+                spec = _HOST_PACKETS.get(buf[2])
+                if spec is None:
+                    self.bad_packets += 1
+                    del buf[:2]
+                    continue
+                body_len, mod = spec
+                total = 2 + body_len + 2
+                if len(buf) < total:
+                    break
+                body = bytes(buf[2:2 + body_len])
+                crc = CRC_STRUCT.unpack_from(buf, 2 + body_len)[0]
+                if crc != sum(body) % mod:
+                    self.bad_packets += 1
+                    del buf[:2]
+                    continue
+                del buf[:total]
+                self._handle(body)
+
+    def _handle(self, body):
+        typ = body[0]
+        if typ == 0x01:
+            self.joystick_packets += 1
+        elif typ == 0x02:
+            _, _, *gains = GAINS_BODY_STRUCT.unpack(body)
+            self.gains = tuple(gains)
+            if self.on_gains is not None:
+                self.on_gains(self.gains)
+            payload = GAINS_ACK_STRUCT.pack(*gains)
+            self.port.write(b"\xAA\xDD" + payload + CRC_STRUCT.pack(sum(payload) & 0xFFFF))
+            self.gains_acks += 1
+        elif typ == 0x03:
+            self.mode = 1   # kembali ke WAITING
+            if self.on_reset is not None:
+                self.on_reset()
+            payload = b"\x01"
+            self.port.write(b"\xAA\xEE" + payload + CRC_STRUCT.pack(sum(payload) & 0xFFFF))
+            self.reset_acks += 1
@@ -30,20 +30,23 @@ def get_buttons_mask(js) -> int:
     return m & 0xFFFF
 
 
+def joystick_packet(js, seq: int) -> bytes:
+    """State joystick sekarang -> paket 0x01."""
+    ax = scale_axis(js.get_axis(0))
+    ay = scale_axis(js.get_axis(1))
+    rx = scale_axis(js.get_axis(2) if js.get_numaxes() > 2 else 0.0)
+    ry = scale_axis(js.get_axis(3) if js.get_numaxes() > 3 else 0.0)
+    buttons = get_buttons_mask(js)
+    return make_packet(seq, ax, ay, rx, ry, buttons)
+
+
 def joystick_sender(js, ser, fps=50):
     """Thread pengirim joystick → STM32, 50 Hz."""
     period = 1.0 / fps
     seq = 0
     while True:
         pygame.event.pump()  # supaya state joystick update
-        ax = scale_axis(js.get_axis(0))
-        ay = scale_axis(js.get_axis(1))
-        rx = scale_axis(js.get_axis(2) if js.get_numaxes() > 2 else 0.0)
-        ry = scale_axis(js.get_axis(3) if js.get_numaxes() > 3 else 0.0)
-        buttons = get_buttons_mask(js)
-
-        pkt = make_packet(seq, ax, ay, rx, ry, buttons)
-        ser.write(pkt)
+        ser.write(joystick_packet(js, seq))
         seq = (seq + 1) & 0xFF
 
         time.sleep(period)
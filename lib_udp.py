@@ -2,45 +2,161 @@
 lib_udp.py - UDP Broadcaster untuk Pendulum Data
 
 Menerima data dari STM32 via serial, lalu broadcast via UDP.
+Thread RX hanya memasukkan sample ke queue; pengiriman (sendto) jalan di
+thread sender sendiri atau task asyncio (lib_aio.udp_sender).
+
+Fan-out: banyak target (broadcast / unicast / multicast), masing-masing
+dengan rate dan subset field sendiri. Target dengan (rate, field) sama
+digabung jadi satu rate group: decimation dan encode datagram sekali per
+group, lalu datagram yang sama dikirim ke semua alamat di group.
+Receiver bisa subscribe sendiri lewat datagram kontrol (lib_wire.encode_subscribe)
+ke control_port.
 """
 
+import ipaddress
 import socket
-import struct
 import threading
-from typing import Optional, Tuple
+import time
+from typing import Optional
+
+import numpy as np
+
+from lib_com import STATUS_STRUCT, TICK_SECONDS, LatencyStats
+from lib_data import RECORD_DTYPE, SampleQueue
+from lib_wire import (FIELD_MASK_ALL, MTU_PAYLOAD, OP_SUBSCRIBE, decode_control, encode_datagram, field_mask,
+                      mask_fields, max_samples)
+
+ERROR_LOG_INTERVAL = 5.0  # detik, error kirim dicetak maksimal sekali per interval
+MAX_SUBSCRIBERS = 64      # batas subscriber lewat datagram kontrol
+FULL_RATE_HZ = 10000.0    # rate >= ini dianggap full rate (tanpa decimation)
+
+
+class RateGroup:
+    """Target-target dengan rate + field_mask sama (state decimation + seq bersama)."""
+
+    def __init__(self, rate_hz, mask, batch):
+        self.rate_hz = rate_hz      # None = full rate
+        self.mask = mask
+        self.batch = batch
+        self.addrs = []
+        self.seq = 0
+        self.last_slot = -1.0
+        self.packet_count = 0
+        self.sample_count = 0
+
+    def select(self, ticks):
+        """
+        Index sample yang dikirim: sample pertama di tiap slot 1/rate_hz
+        waktu data (logtick), bukan waktu host -> rate keluaran tetap benar
+        untuk chunk serial yang datang bergerombol dan replay speed berapa pun.
+        """
+        if self.rate_hz is None:
+            return None
+        slots = np.floor(ticks * (TICK_SECONDS * self.rate_hz))
+        prev = self.last_slot
+        if slots[0] < prev:
+            # logtick mundur (reset STM32, replay seek / loop): mulai ulang
+            prev = slots[0] - 1
+        keep = np.flatnonzero(np.diff(slots, prepend=prev) > 0)
+        self.last_slot = slots[-1]
+        return keep
 
 
 class UDPBroadcaster:
     """
     UDP broadcaster untuk pendulum control status.
     
-    Mengirim data dalam format binary yang sama dengan serial protocol:
-    - uint32: logtick
-    - 6x double: degree, cmX, setspeed, reserved[0-2]
-    Total: 4 + 48 = 52 bytes
+    Datagram format lib_wire v1: header 16 byte (magic, version, seq,
+    count, field_mask) + sampai `batch` record control status (payload
+    serial 68 byte, atau subset field). seq berjalan per rate group, jadi
+    tiap subscriber melihat seq kontinu.
+    
+    send_control_status() hanya append ke SampleQueue (single producer,
+    tanpa lock, penuh -> buang sample tertua). Tiap max_delay detik
+    sender mengambil semua isi queue, memecahnya jadi datagram `batch`
+    sample, lalu mengirim semuanya sekaligus.
     """
     
-    def __init__(self, broadcast_ip: str = "192.168.1.255", port: int = 4000):
+    def __init__(self, broadcast_ip: str = "192.168.1.255", port: int = 4000, batch: int = 1,
+                 max_delay: float = 0.02, fields=None, mtu: int = MTU_PAYLOAD, queue_size: int = 8192,
+                 threaded: bool = True, targets=None, control_port: Optional[int] = None,
+                 multicast_ttl: int = 1):
         """
         Initialize UDP broadcaster.
         
         Args:
             broadcast_ip: IP broadcast address (e.g., "192.168.1.255")
             port: UDP port number
+            batch: sample per datagram (dibatasi MTU)
+            max_delay: interval sender (detik) = umur maksimum sample di queue
+            fields: subset STATUS_FIELDS yang dikirim (None = semua)
+            mtu: payload UDP maksimum per datagram
+            queue_size: sample maksimum antre ke sender
+            threaded: False -> tanpa thread sender, pemilik memanggil
+                      pump() (lib_aio.udp_sender) atau start()
+            targets: list (ip, port, rate_hz, fields) statis; None ->
+                     [(broadcast_ip, port, None, fields)]
+            control_port: port UDP untuk datagram subscribe (None = off)
+            multicast_ttl: TTL untuk target multicast
         """
-        self.broadcast_ip = broadcast_ip
-        self.port = port
+        if targets is None:
+            targets = [(broadcast_ip, port, None, fields)]
+        # target pertama (untuk log / stats lama); targets=[] -> hanya subscriber
+        self.broadcast_ip, self.port = (targets[0][0], targets[0][1]) if targets else (None, None)
         self.enabled = False
+        self.mtu = mtu
+        self.batch = max(1, int(batch))
+        self.max_delay = max_delay
+        self.multicast_ttl = multicast_ttl
+        self._targets = {}    # (ip, port) -> (rate_hz, mask, expires | None)
+        self._groups = []
+        self._groups_dirty = True
+        self._next_expiry_check = 0.0
+        self._queue = SampleQueue(maxsize=queue_size, policy="drop_oldest")
+        self._send_lock = threading.RLock()   # handle_control -> add_target di dalam pump()
+        self._stop = threading.Event()
+        self._thread = None
         
         # Create UDP socket
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        # asyncio DatagramTransport di atas self.sock (lib_aio.attach_udp)
+        self.transport = None
+        self._multicast_set = False
+        for target in targets:
+            self.add_target(*target)
+        
+        # socket kontrol non-blocking, dibaca di pump()
+        self.control_port = control_port
+        self._ctrl_sock = None
+        if control_port is not None:
+            self._ctrl_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._ctrl_sock.bind(("", control_port))
+            self._ctrl_sock.setblocking(False)
         
         # Stats
         self.packet_count = 0
+        self.sample_count = 0
         self.last_send_time = 0
+        self.error_count = 0          # datagram gagal dikirim
+        self.error_samples = 0        # sample di dalam datagram gagal
+        self.send_latency = LatencyStats()   # masuk queue -> sendto selesai
+        self._errors_suppressed = 0
+        self._last_error_log = 0.0
         
-        print(f"[UDP] Broadcaster initialized: {broadcast_ip}:{port}")
+        if threaded:
+            self.start()
+        
+        ctrl = f", control port {control_port}" if control_port is not None else ""
+        print(f"[UDP] Broadcaster initialized: {', '.join(f'{ip}:{port}' for ip, port in self._targets)} "
+              f"(batch {self.batch}{ctrl})")
+    
+    def start(self):
+        """Nyalakan thread sender (sekali saja)."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._sender_loop, daemon=True)
+        self._thread.start()
     
     def enable(self):
         """Enable UDP broadcasting."""
@@ -58,50 +174,217 @@ class UDPBroadcaster:
         status = "ENABLED" if self.enabled else "DISABLED"
         print(f"[UDP] Broadcasting {status}")
     
-    def send_control_status(self, data_tuple: Tuple):
+    def add_target(self, ip: str, port: int, rate_hz=None, fields=None, lease_s=None, mask=None):
+        """
+        Tambah / ubah target (broadcast, unicast atau multicast).
+        rate_hz None = full rate; lease_s None = permanen.
         """
-        Send control status via UDP.
+        if mask is None:
+            mask = field_mask(fields)
+        if not rate_hz or rate_hz >= FULL_RATE_HZ:
+            rate_hz = None
+        else:
+            rate_hz = round(float(rate_hz), 3)
+        if ipaddress.ip_address(ip).is_multicast and not self._multicast_set:
+            self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, self.multicast_ttl)
+            self._multicast_set = True
+        expires = None if lease_s is None else time.monotonic() + lease_s
+        with self._send_lock:
+            self._targets[(ip, int(port))] = (rate_hz, mask, expires)
+            self._groups_dirty = True
+    
+    def remove_target(self, ip: str, port: int):
+        with self._send_lock:
+            if self._targets.pop((ip, int(port)), None) is not None:
+                self._groups_dirty = True
+    
+    def handle_control(self, data, addr):
+        """Proses satu datagram kontrol (subscribe / unsubscribe) dari addr."""
+        msg = decode_control(data)
+        if msg is None:
+            return False
+        op, port, rate_hz, mask, lease_s = msg
+        key = (addr[0], port or addr[1])
+        current = self._targets.get(key)
+        if current is not None and current[2] is None:
+            # target statis (konfigurasi) tidak diganti / dihapus lewat kontrol
+            return True
+        if op == OP_SUBSCRIBE:
+            n_leased = sum(1 for t in self._targets.values() if t[2] is not None)
+            if key not in self._targets and n_leased >= MAX_SUBSCRIBERS:
+                return False
+            if key not in self._targets:
+                print(f"[UDP] Subscribe {key[0]}:{key[1]} rate={rate_hz or 'full'} "
+                      f"fields={len(mask_fields(mask))}")
+            self.add_target(key[0], key[1], rate_hz, lease_s=lease_s, mask=mask)
+        else:
+            self.remove_target(*key)
+        return True
+    
+    def _poll_control(self):
+        sock = self._ctrl_sock
+        while True:
+            try:
+                data, addr = sock.recvfrom(64)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                self.report_error(e)
+                return
+            self.handle_control(data, addr)
+    
+    def _rebuild_groups(self):
+        """Kelompokkan target per (rate, mask); state group lama dipertahankan."""
+        now = time.monotonic()
+        self._targets = {k: t for k, t in self._targets.items() if t[2] is None or t[2] > now}
+        old = {(g.rate_hz, g.mask): g for g in self._groups}
+        groups = {}
+        for addr, (rate_hz, mask, _) in self._targets.items():
+            key = (rate_hz, mask)
+            group = groups.get(key)
+            if group is None:
+                group = old.get(key) or RateGroup(rate_hz, mask, min(self.batch, max_samples(mask, self.mtu)))
+                group.addrs = []
+                groups[key] = group
+            group.addrs.append(addr)
+        self._groups = list(groups.values())
+        self._groups_dirty = False
+    
+    def attach_transport(self, transport):
+        """Kirim lewat asyncio DatagramTransport (sendto tidak blocking)."""
+        self.transport = transport
+    
+    def send_control_status(self, sample):
+        """
+        Antre sample untuk dikirim (tidak pernah blocking / syscall).
         
         Args:
-            data_tuple: (logtick, degree, cmX, setspeed, r1, r2, r3)
+            sample: lib_com.ControlStatus (payload .raw dipakai tanpa repack)
+                    atau tuple 9 nilai (di-pack dengan STATUS_STRUCT)
         """
         if not self.enabled:
             return
         
-        try:
-            logtick, degree, cmX, setspeed,r0, r1, r2, r3 = data_tuple
-            
-            # Pack data dalam format binary (little-endian)
-            # Format: <I (uint32) + 6d (6x double)
-            packet = struct.pack('<Iddddddd', 
-                                logtick, 
-                                degree, 
-                                cmX, 
-                                setspeed, 
-                                r0,r1, r2, r3)
-            
-            # Broadcast ke network
-            self.sock.sendto(packet, (self.broadcast_ip, self.port))
+        payload = getattr(sample, "raw", None)
+        if payload is None:
+            payload = STATUS_STRUCT.pack(*sample)
+        self._queue.put((time.perf_counter(), payload))
+    
+    def pump(self) -> int:
+        """
+        Kirim semua sample yang antre ke semua rate group (datagram per
+        `batch` sample). Return jumlah datagram terkirim.
+        """
+        with self._send_lock:
+            if self._ctrl_sock is not None:
+                self._poll_control()
+            now = time.monotonic()
+            if now >= self._next_expiry_check:
+                self._next_expiry_check = now + 1.0
+                if any(t[2] is not None and t[2] <= now for t in self._targets.values()):
+                    self._groups_dirty = True
+            if self._groups_dirty:
+                self._rebuild_groups()
             
-            self.packet_count += 1
+            items = self._queue.get_batch(timeout=0)
+            if not items:
+                return 0
+            ts = np.fromiter((t for t, _ in items), dtype=np.float64, count=len(items))
+            payloads = [payload for _, payload in items]
+            ticks = np.frombuffer(b"".join(payloads), dtype=RECORD_DTYPE)["logtick"].astype(np.float64)
+            sendto = (self.transport or self.sock).sendto
+            perf_counter = time.perf_counter
+            sent = 0
+            for group in self._groups:
+                keep = group.select(ticks)
+                if keep is None:
+                    sel, sel_t = payloads, ts
+                elif len(keep):
+                    sel, sel_t = [payloads[i] for i in keep], ts[keep]
+                else:
+                    continue
+                for i in range(0, len(sel), group.batch):
+                    chunk = sel[i:i + group.batch]
+                    # encode sekali per group, datagram sama untuk semua alamat
+                    packet = encode_datagram(group.seq, chunk, group.mask)
+                    # seq tetap naik walau gagal -> receiver lihat sebagai loss
+                    group.seq += 1
+                    for addr in group.addrs:
+                        try:
+                            sendto(packet, addr)
+                        except OSError as e:
+                            self.report_error(e, len(chunk))
+                            continue
+                        sent += 1
+                    self.send_latency.add(perf_counter() - sel_t[i])
+                    group.packet_count += 1
+                    group.sample_count += len(chunk)
             
-            # Print stats setiap 100 packets (setiap 2 detik @ 50Hz)
-            if self.packet_count % 100 == 0:
-                print(f"[UDP] Sent {self.packet_count} packets to {self.broadcast_ip}:{self.port}")
+            self.packet_count += sent
+            self.sample_count += len(items)
+            self.last_send_time = time.time()
         
-        except Exception as e:
-            print(f"[UDP] Send error: {e}")
+        # Print stats setiap ~100 packets
+        if sent and self.packet_count % 100 < sent:
+            print(f"[UDP] Sent {self.packet_count} packets ({self.sample_count} samples) "
+                  f"to {len(self._targets)} target(s)")
+        return sent
+    
+    flush = pump
+    
+    def report_error(self, exc, samples=0):
+        """Catat error kirim; dicetak maksimal sekali per ERROR_LOG_INTERVAL."""
+        self.error_count += 1
+        self.error_samples += samples
+        now = time.monotonic()
+        if now - self._last_error_log < ERROR_LOG_INTERVAL:
+            self._errors_suppressed += 1
+            return
+        more = f" (+{self._errors_suppressed} error lain)" if self._errors_suppressed else ""
+        print(f"[UDP] Send error: {exc}{more}")
+        self._last_error_log = now
+        self._errors_suppressed = 0
+    
+    def _sender_loop(self):
+        while not self._stop.wait(self.max_delay):
+            self.pump()
     
     def close(self):
-        """Close UDP socket."""
-        self.sock.close()
+        """Stop sender, kirim sisa queue, close UDP socket."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(1.0)
+        self.pump()
+        if self._ctrl_sock is not None:
+            self._ctrl_sock.close()
+        if self.transport is not None:
+            self.transport.close()   # ikut menutup self.sock
+            self.transport = None
+        else:
+            self.sock.close()
         print("[UDP] Socket closed")
     
     def get_stats(self) -> dict:
         """Get broadcaster statistics."""
+        q = self._queue
+        lat = self.send_latency.summary()
         return {
             "enabled": self.enabled,
             "packet_count": self.packet_count,
+            "sample_count": self.sample_count,
+            "batch": self.batch,
+            "targets": len(self._targets),
+            "groups": [{"rate_hz": g.rate_hz, "fields": len(mask_fields(g.mask)), "targets": len(g.addrs),
+                        "seq": g.seq, "packet_count": g.packet_count, "sample_count": g.sample_count}
+                       for g in self._groups],
+            "queue_depth": len(q),
+            "queue_max_depth": q.max_depth,
+            "dropped": q.dropped,
+            "error_count": self.error_count,
+            "error_samples": self.error_samples,
+            "send_p50_ms": lat["p50_ms"],
+            "send_p99_ms": lat["p99_ms"],
+            "send_max_ms": lat["max_ms"],
             "broadcast_ip": self.broadcast_ip,
             "port": self.port
-        }
\ No newline at end of file
+        }
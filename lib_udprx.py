@@ -0,0 +1,231 @@
+"""
+lib_udprx.py - Receiver UDP telemetry throughput tinggi
+
+Pasangan lib_udp.UDPBroadcaster di sisi penerima:
+- socket non-blocking, SO_RCVBUF besar (burst ditampung kernel, bukan hilang)
+- drain(): recv_into berulang ke buffer slot yang dialokasikan sekali
+  (Python tidak punya recvmmsg; satu wakeup select -> sampai `slots`
+  datagram, tanpa alokasi bytes per datagram)
+- decode vektor: kalau semua datagram di batch punya header sama
+  (mask, count, panjang) -> satu view NumPy strided ke semua slot,
+  header/seq dibaca sebagai array. Batch campuran -> decode_datagram per slot.
+- hasil dalam RECORD_DTYPE penuh (field yang tidak dikirim: NaN, logtick 0),
+  jadi RecordSink bisa menulis log .bin PMLOG yang sama dengan DataLogger
+  (load_log / exportCsv / analyzeLogs / lib_replay langsung bisa baca).
+- loss dihitung dari gap seq (SeqTracker.update_many).
+"""
+
+import os
+import select
+import socket
+import time
+from datetime import datetime
+
+import numpy as np
+
+from lib_data import FLUSH_INTERVAL, RECORD_DTYPE, make_log_header
+from lib_wire import (FIELD_MASK_ALL, WIRE_HEADER, WIRE_MAGIC, SeqTracker, decode_datagram, mask_dtype,
+                      mask_fields, max_samples)
+
+RCVBUF_BYTES = 8 * 1024 * 1024
+SLOT_SIZE = 2048   # > MTU_PAYLOAD; datagram lebih besar terpotong -> parse error
+MAX_RESETS = 16    # ConnectionResetError beruntun per drain sebelum menyerah
+
+# header lib_wire v1 sebagai dtype (dibaca strided langsung dari slot)
+HEADER_DTYPE = np.dtype([("magic", "S4"), ("version", "u1"), ("header_len", "u1"), ("mask", "<u2"),
+                         ("seq", "<u4"), ("count", "<u2"), ("reserved", "<u2")])
+assert HEADER_DTYPE.itemsize == WIRE_HEADER.size
+
+# isi record untuk field yang tidak ada di field_mask
+_MISSING = np.array((0,) + (np.nan,) * (len(RECORD_DTYPE.names) - 1), dtype=RECORD_DTYPE)
+
+
+def open_socket(port: int, rcvbuf: int = RCVBUF_BYTES, multicast_group=None) -> socket.socket:
+    """
+    Socket UDP non-blocking dengan SO_RCVBUF besar.
+    Linux memotong SO_RCVBUF ke net.core.rmem_max; SO_RCVBUFFORCE dicoba
+    dulu (butuh CAP_NET_ADMIN). Ukuran efektif dicek lewat rcvbuf_size().
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    force = getattr(socket, "SO_RCVBUFFORCE", None)
+    try:
+        if force is None:
+            raise OSError
+        sock.setsockopt(socket.SOL_SOCKET, force, rcvbuf)
+    except OSError:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+    sock.bind(("", port))
+    if multicast_group:
+        mreq = socket.inet_aton(multicast_group) + socket.inet_aton("0.0.0.0")
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, mreq)
+    sock.setblocking(False)
+    return sock
+
+
+def rcvbuf_size(sock) -> int:
+    """SO_RCVBUF efektif (Linux melaporkan termasuk overhead, bisa 2x nilai diminta)."""
+    return sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+
+
+class BatchReceiver:
+    """
+    Drain socket per batch ke buffer yang dialokasikan sekali.
+
+        rx = BatchReceiver(open_socket(5000))
+        while True:
+            if rx.wait(1.0):
+                records = rx.drain()   # view RECORD_DTYPE, valid sampai drain() berikutnya
+
+    Satu thread pemanggil (buffer dipakai ulang tiap drain).
+    """
+
+    def __init__(self, sock, slots: int = 1024, slot_size: int = SLOT_SIZE, max_records: int = None):
+        self.sock = sock
+        self.slots = int(slots)
+        self.slot_size = int(slot_size)
+        self._buf = bytearray(self.slots * self.slot_size)
+        view = memoryview(self._buf)
+        self._views = [view[i * self.slot_size:(i + 1) * self.slot_size] for i in range(self.slots)]
+        self._lens = np.zeros(self.slots, dtype=np.int64)
+        self._headers = np.ndarray((self.slots,), dtype=HEADER_DTYPE, buffer=self._buf,
+                                   strides=(self.slot_size,))
+        if max_records is None:
+            max_records = self.slots * max_samples(FIELD_MASK_ALL)  # tumbuh kalau kurang
+        self._out = np.empty(max_records, dtype=RECORD_DTYPE)
+
+        self.seq = SeqTracker()
+        self.packet_count = 0
+        self.sample_count = 0
+        self.error_count = 0
+        self.drain_count = 0
+        self.max_batch = 0
+        self.t_last = 0.0  # time.time() drain terakhir yang dapat data
+
+    def wait(self, timeout: float) -> bool:
+        """Tunggu socket readable (select, tanpa busy loop)."""
+        return bool(select.select([self.sock], [], [], timeout)[0])
+
+    def drain(self) -> np.ndarray:
+        """Ambil semua datagram yang sudah antre (maks `slots`), return record RECORD_DTYPE."""
+        recv_into = self.sock.recv_into
+        views = self._views
+        lens = self._lens
+        slots = self.slots
+        resets = 0
+        n = 0
+        while n < slots:
+            try:
+                lens[n] = recv_into(views[n])
+            except (BlockingIOError, InterruptedError):
+                break
+            except ConnectionResetError:
+                # Windows: ICMP port unreachable dari sendto sebelumnya -> ulang slot yang sama
+                resets += 1
+                if resets > MAX_RESETS:
+                    break
+                continue
+            n += 1
+        if n == 0:
+            return self._out[:0]
+        self.t_last = time.time()
+        self.drain_count += 1
+        self.packet_count += n
+        self.max_batch = max(self.max_batch, n)
+        records = self._decode(n)
+        self.sample_count += len(records)
+        return records
+
+    def _decode(self, n):
+        lens = self._lens[:n]
+        hdr = self._headers[:n]
+        first_len = int(lens[0])
+        if (lens == first_len).all():
+            is_v1 = hdr["magic"] == WIRE_MAGIC
+            if is_v1.all():
+                h0 = hdr[0]
+                mask, header_len, count = int(h0["mask"]), int(h0["header_len"]), int(h0["count"])
+                same = ((hdr["mask"] == mask).all() and (hdr["header_len"] == header_len).all()
+                        and (hdr["count"] == count).all() and (hdr["version"] >= 1).all())
+                if same and header_len >= WIRE_HEADER.size and mask and not mask & ~FIELD_MASK_ALL:
+                    dtype = mask_dtype(mask)
+                    if first_len == header_len + count * dtype.itemsize:
+                        self.seq.update_many(hdr["seq"])
+                        recs = np.ndarray((n, count), dtype=dtype, buffer=self._buf, offset=header_len,
+                                          strides=(self.slot_size, dtype.itemsize))
+                        return self._store(0, recs, mask)
+            elif first_len == RECORD_DTYPE.itemsize and not is_v1.any():
+                # format lama: 1 sample mentah per datagram, tanpa seq
+                recs = np.ndarray((n, 1), dtype=RECORD_DTYPE, buffer=self._buf,
+                                  strides=(self.slot_size, RECORD_DTYPE.itemsize))
+                return self._store(0, recs, FIELD_MASK_ALL)
+
+        # batch campuran: per datagram
+        k = 0
+        for i, view in enumerate(self._views[:n]):
+            decoded = decode_datagram(view[:int(lens[i])])
+            if decoded is None:
+                self.error_count += 1
+                continue
+            seq, mask, recs = decoded
+            if seq is not None:
+                self.seq.update(seq)
+            k = len(self._store(k, recs.reshape(1, -1), mask))
+        return self._out[:k]
+
+    def _store(self, k, recs, mask):
+        """recs (n, count) mask_dtype -> self._out[k:] RECORD_DTYPE. Return self._out[:akhir]."""
+        end = k + recs.size
+        if end > len(self._out):
+            self._out = np.concatenate([self._out[:k], np.empty(2 * end, dtype=RECORD_DTYPE)])
+        dst = self._out[k:end].reshape(recs.shape)
+        if mask == FIELD_MASK_ALL:
+            dst[...] = recs
+        else:
+            dst[...] = _MISSING
+            for name in mask_fields(mask):
+                dst[name] = recs[name]
+        return self._out[:end]
+
+    def stats(self) -> dict:
+        return {
+            "packets": self.packet_count,
+            "samples": self.sample_count,
+            "lost": self.seq.lost,
+            "loss_ratio": self.seq.loss_ratio(),
+            "reordered": self.seq.reordered,
+            "errors": self.error_count,
+            "drains": self.drain_count,
+            "max_batch": self.max_batch,
+        }
+
+
+class RecordSink:
+    """
+    Penulis log .bin (header PMLOG + record 68 byte) untuk array RECORD_DTYPE.
+    Satu write() per batch, flush berbasis waktu (FLUSH_INTERVAL).
+    """
+
+    def __init__(self, log_dir="udp_logs", prefix="udp_log"):
+        os.makedirs(log_dir, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.path = os.path.join(log_dir, f"{prefix}_{stamp}.bin")
+        self._file = open(self.path, "wb", buffering=1 << 20)
+        self._file.write(make_log_header())
+        self.rows = 0
+        self._last_flush = time.monotonic()
+
+    def write(self, records):
+        if len(records) == 0:
+            return
+        self._file.write(records)
+        self.rows += len(records)
+        now = time.monotonic()
+        if now - self._last_flush >= FLUSH_INTERVAL:
+            self._file.flush()
+            self._last_flush = now
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
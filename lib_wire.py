@@ -0,0 +1,198 @@
+"""
+lib_wire.py - Format datagram UDP telemetry (versi 1, batched)
+
+Satu datagram = header 16 byte + count record:
+
+    offset size
+    0      4    magic b"PDTL"
+    4      1    version (1)
+    5      1    header_len (16; receiver lompat ke sini, header boleh tumbuh)
+    6      2    field_mask, bit i = STATUS_FIELDS[i] ada di record
+    8      4    seq (nomor datagram, naik 1 per datagram, wrap 2^32)
+    12     2    count (jumlah sample)
+    14     2    reserved (0)
+
+Record little-endian, packed, urutan STATUS_FIELDS, hanya field yang
+bitnya set (logtick uint32, sisanya double). Mask penuh -> record 68 byte
+sama persis dengan payload control status serial (ControlStatus.raw).
+Datagram 68 byte tanpa magic = format lama (1 sample mentah).
+
+Datagram kontrol 16 byte (encode_subscribe / decode_control) dipakai
+receiver untuk subscribe ke lib_udp.UDPBroadcaster dengan rate dan
+subset field sendiri.
+"""
+
+import struct
+
+import numpy as np
+
+from lib_com import STATUS_FIELDS
+from lib_data import RECORD_DTYPE
+
+WIRE_MAGIC = b"PDTL"
+WIRE_VERSION = 1
+WIRE_HEADER = struct.Struct("<4sBBHIHH")
+FIELD_MASK_ALL = (1 << len(STATUS_FIELDS)) - 1
+MTU_PAYLOAD = 1472   # 1500 - IP(20) - UDP(8)
+SEQ_MOD = 1 << 32
+
+_DTYPES = {}
+
+
+def field_mask(fields=None) -> int:
+    """Nama field -> field_mask (None = semua)."""
+    if fields is None:
+        return FIELD_MASK_ALL
+    mask = 0
+    for name in fields:
+        mask |= 1 << STATUS_FIELDS.index(name)
+    return mask
+
+
+def mask_fields(mask: int) -> tuple:
+    return tuple(name for i, name in enumerate(STATUS_FIELDS) if mask >> i & 1)
+
+
+def mask_dtype(mask: int) -> np.dtype:
+    """dtype record packed untuk field_mask (di-cache)."""
+    dtype = _DTYPES.get(mask)
+    if dtype is None:
+        names = mask_fields(mask)
+        if not names:
+            raise ValueError("field_mask kosong")
+        dtype = np.dtype([(name, RECORD_DTYPE.fields[name][0]) for name in names])
+        _DTYPES[mask] = dtype
+    return dtype
+
+
+def max_samples(mask: int = FIELD_MASK_ALL, mtu: int = MTU_PAYLOAD) -> int:
+    """Sample maksimum per datagram tanpa fragmentasi IP."""
+    return max(1, (mtu - WIRE_HEADER.size) // mask_dtype(mask).itemsize)
+
+
+def select_fields(records: np.ndarray, mask: int) -> np.ndarray:
+    """Array RECORD_DTYPE -> array packed mask_dtype(mask)."""
+    if mask == FIELD_MASK_ALL:
+        return records
+    out = np.empty(len(records), dtype=mask_dtype(mask))
+    for name in out.dtype.names:
+        out[name] = records[name]
+    return out
+
+
+def encode_datagram(seq: int, payloads, mask: int = FIELD_MASK_ALL) -> bytes:
+    """
+    payloads: list payload 68 byte (ControlStatus.raw / STATUS_STRUCT.pack)
+    atau array RECORD_DTYPE.
+    """
+    if isinstance(payloads, np.ndarray):
+        body = select_fields(payloads, mask).tobytes()
+        count = len(payloads)
+    else:
+        body = b"".join(payloads)
+        count = len(payloads)
+        if mask != FIELD_MASK_ALL:
+            body = select_fields(np.frombuffer(body, dtype=RECORD_DTYPE), mask).tobytes()
+    header = WIRE_HEADER.pack(WIRE_MAGIC, WIRE_VERSION, WIRE_HEADER.size, mask, seq % SEQ_MOD, count, 0)
+    return header + body
+
+
+def decode_datagram(data):
+    """
+    Return (seq, mask, records) atau None kalau datagram tidak valid.
+    records: np.ndarray dtype mask_dtype(mask) (view ke data, tanpa copy).
+    Format lama (68 byte mentah): seq = None.
+    """
+    if len(data) >= WIRE_HEADER.size and data[:4] == WIRE_MAGIC:
+        magic, version, header_len, mask, seq, count, _ = WIRE_HEADER.unpack_from(data)
+        if version < 1 or header_len < WIRE_HEADER.size or not mask or mask & ~FIELD_MASK_ALL:
+            return None
+        dtype = mask_dtype(mask)
+        if len(data) != header_len + count * dtype.itemsize:
+            return None
+        return seq, mask, np.frombuffer(data, dtype=dtype, count=count, offset=header_len)
+    if len(data) == RECORD_DTYPE.itemsize:
+        return None, FIELD_MASK_ALL, np.frombuffer(data, dtype=RECORD_DTYPE)
+    return None
+
+
+class SeqTracker:
+    """
+    Deteksi loss dari gap seq datagram (wrap 2^32).
+    Datagram telat (seq mundur) dihitung reordered, tidak mengurangi lost.
+    """
+
+    def __init__(self):
+        self.expected = None
+        self.received = 0
+        self.lost = 0
+        self.reordered = 0
+
+    def update(self, seq: int) -> int:
+        """Return jumlah datagram yang hilang sebelum seq ini."""
+        self.received += 1
+        if self.expected is None:
+            self.expected = (seq + 1) % SEQ_MOD
+            return 0
+        gap = (seq - self.expected) % SEQ_MOD
+        if gap >= SEQ_MOD // 2:
+            # seq < expected: datagram telat / duplikat
+            self.reordered += 1
+            return 0
+        self.lost += gap
+        self.expected = (seq + 1) % SEQ_MOD
+        return gap
+
+    def update_many(self, seqs) -> int:
+        """
+        Versi batch update() untuk array seq (urutan tiba).
+        Tanpa reorder: dihitung vektor; kalau ada seq mundur -> per elemen.
+        """
+        seqs = np.asarray(seqs, dtype=np.int64)
+        if len(seqs) == 0:
+            return 0
+        if self.expected is None:
+            self.expected = int(seqs[0])
+        prev = np.empty_like(seqs)
+        prev[0] = self.expected - 1
+        prev[1:] = seqs[:-1]
+        gaps = (seqs - prev - 1) % SEQ_MOD
+        if gaps.max() >= SEQ_MOD // 2:
+            return sum(self.update(int(seq)) for seq in seqs)
+        lost = int(gaps.sum())
+        self.received += len(seqs)
+        self.lost += lost
+        self.expected = int(seqs[-1] + 1) % SEQ_MOD
+        return lost
+
+    def loss_ratio(self) -> float:
+        total = self.received + self.lost
+        return self.lost / total if total else 0.0
+
+
+# ============================================================
+# DATAGRAM KONTROL (subscribe ke UDPBroadcaster)
+# ============================================================
+# magic, version, op, port (0 = port asal datagram), rate_hz (0 = full rate),
+# field_mask (0 = semua), lease_s (0 = default). Alamat IP subscriber =
+# IP pengirim datagram. Subscription harus diperbarui sebelum lease habis.
+CTRL_MAGIC = b"PDSC"
+CTRL_STRUCT = struct.Struct("<4sBBHfHH")
+OP_SUBSCRIBE = 1
+OP_UNSUBSCRIBE = 2
+DEFAULT_LEASE_S = 10
+
+
+def encode_subscribe(port=0, rate_hz=0.0, fields=None, lease_s=DEFAULT_LEASE_S, op=OP_SUBSCRIBE) -> bytes:
+    mask = 0 if fields is None else field_mask(fields)
+    return CTRL_STRUCT.pack(CTRL_MAGIC, WIRE_VERSION, op, port, rate_hz or 0.0, mask, lease_s)
+
+
+def decode_control(data):
+    """Return (op, port, rate_hz, mask, lease_s) atau None kalau tidak valid."""
+    if len(data) < CTRL_STRUCT.size or data[:4] != CTRL_MAGIC:
+        return None
+    _, version, op, port, rate_hz, mask, lease_s = CTRL_STRUCT.unpack_from(data)
+    if op not in (OP_SUBSCRIBE, OP_UNSUBSCRIBE) or mask & ~FIELD_MASK_ALL or not rate_hz >= 0.0:
+        return None
+    return op, port, rate_hz, mask or FIELD_MASK_ALL, lease_s or DEFAULT_LEASE_S
@@ -2,6 +2,8 @@ import os
 os.environ["SDL_JOYSTICK_ALLOW_BACKGROUND_EVENTS"] = "1"
 
 import sys
+import signal
+import asyncio
 import threading
 import pygame
 import math
@@ -9,9 +11,15 @@ from threading import Lock
 from serial.tools import list_ports
 
 from lib_stick import init_joystick, joystick_sender
-from lib_com import open_serial,read_control_status, send_gains, send_reset
+from lib_com import open_serial,read_control_status, send_gains, send_reset, LatencyStats, FrameDecoder
 from lib_data import DataLogger
 from lib_udp import UDPBroadcaster
+from lib_ring import TelemetryRing
+from lib_shm import ShmPublisher
+from lib_replay import LogReplay, replay_control_status
+from lib_sim import STM32Sim, port_pair
+from lib_aio import (AsyncCore, attach_udp, joystick_sender as joystick_task, log_sink, replay_reader,
+					 serial_reader, udp_sender)
 
 from lib_gui import PendulumGUI
 
@@ -21,6 +29,23 @@ from lib_gui import PendulumGUI
 PORT = "COM10"
 BAUD = 115200
 FPS = 50
+READ_TIMEOUT = 0.05  # read() blocking sampai ada data (event-driven RX)
+HIST_SIZE = 131072   # kapasitas ring history (beberapa menit @ rate tinggi)
+GRAPH_POINTS = 3000  # window GraphView, bisa dinaikkan sampai HIST_SIZE
+LOG_QUEUE_SIZE = 65536          # sample maksimum antre ke writer
+LOG_QUEUE_POLICY = "drop_oldest"  # "drop_oldest" | "drop_newest" ("block" bisa membekukan event loop)
+LOG_ROTATE_BYTES = 32 * 1024 * 1024  # segmen log maksimum (byte)
+LOG_ROTATE_SECONDS = 600             # atau maksimum 10 menit per segmen
+LOG_COMPRESS = True                  # kompres segmen tertutup (zstd/lz4/gzip)
+UDP_BATCH = 16        # sample per datagram (lib_wire, dibatasi MTU)
+UDP_MAX_DELAY = 0.02  # detik, batch dikirim walau belum penuh
+UDP_TARGETS = [
+	# (ip, port, rate_hz (None = full rate), fields (None = semua))
+	("192.168.1.255", 5000, None, None),
+]
+UDP_CONTROL_PORT = 5001  # receiver subscribe sendiri (lib_wire.encode_subscribe), None = off
+SHM_NAME = "pendulum_telemetry"  # bus shared memory untuk proses lokal (lib_shm.ShmReader), None = off
+SHM_CAPACITY = 65536             # sample di ring shared memory
 
 DEFAULT_GAINS = {
 	"K_TH": -2.50 * 57.0 * 12.0,
@@ -37,6 +62,8 @@ X_CENTER_CM = 0
 # ============================================================
 # SHARED STATE
 # ============================================================
+# Mode asyncio (run) semua akses dari thread event loop; lock tetap
+# dipakai untuk mode thread (setup_serial / setup_replay, benchCom).
 pendulum_state = {
 	"cmX": X_CENTER_CM,
 	"theta": 0.0,
@@ -55,7 +82,11 @@ gains_lock = Lock()
 # APP CLASS
 # ============================================================
 class PendulumMonitor:
-	def __init__(self):
+	def __init__(self, replay=None, ser=None):
+		# replay: lib_replay.LogReplay -> data dari log, bukan serial
+		# ser: port yang sudah dibuka (mis. lib_sim.port_pair) -> tanpa joystick
+		self.replay = replay
+		self.sim_port = ser
 		pygame.init()
 		info = pygame.display.Info()
 		self.screen = pygame.display.set_mode(
@@ -75,8 +106,18 @@ class PendulumMonitor:
 		self.font_small = pygame.font.SysFont("Arial", 16)
 		self.font_input = pygame.font.SysFont("Consolas", 16)
 
-		self.data_logger = DataLogger(base_dir="logs")
-		self.udp_broadcaster = UDPBroadcaster(broadcast_ip="192.168.1.255", port=5000)
+		self.data_logger = DataLogger(base_dir="logs", fmt="bin", queue_size=LOG_QUEUE_SIZE, policy=LOG_QUEUE_POLICY,
+									  rotate_bytes=LOG_ROTATE_BYTES, rotate_seconds=LOG_ROTATE_SECONDS,
+									  compress=LOG_COMPRESS, threaded=False)
+		self.udp_broadcaster = UDPBroadcaster(targets=UDP_TARGETS, control_port=UDP_CONTROL_PORT, batch=UDP_BATCH,
+											  max_delay=UDP_MAX_DELAY, threaded=False)
+		self.shm_bus = None
+		if SHM_NAME:
+			try:
+				self.shm_bus = ShmPublisher(SHM_NAME, SHM_CAPACITY)
+				print(f"[SHM] bus {SHM_NAME}: {SHM_CAPACITY} samples")
+			except OSError as e:
+				print(f"[SHM] bus off: {e}")
 
 		self.gui = PendulumGUI(
 			screen=self.screen,
@@ -96,21 +137,18 @@ class PendulumMonitor:
 		self.joystick = None
 		self.thread_rx = None
 		self.thread_tx = None
+		self.rx_latency = LatencyStats()
+		self.rx_decoder = FrameDecoder()
+		self.core = None   # lib_aio.AsyncCore saat run()
 
 		self.running = True
 		self.gains_sent = False
 		self.gains_ack_time = 0.0
 
-		# graph buffers
-		self.t_raw = []
-		self.cmX_hist = []
-		self.degree_hist = []
-		self.degree0_hist = []
-		self.setspeed_hist = []
-		self.r1_hist = []
-		self.theta_dot_hist = []
-		self.x_center_hist = []
-		self.max_hist = 1000
+		# graph history: ring buffer bersama (RX tulis, GraphView baca view)
+		self.max_hist = HIST_SIZE
+		self.history = TelemetryRing(capacity=self.max_hist)
+		self.gui.graph_view.max_points = GRAPH_POINTS
 		self.ctx = {
 				"is_running": 0,
 				"gains_sent": self.gains_sent,
@@ -122,19 +160,28 @@ class PendulumMonitor:
 		self.mode = 0
 		
 
-	def setup_serial(self):
-		try:
-			self.serial = open_serial(PORT, BAUD)
+	def open_port(self):
+		if self.sim_port is not None:
+			self.serial = self.sim_port
+			print("Serial: simulator port")
+		else:
+			self.serial = open_serial(PORT, BAUD, timeout=READ_TIMEOUT)
 			print(f"Serial opened: {PORT} @ {BAUD}")
-
 			self.joystick = init_joystick(0)
 
-			self.thread_tx = threading.Thread(
-				target=joystick_sender,
-				args=(self.joystick, self.serial, FPS),
-				daemon=True
-			)
-			self.thread_tx.start()
+	def setup_serial(self):
+		# mode thread (benchCom): RX + joystick TX + worker logger + sender UDP di thread daemon
+		self.data_logger.start()
+		self.udp_broadcaster.start()
+		try:
+			self.open_port()
+			if self.joystick is not None:
+				self.thread_tx = threading.Thread(
+					target=joystick_sender,
+					args=(self.joystick, self.serial, FPS),
+					daemon=True
+				)
+				self.thread_tx.start()
 
 			self.thread_rx = threading.Thread(
 				target=read_control_status,
@@ -143,7 +190,10 @@ class PendulumMonitor:
 					"callback": self.on_control_status,
 					"ack_callback": self.on_gains_ack,
 					"reset_ack_callback": self.on_reset_ack,
-					"debug": False
+					"debug": False,
+					"read_mode": "blocking",
+					"latency": self.rx_latency,
+					"decoder": self.rx_decoder
 				},
 				daemon=True
 			)
@@ -154,101 +204,55 @@ class PendulumMonitor:
 			print(f"Failed to open serial: {e}")
 			return False
 		
+	def setup_replay(self):
+		self.data_logger.start()
+		self.udp_broadcaster.start()
+		self.thread_rx = threading.Thread(
+			target=replay_control_status,
+			args=(self.replay,),
+			kwargs={
+				"callback": self.on_control_status,
+				"latency": self.rx_latency
+			},
+			daemon=True
+		)
+		self.thread_rx.start()
+		print(f"Replay: {len(self.replay)} samples, speed={self.replay.speed or 'max'}")
+		return True
+
 	def start_graph(self):
+		# window graph diatur GraphView lewat nomor urut ring, tidak perlu clear
 		self.graph_enabled = True
-		self.t_raw.clear()
-		self.cmX_hist.clear()
-		self.degree_hist.clear()
-		self.degree0_hist.clear()
-		self.setspeed_hist.clear()
-		self.r1_hist.clear()
-		self.theta_dot_hist.clear()
-		self.x_center_hist.clear()
-		
 
 	def stop_graph(self):
 		self.graph_enabled = False
-		self.t_raw.clear()
-		self.cmX_hist.clear()
-		self.degree_hist.clear()
-		self.degree0_hist.clear()
-		self.setspeed_hist.clear()
-		self.r1_hist.clear()
-		self.theta_dot_hist.clear()
-		self.x_center_hist.clear()
-
-	def on_control_status(self, sample_tuple):
-		logtick, degree, cmX, setspeed, r1, theta_dot, theta, x_center, mode = sample_tuple
+
+	def on_control_status(self, sample):
+		# sample: lib_com.ControlStatus (field + payload mentah di .raw)
+		logtick = sample.logtick
+		degree = sample.degree
+		cmX = sample.cmX
+		setspeed = sample.setspeed
+		r1 = sample.r1
+		theta_dot = sample.theta_dot
+		theta = sample.theta
+		x_center = sample.x_center
+		mode = sample.mode
 		self.mode = mode
-		gv = getattr(self.gui, "graph_view", None)
 		with state_lock:
 			pendulum_state["cmX"] = cmX
 			pendulum_state["theta"] = theta
 			pendulum_state["x_center"] = x_center
-		
-		#if self.ctx["is_running"] == 0:
-			#cut = len(self.t_raw)
-			#del self.t_raw[:cut]
-			#del self.cmX_hist[:cut]
-			#del self.degree_hist[:cut]
-			#self.t_raw.clear()
-			#self.cmX_hist.clear()
-			#self.degree_hist.clear()
+
 		# graph history
-		degree0=0	
-		if(gv.running):
-			self.t_raw.append(float(logtick))
-			self.cmX_hist.append(float(cmX))
-			self.degree_hist.append(float(degree))
-			self.setspeed_hist.append(float(setspeed))
-			self.r1_hist.append(float(r1))
-			self.theta_dot_hist.append(float(theta_dot))
-			self.x_center_hist.append(float(x_center))
-			
-			
-			degree0=float(degree+180)	
-			if(degree0>180):
-				degree0=degree0-360
-			else:degree0=degree0	
-			
-			self.degree0_hist.append(float(degree0))
-		else:
-			self.t_raw.clear()
-			self.cmX_hist.clear()
-			self.degree_hist.clear()
-			self.degree0_hist.clear()
-			self.setspeed_hist.clear()
-			self.r1_hist.clear()
-			self.theta_dot_hist.clear()
-			self.x_center_hist.clear()
-		if len(self.t_raw) > self.max_hist:
-			
-			n = len(self.t_raw)
-			print(n)
-			if n <= self.max_hist:
-				return
-			cut = n - self.max_hist
-			print(cut)
-			
-			del self.t_raw[:cut]
-			del self.cmX_hist[:cut]
-			del self.degree_hist[:cut]
-			del self.degree0_hist[:cut]
-			del self.setspeed_hist[:cut]
-			del self.r1_hist[:cut]
-			del self.theta_dot_hist[:cut]
-			del self.x_center_hist[:cut]
-			aftercut = len(self.t_raw)
-			print(aftercut)
-			#self.t_raw = self.t_raw[-self.max_hist:]
-			#self.cmX_hist = self.cmX_hist[-self.max_hist:]
-			#self.degree_hist = self.degree_hist[-self.max_hist:]
-			#self.degree0_hist = self.degree0_hist[-self.max_hist:]	
-			
-			if gv is not None:
-				gv._src_last_n = max(0, gv._src_last_n - cut)
-		self.data_logger.handle_sample(sample_tuple)
-		self.udp_broadcaster.send_control_status(sample_tuple)
+		degree0 = degree + 180.0
+		if degree0 > 180:
+			degree0 = degree0 - 360
+		self.history.append((logtick, cmX, degree, degree0, setspeed, r1, theta_dot, x_center))
+		self.data_logger.handle_sample(sample)
+		self.udp_broadcaster.send_control_status(sample)
+		if self.shm_bus is not None:
+			self.shm_bus.publish(sample)
 
 	def on_gains_ack(self, gains_tuple):
 		K_TH, K_TH_D, K_X, K_X_D, K_X_INT = gains_tuple
@@ -281,6 +285,13 @@ class PendulumMonitor:
 			current_gains["K_X_INT"] = self.gui.inputs["K_X_INT"].get_float(DEFAULT_GAINS["K_X_INT"])
 
 		if self.serial:
+			# clear ACK lama sebelum kirim (ACK bisa datang saat jeda antar paket)
+			with state_lock:
+				pendulum_state["gains_ack"] = False
+			if self.core is not None:
+				# jeda antar paket pakai asyncio.sleep, GUI tidak tertahan
+				self.core.spawn(self._send_gains_async(), "gains")
+				return
 			for attempt in range(3):
 				send_gains(
 					self.serial,
@@ -295,10 +306,17 @@ class PendulumMonitor:
 				time.sleep(0.05)
 
 			self.gains_sent = True
-			with state_lock:
-				pendulum_state["gains_ack"] = False
 			print("Gains sent (3 packets for reliability)")
 
+	async def _send_gains_async(self):
+		with gains_lock:
+			gains = [current_gains[k] for k in ("K_TH", "K_TH_D", "K_X", "K_X_D", "K_X_INT")]
+		for attempt in range(3):
+			send_gains(self.serial, *gains, seq=attempt)
+			await asyncio.sleep(0.05)
+		self.gains_sent = True
+		print("Gains sent (3 packets for reliability)")
+
 	def start_system(self):
 		if not self.gains_sent:
 			print("Please apply gains first!")
@@ -362,90 +380,151 @@ class PendulumMonitor:
 
 
 	def run(self):
-		if not self.setup_serial():
-			print("Failed to setup serial connection!")
-			return
+		try:
+			asyncio.run(self.run_async())
+		except KeyboardInterrupt:
+			pass
+		# port/socket/logger sudah ditutup; Ctrl+C berulang tidak memotong ringkasan
+		signal.signal(signal.SIGINT, signal.SIG_IGN)
+		lat = self.rx_latency.summary()
+		print(f"[RX] latency: n={lat['count']} p50={lat['p50_ms']:.3f} ms "
+			  f"p99={lat['p99_ms']:.3f} ms max={lat['max_ms']:.3f} ms")
+		print(f"[RX] frames={self.rx_decoder.frame_count} crc_errors={self.rx_decoder.crc_errors} "
+			  f"skipped_bytes={self.rx_decoder.skipped_bytes}")
+		pygame.quit()
 
-		while self.running:
-			events = pygame.event.get()
-			for event in events:
-				if event.type == pygame.QUIT:
-					self.running = False
-				if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
-					self.running = False
+	async def run_async(self):
+		# satu event loop: serial RX/TX, UDP, logger, GUI (lihat lib_aio)
+		core = self.core = AsyncCore()
+		# closer didaftarkan dulu: gagal buka port pun socket UDP + segmen shm tetap ditutup
+		core.on_close(self.udp_broadcaster.close)
+		if self.shm_bus is not None:
+			core.on_close(self.shm_bus.close)
+		# Ctrl+C = keluar normal seperti ESC (KeyboardInterrupt tidak dilempar
+		# di tengah task / callback, Ctrl+C kedua tidak memotong close())
+		loop = asyncio.get_running_loop()
+		try:
+			loop.add_signal_handler(signal.SIGINT, setattr, self, "running", False)
+		except (NotImplementedError, RuntimeError):
+			pass  # Windows: KeyboardInterrupt biasa (lihat run())
+		try:
+			if self.replay is not None:
+				core.spawn(replay_reader(self.replay, callback=self.on_control_status,
+										 latency=self.rx_latency), "replay")
+				print(f"Replay: {len(self.replay)} samples, speed={self.replay.speed or 'max'}")
+			else:
+				try:
+					self.open_port()
+				except Exception as e:
+					print(f"Failed to open serial: {e}")
+					print("Failed to setup serial connection!")
+					return
+				core.on_close(self.serial.close)
+				core.spawn(serial_reader(self.serial, self.rx_decoder,
+										 callback=self.on_control_status,
+										 ack_callback=self.on_gains_ack,
+										 reset_ack_callback=self.on_reset_ack,
+										 latency=self.rx_latency), "serial-rx")
+				if self.joystick is not None:
+					core.spawn(joystick_task(self.joystick, self.serial, FPS), "joystick-tx")
+
+			await attach_udp(self.udp_broadcaster)
+			core.spawn(udp_sender(self.udp_broadcaster), "udp-tx")
+			core.spawn(log_sink(self.data_logger), "logger")
+
+			period = 1.0 / FPS
+			next_frame = loop.time()
+			while self.running:
+				self._frame()
+				next_frame += period
+				delay = next_frame - loop.time()
+				if delay < 0:
+					next_frame = loop.time()
+					delay = 0
+				await asyncio.sleep(delay)
+		finally:
+			await core.close()
+			self.core = None
+			try:
+				loop.remove_signal_handler(signal.SIGINT)
+			except (NotImplementedError, RuntimeError):
+				pass
+
+	def _frame(self):
+		events = pygame.event.get()
+		for event in events:
+			if event.type == pygame.QUIT:
+				self.running = False
+			if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+				self.running = False
 
-			with state_lock:
-				is_running = pendulum_state["running"]
-				gains_ack = pendulum_state["gains_ack"]
-				reset_ack = pendulum_state["reset_ack"]
-				cmX = pendulum_state["cmX"]
-				theta = pendulum_state["theta"]
-
-			# auto-clear gains_sent if ack too old (same behavior)
-			import time
-			if self.gains_sent and gains_ack:
-				if time.time() - self.gains_ack_time > 3.0:
-					self.gains_sent = False
-					with state_lock:
-						pendulum_state["gains_ack"] = False
-
-			self.gui.handle_events(
-				events=events,
-				callbacks={
-					"apply_gains": self.apply_gains,
-					"start": self.start_system,
-					"reset": self.reset_system,
-					"toggle_record": self.toggle_record,
-					"toggle_udp": self.toggle_udp,
-					"start_graph": self.start_graph,
-					"stop_graph": self.stop_graph,
-
-					"Y": self.homing,
-					"B": self.finish,
-					"A": self.balance,
-					"X": self.swing_up,
-				}
-			)
+		with state_lock:
+			is_running = pendulum_state["running"]
+			gains_ack = pendulum_state["gains_ack"]
+			reset_ack = pendulum_state["reset_ack"]
+			cmX = pendulum_state["cmX"]
+			theta = pendulum_state["theta"]
 
-			self.ctx = {
-				"is_running": is_running,
-				"gains_sent": self.gains_sent,
-				"gains_ack": gains_ack,
-				"reset_ack": reset_ack,
-				"cmX": cmX,
-				"theta": theta,
-				"mode": self.mode
+		# auto-clear gains_sent if ack too old (same behavior)
+		import time
+		if self.gains_sent and gains_ack:
+			if time.time() - self.gains_ack_time > 3.0:
+				self.gains_sent = False
+				with state_lock:
+					pendulum_state["gains_ack"] = False
+
+		self.gui.handle_events(
+			events=events,
+			callbacks={
+				"apply_gains": self.apply_gains,
+				"start": self.start_system,
+				"reset": self.reset_system,
+				"toggle_record": self.toggle_record,
+				"toggle_udp": self.toggle_udp,
+				"start_graph": self.start_graph,
+				"stop_graph": self.stop_graph,
+
+				"Y": self.homing,
+				"B": self.finish,
+				"A": self.balance,
+				"X": self.swing_up,
 			}
-			#print(self.mode)
-
-			graph_data = {
-					"t_raw": self.t_raw,
-					"cmX": self.cmX_hist,
-					"degree": self.degree_hist,
-					"degree0": self.degree0_hist,
-					"setspeed": self.setspeed_hist,
-					"r1": self.r1_hist,
-					"theta_dot": self.theta_dot_hist,
-					"x_center": self.x_center_hist
-				}
-			self.gui.draw(self.ctx, graph_data)
-
-			self.clock.tick(FPS)
+		)
+
+		self.ctx = {
+			"is_running": is_running,
+			"gains_sent": self.gains_sent,
+			"gains_ack": gains_ack,
+			"reset_ack": reset_ack,
+			"cmX": cmX,
+			"theta": theta,
+			"mode": self.mode,
+			"log_stats": self.data_logger.stats()
+		}
+		#print(self.mode)
+
+		graph_data = self.history
+		self.gui.draw(self.ctx, graph_data)
 
-		if self.serial:
-				try:
-					self.serial.close()
-				except Exception:
-					pass
-		self.udp_broadcaster.close()
-		pygame.quit()
-			# Avoid fatal shutdown errors caused by daemon threads still running.
-		os._exit(0)
 
 
 def main():
-	app = PendulumMonitor()
+	# python main.py                      -> serial STM32
+	# python main.py replay LOG [speed]   -> replay log (speed 0 = secepatnya)
+	# python main.py sim [rate_hz]        -> board STM32 virtual (lib_sim)
+	replay = None
+	ser = None
+	if len(sys.argv) > 2 and sys.argv[1] == "replay":
+		speed = float(sys.argv[3]) if len(sys.argv) > 3 else 1.0
+		replay = LogReplay(sys.argv[2], speed=speed)
+	elif len(sys.argv) > 1 and sys.argv[1] == "sim":
+		rate = float(sys.argv[2]) if len(sys.argv) > 2 else 50.0
+		ser, dev = port_pair(timeout=READ_TIMEOUT)
+		sim = STM32Sim(dev, rate_hz=rate).start()
+	app = PendulumMonitor(replay=replay, ser=ser)
 	app.run()
+	if ser is not None:
+		sim.stop()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,72 @@
+"""
+test_lib_cartpole.py - CartPoleBank: rig saling independen, gains per rig,
+set_gains tidak menyela langkah integrasi.
+"""
+
+import threading
+
+import numpy as np
+
+from lib_cartpole import GAIN_KEYS, MODE_BALANCING, MODE_FINISH, MODE_WAITING, CartPoleBank
+
+# sama dengan DEFAULT_GAINS di main.py
+GAINS = {"K_TH": -2.50 * 57.0 * 12.0, "K_TH_D": -0.030 * 57.0 * 18.0, "K_X": 3.0, "K_X_D": -1.6 * 2.0,
+         "K_X_INT": 0.0}
+
+
+def single(bank, rig):
+    """Bank 1 rig dengan state + gains rig `rig` dari bank."""
+    one = CartPoleBank(1, gains=bank.gains[rig], rod_length=bank.rod_length[rig])
+    for name in ("x", "x_dot", "theta", "theta_dot", "x_int", "mode"):
+        getattr(one, name)[:] = getattr(bank, name)[rig]
+    return one
+
+
+def test_rigs_step_independently():
+    bank = CartPoleBank(5, gains=GAINS, seed=1)
+    bank.set_gains([g * 1.3 for g in bank.gains[3]], rigs=3)
+    bank.rod_length[4] = 0.6
+    bank.reset(rigs=2)
+    refs = [single(bank, rig) for rig in range(bank.n)]
+    bank.advance_to(2.0)
+    for rig, ref in enumerate(refs):
+        ref.advance_to(2.0)
+        assert bank.theta[rig] == ref.theta[0]
+        assert bank.x[rig] == ref.x[0]
+        assert bank.mode[rig] == ref.mode[0]
+    assert bank.mode[2] == MODE_WAITING and bank.u[2] == 0.0
+    assert (bank.mode[[0, 1, 3, 4]] == MODE_BALANCING).all()
+
+
+def test_gains_are_applied_per_rig():
+    bank = CartPoleBank(3, gains=GAINS, seed=2)
+    bank.set_gains((0.0,) * len(GAIN_KEYS), rigs=1)
+    assert bank.gains[1].tolist() == [0.0] * 5
+    assert bank.gains[0].tolist() == bank.gains[2].tolist() == [GAINS[k] for k in GAIN_KEYS]
+    bank.advance_to(3.0)
+    # tanpa gains rig 1 jatuh, rig lain tetap seimbang
+    assert bank.mode.tolist() == [MODE_BALANCING, MODE_FINISH, MODE_BALANCING]
+    assert np.abs(bank.theta[[0, 2]]).max() < np.radians(5)
+
+    # gains dikembalikan + balance -> rig 1 seimbang lagi
+    bank.set_gains(GAINS, rigs=[1])
+    bank.balance(rigs=1)
+    bank.advance_to(6.0)
+    assert (bank.mode == MODE_BALANCING).all()
+
+
+def test_set_gains_waits_for_integration():
+    bank = CartPoleBank(2, gains=GAINS)
+    done = threading.Event()
+
+    def writer():
+        bank.set_gains((1.0,) * len(GAIN_KEYS), rigs=0)
+        done.set()
+
+    with bank._lock:     # seperti advance_to yang sedang jalan
+        t = threading.Thread(target=writer)
+        t.start()
+        assert not done.wait(0.1)
+        assert bank.gains[0, 0] == GAINS["K_TH"]
+    t.join(1.0)
+    assert done.is_set() and bank.gains[0].tolist() == [1.0] * 5
@@ -0,0 +1,100 @@
+"""
+test_lib_com.py - FrameDecoder: resume antar chunk, CRC salah, resync,
+feed vs feed_batch.
+"""
+
+import numpy as np
+import pytest
+
+from lib_com import (FRAME_GAINS_ACK, FRAME_STATUS, STATUS_FRAME_LEN, STATUS_STRUCT, ControlStatus,
+                     FrameDecoder, make_status_packet)
+
+
+def status_frames(n, tick0=0):
+    return [make_status_packet(tick0 + i, [i * 0.5, -i, 1.0, 2.0, 3.0, 4.0, 5.0, 6.0]) for i in range(n)]
+
+
+def ack_frame():
+    body = bytes(range(20))
+    return b"\xAA\xDD" + body + bytes([sum(body) & 0xFF, sum(body) >> 8])
+
+
+def ticks(frames):
+    return [STATUS_STRUCT.unpack(data)[0] for typ, data in frames if typ == FRAME_STATUS]
+
+
+def test_status_packet_layout():
+    pkt = make_status_packet(7, [1.0])
+    assert len(pkt) == STATUS_FRAME_LEN
+    assert pkt[:2] == b"\xAA\xCC"
+
+
+@pytest.mark.parametrize("chunk", [1, 3, 73, 74, 75, 128, 4096])
+def test_feed_resumes_across_chunks(chunk):
+    stream = b"".join(status_frames(20))
+    dec = FrameDecoder()
+    frames = []
+    for i in range(0, len(stream), chunk):
+        frames += dec.feed(stream[i:i + chunk])
+    assert ticks(frames) == list(range(20))
+    assert dec.crc_errors == 0
+    assert dec.skipped_bytes == 0
+
+
+def test_crc_error_drops_only_bad_frame():
+    pkts = status_frames(3)
+    bad = bytearray(pkts[1])
+    bad[10] ^= 0xFF
+    dec = FrameDecoder()
+    frames = dec.feed(pkts[0] + bytes(bad) + pkts[2])
+    assert ticks(frames) == [0, 2]
+    assert dec.crc_errors >= 1
+
+
+def test_resync_after_garbage():
+    pkts = status_frames(2)
+    # sampah berisi byte sync palsu di depan frame valid
+    dec = FrameDecoder()
+    frames = dec.feed(b"\x00\xAA\x01\xAA\xCC\x13" + pkts[0] + b"\xAA" + pkts[1])
+    assert ticks(frames) == [0, 1]
+
+
+def test_header_split_between_reads():
+    pkt = status_frames(1)[0]
+    dec = FrameDecoder()
+    assert dec.feed(pkt[:1]) == []
+    assert dec.feed(pkt[1:3]) == []
+    assert ticks(dec.feed(pkt[3:])) == [0]
+
+
+def test_feed_batch_matches_feed():
+    pkts = status_frames(50)
+    bad = bytearray(pkts[20])
+    bad[40] ^= 0x55
+    pkts[20] = bytes(bad)
+    stream = b"\x01\x02" + b"".join(pkts[:10]) + ack_frame() + b"".join(pkts[10:])
+
+    scalar = FrameDecoder()
+    frames = []
+    batch = FrameDecoder()
+    status, others = [], []
+    for i in range(0, len(stream), 1000):
+        frames += scalar.feed(stream[i:i + 1000])
+        s, o = batch.feed_batch(stream[i:i + 1000])
+        status.append(s)
+        others += o
+    status = np.concatenate(status)
+
+    assert status["logtick"].tolist() == ticks(frames)
+    assert [typ for typ, _ in others] == [FRAME_GAINS_ACK]
+    assert batch.frame_count == scalar.frame_count
+    assert batch.crc_errors == scalar.crc_errors
+
+
+def test_from_batch_raw_is_payload():
+    pkts = status_frames(4)
+    status, _ = FrameDecoder().feed_batch(b"".join(pkts))
+    samples = ControlStatus.from_batch(status)
+    for pkt, sample in zip(pkts, samples):
+        assert bytes(sample.raw) == pkt[4:72]
+        assert tuple(sample) == ControlStatus.from_payload(pkt[4:72]).as_tuple()
@@ -0,0 +1,129 @@
+"""
+test_lib_data.py - Format log PMLOG: tulis lewat DataLogger, baca lagi
+lewat load_log / export_csv / load_session (rotasi + kompresi).
+"""
+
+import glob
+import json
+import os
+
+import numpy as np
+import pytest
+
+from lib_com import STATUS_STRUCT, ControlStatus
+from lib_data import (LOG_HEADER_SIZE, RECORD_DTYPE, DataLogger, export_csv, load_log, load_session,
+                      make_log_header)
+
+
+def sample(i):
+    return (i, i * 0.25, -i * 1.5, 1.0, 2.0, 3.0, 4.0, 5.0, float(i % 3))
+
+
+def record_session(base_dir, samples, **kw):
+    logger = DataLogger(base_dir, fmt="bin", threaded=False, **kw)
+    logger.set_recording(True)
+    for s in samples:
+        logger.handle_sample(s)
+    logger.close()
+    return logger
+
+
+def test_record_size_matches_serial_payload():
+    assert RECORD_DTYPE.itemsize == STATUS_STRUCT.size
+    assert len(make_log_header()) == LOG_HEADER_SIZE
+
+
+def test_bin_round_trip(tmp_path):
+    samples = [sample(i) for i in range(100)]
+    # ControlStatus (payload .raw) dan tuple biasa sama-sama diterima
+    samples[::2] = [ControlStatus.from_payload(STATUS_STRUCT.pack(*s)) for s in samples[::2]]
+    logger = record_session(str(tmp_path), samples)
+    assert logger.stats()["written"] == 100
+
+    (path,) = glob.glob(str(tmp_path / "*.bin"))
+    assert os.path.getsize(path) == LOG_HEADER_SIZE + 100 * RECORD_DTYPE.itemsize
+    data = load_log(path)
+    assert data.dtype == RECORD_DTYPE
+    assert [tuple(r) for r in data.tolist()] == [tuple(s) for s in samples]
+
+
+def test_export_csv_round_trip(tmp_path):
+    samples = [sample(i) for i in range(10)]
+    record_session(str(tmp_path), samples)
+    (path,) = glob.glob(str(tmp_path / "*.bin"))
+    out = export_csv(path)
+    assert out == os.path.splitext(path)[0] + ".csv"
+    assert load_log(out).tolist() == load_log(path).tolist()
+
+
+def test_empty_and_invalid_log(tmp_path):
+    empty = tmp_path / "empty.bin"
+    empty.write_bytes(make_log_header())
+    assert len(load_log(str(empty))) == 0
+
+    bad = tmp_path / "bad.bin"
+    bad.write_bytes(b"\x00" * 200)
+    with pytest.raises(ValueError):
+        load_log(str(bad))
+
+
+def test_partial_trailing_record_ignored(tmp_path):
+    path = tmp_path / "partial.bin"
+    rec = np.array([sample(1), sample(2)], dtype=RECORD_DTYPE).tobytes()
+    path.write_bytes(make_log_header() + rec[:RECORD_DTYPE.itemsize + 10])
+    assert load_log(str(path))["logtick"].tolist() == [1]
+
+
+def test_rotation_compression_and_session(tmp_path):
+    samples = [sample(i) for i in range(100)]
+    logger = DataLogger(str(tmp_path), fmt="bin", threaded=False, compress=True, codec=".gz",
+                        rotate_bytes=LOG_HEADER_SIZE + 20 * RECORD_DTYPE.itemsize)
+    logger.set_recording(True)
+    for i in range(0, 100, 10):
+        for s in samples[i:i + 10]:
+            logger.handle_sample(s)
+        logger.drain()
+    logger.close()
+
+    (manifest,) = glob.glob(str(tmp_path / "*.manifest.json"))
+    names = sorted(os.listdir(tmp_path))
+    assert not [n for n in names if n.endswith(".tmp") or n.endswith(".bin")]
+    with open(manifest) as f:
+        segments = json.load(f)["segments"]
+    assert [seg["rows"] for seg in segments if seg["rows"]] == [20] * 5
+    assert all(seg["compressed"] and seg["file"] in names for seg in segments)
+
+    data = load_session(manifest)
+    assert [tuple(r) for r in data.tolist()] == samples
+    assert load_session(manifest, tick_range=(35, 44))["logtick"].tolist() == list(range(35, 45))
+
+
+# enqueued = sample yang diterima queue (drop_newest menolak sample baru)
+@pytest.mark.parametrize("policy, enqueued, kept", [("drop_oldest", 10, [6, 7, 8, 9]),
+                                                    ("drop_newest", 4, [0, 1, 2, 3])])
+def test_queue_drop_accounting(tmp_path, policy, enqueued, kept):
+    logger = DataLogger(str(tmp_path), fmt="bin", threaded=False, queue_size=4, policy=policy)
+    logger.set_recording(True)
+    for i in range(10):
+        logger.handle_sample(sample(i))
+    logger.close()
+    st = logger.stats()
+    assert (st["enqueued"], st["written"], st["dropped"], st["max_depth"]) == (enqueued, 4, 6, 4)
+    (path,) = glob.glob(str(tmp_path / "*.bin"))
+    assert load_log(path)["logtick"].tolist() == kept
+
+
+def test_discarded_when_recording_stops(tmp_path):
+    logger = DataLogger(str(tmp_path), fmt="bin", threaded=False)
+    logger.set_recording(True)
+    for i in range(5):
+        logger.handle_sample(sample(i))
+    logger.set_recording(False)
+    logger.drain()
+    st = logger.stats()
+    assert (st["written"], st["discarded"], st["depth"]) == (0, 5, 0)
+
+
+def test_block_policy_needs_worker_thread(tmp_path):
+    with pytest.raises(ValueError):
+        DataLogger(str(tmp_path), fmt="bin", threaded=False, policy="block")
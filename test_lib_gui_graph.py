@@ -0,0 +1,68 @@
+"""
+test_lib_gui_graph.py - _StreamingRegression vs _linreg (range bergeser,
+data datar).
+"""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pygame")
+
+from lib_gui_graph import _linreg, _StreamingRegression  # noqa: E402
+
+
+def load(reg, x, y):
+    """Isi buffer x/y langsung (push() menurunkan y dari theta)."""
+    n = len(x)
+    reg._x[:n] = x
+    reg._y[:n] = y
+    reg.ready_end = reg.seq_end = n
+
+
+def slide(reg, x, y, width, step):
+    for hi in range(width, len(x) + 1, step):
+        lo = hi - width
+        reg.set_range(lo, hi)
+        yield reg.fit(), _linreg(x[lo:hi], y[lo:hi])
+
+
+def test_sliding_window_matches_linreg():
+    rng = np.random.default_rng(1)
+    x = np.sin(np.cumsum(rng.normal(0, 0.05, 3000)))
+    y = -14.7 * x + 0.3 + rng.normal(0, 0.5, 3000)
+    reg = _StreamingRegression(4096)
+    load(reg, x, y)
+    for (a, b), (ra, rb) in slide(reg, x, y, 500, 37):
+        assert a == pytest.approx(ra, rel=1e-9)
+        assert b == pytest.approx(rb, rel=1e-9, abs=1e-9)
+
+
+def test_constant_x_is_not_fitted():
+    x = np.full(2880, np.sin(0.2))
+    y = np.random.default_rng(2).normal(0, 1e-3, 2880)
+    reg = _StreamingRegression(4096)
+    load(reg, x, y)
+    for fit, _ in slide(reg, x, y, 1000, 50):
+        assert fit == (0.0, 0.0)
+
+
+def test_flat_after_motion_is_not_fitted():
+    # range bergeser dari data bergerak ke data diam: sisa pengurangan
+    # tidak boleh menghasilkan slope palsu
+    rng = np.random.default_rng(3)
+    moving = np.sin(np.linspace(0, 20, 2000))
+    x = np.concatenate([moving, np.zeros(3000)])
+    y = np.concatenate([-15.0 * moving + rng.normal(0, 0.1, 2000), np.zeros(3000)])
+    reg = _StreamingRegression(8192)
+    load(reg, x, y)
+    fits = list(slide(reg, x, y, 1000, 20))
+    for fit, ref in fits:
+        assert (fit[0] == 0.0) == (ref[0] == 0.0)
+    assert fits[-1][0] == (0.0, 0.0)
+
+
+def test_too_few_samples():
+    reg = _StreamingRegression(16)
+    load(reg, np.array([0.1]), np.array([1.0]))
+    reg.set_range(0, 1)
+    assert reg.fit() == (0.0, 0.0)
@@ -0,0 +1,101 @@
+"""
+test_lib_index.py - LogIndex: update() inkremental, query() per tick /
+mode, read() langsung dari offset.
+"""
+
+import gzip
+import os
+
+import numpy as np
+import pytest
+
+import lib_index
+from lib_data import RECORD_DTYPE, export_csv, load_log, make_log_header
+from lib_index import BLOCK_ROWS, LogIndex
+
+
+def records(n, tick0=0, mode_every=300):
+    data = np.zeros(n, dtype=RECORD_DTYPE)
+    data["logtick"] = tick0 + np.arange(n) * 5
+    data["degree"] = np.arange(n) * 0.5
+    data["mode"] = (np.arange(n) // mode_every) % 3
+    return data
+
+
+def write_bin(path, data):
+    with open(path, "wb") as f:
+        f.write(make_log_header())
+        f.write(data.tobytes())
+
+
+@pytest.fixture
+def log_dir(tmp_path):
+    write_bin(tmp_path / "a.bin", records(1000))
+    write_bin(tmp_path / "b.bin", records(600, tick0=100000))
+    export_csv(str(tmp_path / "b.bin"), str(tmp_path / "c.csv"))
+    with open(tmp_path / "a.bin", "rb") as f:
+        (tmp_path / "d.bin.gz").write_bytes(gzip.compress(f.read()))
+    return tmp_path
+
+
+def test_update_is_incremental(log_dir):
+    idx = LogIndex(str(log_dir))
+    updated, removed = idx.update()
+    assert sorted(updated) == ["a.bin", "b.bin", "c.csv", "d.bin.gz"] and removed == []
+    assert idx.files["a.bin"]["rows"] == 1000
+    assert idx.files["c.csv"]["tick_min"] == 100000
+
+    # file tidak berubah -> tidak di-summarize ulang, juga setelah load dari sidecar
+    again = LogIndex(str(log_dir))
+    assert again.files == idx.files
+    assert again.update() == ([], [])
+
+    write_bin(log_dir / "b.bin", records(700, tick0=100000))
+    os.remove(log_dir / "d.bin.gz")
+    (log_dir / "e.bin.gz.tmp").write_bytes(b"half written")
+    assert again.update() == (["b.bin"], ["d.bin.gz"])
+    assert again.files["b.bin"]["rows"] == 700
+
+
+def test_query_by_tick_range(log_dir):
+    idx = LogIndex(str(log_dir))
+    idx.update()
+    lo, hi = 1000, 1500            # a.bin / d.bin.gz baris 200..300
+    hits = idx.query((lo, hi))
+    assert [os.path.basename(h["file"]) for h in hits] == ["a.bin", "d.bin.gz"]
+    for hit in hits:
+        assert hit["row_start"] <= 200 and hit["row_stop"] >= 301
+        assert hit["row_stop"] - hit["row_start"] <= 2 * BLOCK_ROWS
+        rows = idx.read(hit, (lo, hi))
+        assert rows["logtick"].tolist() == list(range(lo, hi + 1, 5))
+    assert idx.query((10 ** 9, 10 ** 9 + 1)) == []
+
+
+def test_query_by_mode(log_dir):
+    idx = LogIndex(str(log_dir))
+    idx.update()
+    for name in ("a.bin", "c.csv"):
+        full = load_log(str(log_dir / name))
+        hits = [h for h in idx.query(mode=1) if os.path.basename(h["file"]) == name]
+        assert hits[0]["row_start"] > 0     # blok tanpa mode 1 dilewati
+        got = np.concatenate([idx.read(h, mode=1) for h in hits])
+        assert got.tolist() == full[full["mode"] == 1].tolist()
+    assert idx.query(mode=9) == []
+
+
+def test_read_uses_offset_without_loading_file(log_dir, monkeypatch):
+    idx = LogIndex(str(log_dir))
+    idx.update()
+
+    def no_full_load(path):
+        raise AssertionError(f"load_log({path}) dipanggil")
+
+    monkeypatch.setattr(lib_index, "load_log", no_full_load)
+    for name in ("a.bin", "c.csv"):
+        full = load_log(str(log_dir / name))
+        hits = [h for h in idx.query((100000 + 1300, 100000 + 1800)) + idx.query((1300, 1800))
+                if os.path.basename(h["file"]) == name]
+        assert hits and hits[0]["offset"] is not None
+        for hit in hits:
+            rows = idx.read(hit)
+            assert rows.tolist() == full[hit["row_start"]:hit["row_stop"]].tolist()
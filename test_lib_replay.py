@@ -0,0 +1,149 @@
+"""
+test_lib_replay.py - LogReplay dengan jam palsu: pacing per speed, seek,
+akhir file (selesai / loop / stop).
+"""
+
+import types
+
+import numpy as np
+import pytest
+
+import lib_replay
+from lib_data import RECORD_DTYPE
+from lib_replay import LogReplay, replay_control_status
+
+
+class FakeClock:
+    """perf_counter() palsu; Event.wait() memajukan jam, bukan tidur."""
+
+    def __init__(self):
+        self.now = 100.0
+        self.waited = 0.0
+
+    def perf_counter(self):
+        return self.now
+
+    def advance(self, dt):
+        self.now += dt
+
+
+class FakeStop:
+    def __init__(self, clock):
+        self.clock = clock
+        self.flag = False
+
+    def is_set(self):
+        return self.flag
+
+    def set(self):
+        self.flag = True
+
+    def wait(self, timeout):
+        # wait sungguhan tidak pernah 0 detik; tanpa batas bawah sisa
+        # pembulatan due_tick bisa di bawah ulp jam -> jam tidak maju
+        timeout = max(timeout, 1e-6)
+        self.clock.advance(timeout)
+        self.clock.waited += timeout
+        return self.flag
+
+
+def records(n, tick0=1000, step=2):
+    data = np.zeros(n, dtype=RECORD_DTYPE)
+    data["logtick"] = tick0 + np.arange(n) * step
+    data["degree"] = np.arange(n) * 0.1
+    return data
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(lib_replay, "time", types.SimpleNamespace(perf_counter=clock.perf_counter))
+    return clock
+
+
+def make(clock, data, **kw):
+    replay = LogReplay(data, **kw)
+    replay._stop = FakeStop(clock)
+    return replay
+
+
+def ticks(batch):
+    return batch["logtick"].tolist()
+
+
+@pytest.mark.parametrize("speed", [1.0, 4.0, 0.5])
+def test_pacing_follows_logtick(clock, speed):
+    replay = make(clock, records(1000), speed=speed)   # 2 ms per sample, ~2 s
+    assert ticks(replay.next_batch()) == [1000]
+    clock.advance(0.1005 / speed)                     # ~100 ms data time
+    assert ticks(replay.next_batch()) == list(range(1002, 1101, 2))
+
+    got = 51
+    start = clock.now
+    while True:
+        batch = replay.next_batch()
+        if len(batch) == 0:
+            break
+        got += len(batch)
+    assert got == 1000
+    # sisa log (tick 1100..2998) butuh 1.898 s data time / speed
+    assert clock.now - start == pytest.approx(1.898 / speed, abs=0.051)
+
+
+def test_speed_zero_is_unpaced(clock):
+    replay = make(clock, records(1000), speed=0, batch=256)
+    sizes = [len(replay.next_batch()) for _ in range(5)]
+    assert sizes == [256, 256, 256, 232, 0]
+    assert clock.waited == 0.0
+
+
+def test_batch_limit_when_behind(clock):
+    replay = make(clock, records(1000), speed=1.0, batch=64)
+    replay.next_batch()
+    clock.advance(10.0)
+    assert len(replay.next_batch()) == 64
+
+
+def test_seek(clock):
+    data = records(1000)
+    replay = make(clock, data, speed=1.0)
+    replay.next_batch()
+    replay.seek(1501)                      # antara dua sample -> sample berikutnya
+    assert replay.position == 251
+    # anchor direset: tidak ada burst dari waktu yang sudah lewat
+    clock.advance(5.0)
+    replay.seek(1600)
+    assert ticks(replay.next_batch()) == [1600]
+    clock.advance(0.01)
+    assert ticks(replay.next_batch()) == list(range(1602, 1611, 2))
+
+    replay.seek_row(-5)
+    assert replay.position == 0
+    replay.seek(10 ** 9)
+    assert replay.position == len(data)
+    assert len(replay.next_batch()) == 0
+
+
+def test_end_of_file(clock):
+    replay = make(clock, records(300), speed=0, batch=128)
+    seen = []
+    replay_control_status(replay, callback=lambda s: seen.append(s.logtick))
+    assert replay.done.is_set()
+    assert replay.sent == 300 and seen == list(range(1000, 1600, 2))
+    assert len(replay.next_batch()) == 0
+
+
+def test_loop_restarts(clock):
+    replay = make(clock, records(300), speed=0, batch=128, loop=True)
+    got = [ticks(replay.next_batch()) for _ in range(4)]
+    assert [len(b) for b in got] == [128, 128, 44, 128]
+    assert got[3][0] == 1000
+    assert not replay.done.is_set()
+
+
+def test_stop_and_empty_log(clock):
+    replay = make(clock, records(300), speed=1.0)
+    replay.next_batch()
+    replay.stop()
+    assert len(replay.next_batch()) == 0
+    assert len(make(clock, records(0), loop=True).next_batch()) == 0
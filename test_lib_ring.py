@@ -0,0 +1,65 @@
+"""
+test_lib_ring.py - TelemetryRing: window berurutan saat wraparound.
+"""
+
+import numpy as np
+
+from lib_ring import HIST_FIELDS, TelemetryRing
+
+
+def row(i):
+    return (float(i),) + (0.0,) * (len(HIST_FIELDS) - 1)
+
+
+def test_empty():
+    ring = TelemetryRing(8)
+    assert len(ring) == 0
+    assert len(ring.latest(4)) == 0
+
+
+def test_window_before_wrap():
+    ring = TelemetryRing(8)
+    for i in range(5):
+        ring.append(row(i))
+    assert len(ring) == 5
+    assert ring.window(1, 4)["t_raw"].tolist() == [1, 2, 3]
+    assert ring.latest(10)["t_raw"].tolist() == [0, 1, 2, 3, 4]
+
+
+def test_window_across_wrap_is_contiguous_view():
+    ring = TelemetryRing(8)
+    for i in range(21):
+        ring.append(row(i))
+    assert len(ring) == 8
+    w = ring.latest(8)
+    assert w["t_raw"].tolist() == list(range(13, 21))
+    assert np.shares_memory(w, ring._buf)
+
+
+def test_window_clipped_to_capacity():
+    ring = TelemetryRing(8)
+    for i in range(30):
+        ring.append(row(i))
+    # sample yang sudah tertimpa tidak dikembalikan
+    assert ring.window(0)["t_raw"].tolist() == list(range(22, 30))
+    assert ring.window(25, 28)["t_raw"].tolist() == [25, 26, 27]
+    assert len(ring.window(28, 28)) == 0
+
+
+def test_every_offset():
+    ring = TelemetryRing(5)
+    for i in range(40):
+        ring.append(row(i))
+        for n in range(1, 6):
+            expect = list(range(max(0, i + 1 - n), i + 1))
+            assert ring.latest(n)["t_raw"].tolist() == expect
+
+
+def test_window_ending_in_overwritten_range_is_empty():
+    ring = TelemetryRing(8)
+    for i in range(20):
+        ring.append(row(i))
+    # sample 0..11 sudah tertimpa
+    assert len(ring.window(0, 5)) == 0
+    assert len(ring.window(4, 12)) == 0
+    assert ring.window(10, 14)["t_raw"].tolist() == [12, 13]
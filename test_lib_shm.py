@@ -0,0 +1,103 @@
+"""
+test_lib_shm.py - Bus shared memory: poll/read, pembaca tertinggal,
+validasi seqlock saat penulis melewati satu putaran ring.
+"""
+
+import os
+import threading
+
+import numpy as np
+import pytest
+
+from lib_com import STATUS_STRUCT, ControlStatus
+from lib_shm import ShmPublisher, ShmReader
+
+
+def sample(i):
+    return (i, i * 0.5, -i, 1.0, 2.0, 3.0, 4.0, 5.0, 6.0)
+
+
+@pytest.fixture
+def bus(request):
+    name = f"pd_test_{os.getpid()}_{request.node.name}"[:30]
+    pub = ShmPublisher(name, capacity=8)
+    yield pub
+    pub.close()
+
+
+def test_poll_sees_new_samples_only(bus):
+    bus.publish(sample(0))
+    reader = ShmReader(bus.name)
+    for i in range(1, 4):
+        bus.publish(ControlStatus.from_payload(STATUS_STRUCT.pack(*sample(i))))
+    view = reader.poll()
+    assert view["logtick"].tolist() == [1, 2, 3]
+    assert reader.valid()
+    assert len(reader.poll()) == 0
+    del view
+    reader.close()
+
+
+def test_from_start_and_wraparound(bus):
+    for i in range(20):
+        bus.publish(sample(i))
+    reader = ShmReader(bus.name, from_start=True)
+    assert reader.poll()["logtick"].tolist() == list(range(12, 20))
+    assert reader.latest(3)["degree"].tolist() == [8.5, 9.0, 9.5]
+    reader.close()
+
+
+def test_lagging_reader_counts_dropped(bus):
+    reader = ShmReader(bus.name)
+    for i in range(30):
+        bus.publish(sample(i))
+    out = reader.read()
+    assert out["logtick"].tolist() == list(range(22, 30))
+    assert reader.dropped == 22
+    reader.close()
+
+
+def test_view_invalid_after_writer_laps(bus):
+    reader = ShmReader(bus.name)
+    for i in range(4):
+        bus.publish(sample(i))
+    view = reader.poll()
+    for i in range(4, 4 + bus.capacity):
+        bus.publish(sample(i))
+    assert not reader.valid()
+    del view
+    reader.close()
+
+
+def test_second_publisher_rejected_and_close_flag(bus):
+    with pytest.raises(FileExistsError):
+        ShmPublisher(bus.name, capacity=8)
+    reader = ShmReader(bus.name)
+    assert not reader.closed and reader.writer_pid == os.getpid()
+    bus.close()
+    assert reader.closed
+    reader.close()
+
+
+def test_concurrent_read_is_consistent(bus):
+    """Sample hasil read() tidak pernah campuran dua putaran ring."""
+    n_total = 20000
+    reader = ShmReader(bus.name, from_start=True)
+
+    def writer():
+        for i in range(n_total):
+            bus.publish(sample(i))
+
+    t = threading.Thread(target=writer)
+    t.start()
+    got = []
+    while t.is_alive() or reader.available():
+        got.append(reader.read(max_n=5))
+    t.join()
+    data = np.concatenate(got)
+    ticks = data["logtick"].astype(np.int64)
+    assert (np.diff(ticks) > 0).all()
+    assert (data["degree"] == ticks * 0.5).all()
+    assert (data["cmX"] == -ticks).all()
+    assert len(data) + reader.dropped == n_total
+    reader.close()
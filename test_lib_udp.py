@@ -0,0 +1,145 @@
+"""
+test_lib_udp.py - UDPBroadcaster: rate group (decimation per logtick),
+subset field, subscribe / unsubscribe lewat datagram kontrol, lease.
+"""
+
+import time
+import types
+
+import pytest
+
+import lib_udp
+from lib_udp import UDPBroadcaster
+from lib_wire import FIELD_MASK_ALL, OP_UNSUBSCRIBE, decode_datagram, encode_subscribe, field_mask
+
+
+class FakeTransport:
+    """Tangkap sendto() tanpa socket sungguhan."""
+
+    def __init__(self):
+        self.sent = []
+
+    def sendto(self, packet, addr):
+        self.sent.append((addr, packet))
+
+    def close(self):
+        pass
+
+    def records(self, addr):
+        out = []
+        for a, packet in self.sent:
+            if a == addr:
+                out.extend(decode_datagram(packet)[2])
+        return out
+
+
+@pytest.fixture
+def make_bc():
+    made = []
+
+    def make(targets, **kw):
+        bc = UDPBroadcaster(batch=32, threaded=False, targets=targets, **kw)
+        bc.attach_transport(FakeTransport())
+        bc.enable()
+        made.append(bc)
+        return bc
+
+    yield make
+    for bc in made:
+        bc.close()
+
+
+def send(bc, ticks):
+    for t in ticks:
+        bc.send_control_status((t, t * 0.5, -1.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0))
+    bc.pump()
+
+
+def ticks_of(records):
+    return [int(r["logtick"]) for r in records]
+
+
+FULL = ("127.0.0.1", 5001)
+SLOW = ("127.0.0.1", 5002)
+
+
+def test_rate_groups_decimate_on_logtick(make_bc):
+    bc = make_bc([FULL + (None, None), SLOW + (10, None)])
+    # satu burst (waktu host sama) berisi 1 detik data
+    send(bc, range(1000))
+    send(bc, range(1000, 1500))
+    tx = bc.transport
+    assert ticks_of(tx.records(FULL)) == list(range(1500))
+    assert ticks_of(tx.records(SLOW)) == list(range(0, 1500, 100))
+    groups = {g["rate_hz"]: g for g in bc.get_stats()["groups"]}
+    assert groups[10.0]["sample_count"] == 15 and groups[None]["sample_count"] == 1500
+
+
+def test_rate_group_restarts_when_logtick_goes_back(make_bc):
+    bc = make_bc([SLOW + (10, None)])
+    send(bc, range(5000, 5300))
+    send(bc, range(0, 250))       # STM32 reset / replay loop
+    assert ticks_of(bc.transport.records(SLOW)) == [5000, 5100, 5200, 0, 100, 200]
+
+
+def test_field_subset(make_bc):
+    fields = ("logtick", "degree")
+    bc = make_bc([FULL + (None, None), SLOW + (None, fields)])
+    send(bc, range(10))
+    by_addr = {}
+    for addr, packet in bc.transport.sent:
+        by_addr.setdefault(addr, []).append(decode_datagram(packet))
+    (_, mask, recs), = by_addr[SLOW]
+    assert mask == field_mask(fields)
+    assert recs.dtype.names == fields
+    assert recs["degree"].tolist() == [t * 0.5 for t in range(10)]
+    assert by_addr[FULL][0][1] == FIELD_MASK_ALL
+
+
+def test_subscribe_and_unsubscribe(make_bc):
+    bc = make_bc([FULL + (None, None)])
+    peer = ("127.0.0.2", 40000)
+    assert bc.handle_control(encode_subscribe(port=6000, rate_hz=10, fields=("logtick",)), peer)
+    assert bc.handle_control(encode_subscribe(rate_hz=0), ("127.0.0.3", 41000))
+    assert not bc.handle_control(b"junk", peer)
+    send(bc, range(300))
+    tx = bc.transport
+    assert ticks_of(tx.records(("127.0.0.2", 6000))) == [0, 100, 200]
+    assert ticks_of(tx.records(("127.0.0.3", 41000))) == list(range(300))
+
+    assert bc.handle_control(encode_subscribe(port=6000, op=OP_UNSUBSCRIBE), peer)
+    assert ("127.0.0.2", 6000) not in bc._targets
+    tx.sent.clear()
+    send(bc, range(300, 400))
+    assert {addr for addr, _ in tx.sent} == {FULL, ("127.0.0.3", 41000)}
+
+
+def test_static_target_not_changed_by_control(make_bc):
+    bc = make_bc([FULL + (None, None)])
+    assert bc.handle_control(encode_subscribe(port=FULL[1], rate_hz=1), (FULL[0], 12345))
+    assert bc.handle_control(encode_subscribe(port=FULL[1], op=OP_UNSUBSCRIBE), (FULL[0], 12345))
+    assert bc._targets[FULL] == (None, FIELD_MASK_ALL, None)
+
+
+def test_lease_expiry(make_bc, monkeypatch):
+    now = [1000.0]
+    clock = types.SimpleNamespace(monotonic=lambda: now[0], perf_counter=time.perf_counter, time=time.time)
+    monkeypatch.setattr(lib_udp, "time", clock)
+    bc = make_bc([FULL + (None, None)])
+    peer = ("127.0.0.2", 6000)
+    bc.handle_control(encode_subscribe(lease_s=5), peer)
+    send(bc, range(10))
+    assert len(bc.transport.records(peer)) == 10
+
+    # lease diperpanjang dengan subscribe ulang sebelum habis
+    now[0] += 4.0
+    bc.handle_control(encode_subscribe(lease_s=5), peer)
+    now[0] += 4.0
+    send(bc, range(10, 20))
+    assert len(bc.transport.records(peer)) == 20
+
+    now[0] += 2.0
+    send(bc, range(20, 30))
+    assert peer not in bc._targets
+    assert len(bc.transport.records(peer)) == 20
+    assert len(bc.transport.records(FULL)) == 30
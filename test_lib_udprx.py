@@ -0,0 +1,84 @@
+"""
+test_lib_udprx.py - BatchReceiver.drain: jalur vektor, batch campuran,
+ConnectionResetError, RecordSink -> load_log.
+"""
+
+import numpy as np
+
+from lib_com import STATUS_STRUCT
+from lib_data import load_log
+from lib_udprx import MAX_RESETS, BatchReceiver, RecordSink
+from lib_wire import encode_datagram, field_mask
+
+
+class FakeSock:
+    """recv_into dari daftar datagram / exception, lalu BlockingIOError."""
+
+    def __init__(self, items):
+        self.items = list(items)
+
+    def recv_into(self, buf):
+        if not self.items:
+            raise BlockingIOError
+        item = self.items.pop(0)
+        if isinstance(item, BaseException):
+            raise item
+        buf[:len(item)] = item
+        return len(item)
+
+
+def payload(i):
+    return STATUS_STRUCT.pack(i, i * 0.5, -i, 1.0, 2.0, 3.0, 4.0, 5.0, 6.0)
+
+
+def datagrams(seqs, per=3):
+    return [encode_datagram(s, [payload(s * per + j) for j in range(per)]) for s in seqs]
+
+
+def test_uniform_batch_and_loss():
+    rx = BatchReceiver(FakeSock(datagrams([0, 1, 3, 4])), slots=16)
+    rec = rx.drain()
+    assert rec["logtick"].tolist() == [0, 1, 2, 3, 4, 5, 9, 10, 11, 12, 13, 14]
+    st = rx.stats()
+    assert (st["packets"], st["samples"], st["lost"], st["errors"]) == (4, 12, 1, 0)
+
+
+def test_subset_mask_fills_missing_with_nan():
+    mask = field_mask(("logtick", "cmX"))
+    rx = BatchReceiver(FakeSock([encode_datagram(0, [payload(1), payload(2)], mask)]), slots=4)
+    rec = rx.drain()
+    assert rec["logtick"].tolist() == [1, 2]
+    assert rec["cmX"].tolist() == [-1.0, -2.0]
+    assert np.isnan(rec["degree"]).all()
+
+
+def test_mixed_batch_legacy_and_garbage():
+    items = datagrams([0], per=2) + [payload(50), b"junk"] + datagrams([1], per=1)
+    rx = BatchReceiver(FakeSock(items), slots=8)
+    assert rx.drain()["logtick"].tolist() == [0, 1, 50, 1]
+    assert rx.stats()["errors"] == 1
+
+
+def test_reset_retries_same_slot():
+    items = datagrams([0]) + [ConnectionResetError()] + datagrams([1]) + [ConnectionResetError()]
+    rx = BatchReceiver(FakeSock(items + datagrams([2])), slots=3)
+    rec = rx.drain()
+    assert rec["logtick"].tolist() == list(range(9))
+    assert rx.stats()["packets"] == 3
+
+
+def test_reset_storm_is_capped():
+    sock = FakeSock([ConnectionResetError() for _ in range(MAX_RESETS + 5)] + datagrams([0]))
+    rx = BatchReceiver(sock, slots=4)
+    assert len(rx.drain()) == 0
+    assert len(sock.items) == 5
+
+
+def test_record_sink_round_trip(tmp_path):
+    rx = BatchReceiver(FakeSock(datagrams([0, 1])), slots=4)
+    sink = RecordSink(str(tmp_path))
+    sink.write(rx.drain())
+    sink.close()
+    data = load_log(sink.path)
+    assert sink.rows == 6
+    assert data.tobytes() == b"".join(payload(i) for i in range(6))
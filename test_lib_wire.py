@@ -0,0 +1,103 @@
+"""
+test_lib_wire.py - Datagram telemetry v1, format lama 68 byte, datagram
+kontrol, SeqTracker.
+"""
+
+import numpy as np
+import pytest
+
+from lib_com import STATUS_FIELDS, STATUS_STRUCT
+from lib_data import RECORD_DTYPE
+from lib_wire import (DEFAULT_LEASE_S, FIELD_MASK_ALL, MTU_PAYLOAD, OP_SUBSCRIBE, OP_UNSUBSCRIBE, SEQ_MOD,
+                      WIRE_HEADER, SeqTracker, decode_control, decode_datagram, encode_datagram,
+                      encode_subscribe, field_mask, mask_dtype, max_samples)
+
+
+def payloads(n):
+    return [STATUS_STRUCT.pack(i, i * 0.5, -i, 1.0, 2.0, 3.0, 4.0, 5.0, 6.0) for i in range(n)]
+
+
+def test_round_trip_full_mask():
+    p = payloads(5)
+    seq, mask, records = decode_datagram(encode_datagram(42, p))
+    assert (seq, mask) == (42, FIELD_MASK_ALL)
+    assert records.tobytes() == b"".join(p)
+    assert records["logtick"].tolist() == [0, 1, 2, 3, 4]
+
+
+def test_round_trip_field_subset():
+    mask = field_mask(("logtick", "degree", "cmX"))
+    data = encode_datagram(SEQ_MOD + 7, payloads(3), mask)
+    assert len(data) == WIRE_HEADER.size + 3 * (4 + 8 + 8)
+    seq, got_mask, records = decode_datagram(data)
+    assert (seq, got_mask) == (7, mask)
+    assert records.dtype.names == ("logtick", "degree", "cmX")
+    assert records["cmX"].tolist() == [0.0, -1.0, -2.0]
+
+
+def test_array_and_bytes_encode_identical():
+    p = payloads(4)
+    arr = np.frombuffer(b"".join(p), dtype=RECORD_DTYPE)
+    mask = field_mask(("logtick", "theta"))
+    assert encode_datagram(1, arr, mask) == encode_datagram(1, p, mask)
+
+
+def test_legacy_single_sample():
+    (p,) = payloads(1)
+    seq, mask, records = decode_datagram(p)
+    assert seq is None and mask == FIELD_MASK_ALL
+    assert tuple(records[0].tolist()) == STATUS_STRUCT.unpack(p)
+
+
+@pytest.mark.parametrize("mutate", [
+    lambda d: d[:-1],                        # panjang tidak cocok dengan count
+    lambda d: d[:4] + b"\x00" + d[5:],       # version 0
+    lambda d: d[:6] + b"\x00\x00" + d[8:],   # mask kosong
+    lambda d: d[:6] + b"\xff\xff" + d[8:],   # bit mask di luar STATUS_FIELDS
+    lambda d: b"XXXX" + d[4:],               # magic salah, bukan 68 byte
+])
+def test_invalid_datagrams(mutate):
+    assert decode_datagram(mutate(encode_datagram(0, payloads(2)))) is None
+
+
+def test_max_samples_fit_mtu():
+    for mask in (FIELD_MASK_ALL, field_mask(("logtick",)), field_mask(("degree", "cmX"))):
+        n = max_samples(mask)
+        assert WIRE_HEADER.size + n * mask_dtype(mask).itemsize <= MTU_PAYLOAD
+        assert WIRE_HEADER.size + (n + 1) * mask_dtype(mask).itemsize > MTU_PAYLOAD
+
+
+def test_control_round_trip():
+    msg = encode_subscribe(port=5000, rate_hz=25.0, fields=STATUS_FIELDS[:2])
+    assert decode_control(msg) == (OP_SUBSCRIBE, 5000, 25.0, 0b11, DEFAULT_LEASE_S)
+    op, port, rate, mask, lease = decode_control(encode_subscribe(op=OP_UNSUBSCRIBE))
+    assert (op, port, rate, mask) == (OP_UNSUBSCRIBE, 0, 0.0, FIELD_MASK_ALL)
+    assert decode_control(b"PDSC") is None
+    assert decode_control(encode_subscribe(rate_hz=-1.0)) is None
+
+
+def test_seq_tracker_loss_and_reorder():
+    tr = SeqTracker()
+    assert [tr.update(s) for s in (10, 11, 14, 13, 15)] == [0, 0, 2, 0, 0]
+    assert (tr.received, tr.lost, tr.reordered) == (5, 2, 1)
+
+
+def test_seq_tracker_wraparound():
+    tr = SeqTracker()
+    assert [tr.update(s) for s in (SEQ_MOD - 2, SEQ_MOD - 1, 1)] == [0, 0, 1]
+    assert tr.expected == 2
+
+
+@pytest.mark.parametrize("seqs", [
+    [5, 6, 7, 8],
+    [5, 7, 8, 12],
+    [SEQ_MOD - 3, SEQ_MOD - 1, 0, 3],
+    [5, 9, 7, 10, 11],                       # reorder -> jalur per elemen
+])
+def test_update_many_matches_update(seqs):
+    one, many = SeqTracker(), SeqTracker()
+    lost_one = sum(one.update(s) for s in seqs)
+    lost_many = many.update_many(seqs[:2]) + many.update_many(seqs[2:])
+    assert lost_many == lost_one
+    assert (many.received, many.lost, many.reordered, many.expected) == \
+        (one.received, one.lost, one.reordered, one.expected)
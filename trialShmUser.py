@@ -0,0 +1,50 @@
+"""
+trialShmUser.py - Contoh konsumen lokal bus shared memory (lib_shm)
+
+Jalankan di mesin yang sama dengan main.py (SHM_NAME aktif). Tiap 20 ms
+mengambil sample baru tanpa copy, mencetak rate dan sample terakhir.
+Berhenti saat main.py menutup bus atau Ctrl+C.
+"""
+
+import time
+
+from lib_shm import SHM_NAME, ShmReader
+
+POLL_INTERVAL = 0.02  # detik
+
+
+def main():
+    try:
+        bus = ShmReader(SHM_NAME)
+    except FileNotFoundError:
+        print(f"Bus {SHM_NAME} belum ada (main.py belum jalan / SHM_NAME = None)")
+        return
+    print(f"Bus {SHM_NAME}: capacity {bus.capacity}, writer pid {bus.writer_pid}")
+    print("Press Ctrl+C to stop\n")
+
+    total = 0
+    t0 = time.time()
+    last_print = t0
+    try:
+        while not bus.closed:
+            new = bus.poll()
+            if len(new):
+                total += len(new)
+                last = new[-1]
+                now = time.time()
+                if now - last_print >= 1.0:
+                    print(f"\r[Bus] samples={total:9d} rate={total / (now - t0):8.1f} Hz "
+                          f"dropped={bus.dropped:6d} tick={int(last['logtick']):8d} "
+                          f"deg={last['degree']:7.2f} cmX={last['cmX']:6.1f}", end='', flush=True)
+                    last_print = now
+                del new, last
+            time.sleep(POLL_INTERVAL)
+        print("\nWriter closed the bus.")
+    except KeyboardInterrupt:
+        print()
+    finally:
+        bus.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,160 +1,124 @@
 """
-udp_receiver.py - UDP Receiver dengan Auto-Save ke CSV
+udp_receiver.py - UDP Receiver dengan Auto-Save ke log biner
 
-Menerima data pendulum via UDP broadcast dan otomatis save ke CSV.
+Menerima data pendulum via UDP broadcast dan otomatis save ke file .bin
+(format PMLOG sama dengan DataLogger; konversi ke CSV: python exportCsv.py <file>).
+
+Socket di-drain per batch (lib_udprx.BatchReceiver): buffer slot
+dialokasikan sekali, decode NumPy, satu write per batch, stats per detik
+-> puluhan kHz tanpa loss di satu core.
 """
 
-import socket
-import struct
-import csv
 import os
 import time
-from datetime import datetime
+
+from lib_udprx import RCVBUF_BYTES, BatchReceiver, RecordSink, open_socket, rcvbuf_size
+from lib_wire import DEFAULT_LEASE_S, OP_UNSUBSCRIBE, encode_subscribe
+
+STATS_INTERVAL = 1.0  # detik
 
 
 class UDPReceiver:
     """
     UDP receiver untuk pendulum control status.
-    Automatically saves received data to CSV file.
+    Automatically saves received data to a binary log file.
     """
     
-    def __init__(self, port: int = 4000, log_dir: str = "udp_logs"):
+    def __init__(self, port: int = 4000, log_dir: str = "udp_logs", subscribe=None, multicast_group=None,
+                 rcvbuf: int = RCVBUF_BYTES):
         """
         Initialize UDP receiver.
         
         Args:
             port: UDP port to listen on
-            log_dir: Directory untuk save CSV files
+            log_dir: Directory untuk save file .bin
+            subscribe: (server_ip, control_port, rate_hz, fields) -> subscribe
+                       ke UDPBroadcaster (diperbarui otomatis sebelum lease habis)
+            multicast_group: join grup multicast (mis. "239.10.0.1")
+            rcvbuf: SO_RCVBUF yang diminta (byte)
         """
-        self.port = 4000#port
+        self.port = port
         self.log_dir = log_dir
         
-        # Create log directory
-        os.makedirs(self.log_dir, exist_ok=True)
+        # Create UDP socket (non-blocking, SO_RCVBUF besar)
+        self.sock = open_socket(self.port, rcvbuf=rcvbuf, multicast_group=multicast_group)
+        self.rx = BatchReceiver(self.sock)
         
-        # Create UDP socket
-        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        self.sock.bind(('', self.port))
+        # Subscription (datagram kontrol lib_wire)
+        self.subscribe = subscribe
+        self._last_subscribe = 0.0
+        if subscribe:
+            self._renew_subscription()
         
         # Stats
-        self.packet_count = 0
-        self.error_count = 0
         self.start_time = time.time()
+        self._last_stats = self.start_time
         
-        # CSV file
-        self.csv_file = None
-        self.csv_writer = None
-        self._open_csv_file()
+        # Output file
+        self.sink = RecordSink(self.log_dir)
         
         print("="*60)
         print("UDP RECEIVER - Pendulum Data Logger")
         print("="*60)
         print(f"Listening on: 0.0.0.0:{self.port}")
-        print(f"Log directory: {os.path.abspath(self.log_dir)}")
-        print(f"CSV file: {self.csv_filename}")
+        print(f"SO_RCVBUF: {rcvbuf_size(self.sock) // 1024} KB")
+        if rcvbuf_size(self.sock) < rcvbuf:
+            print(f"  [WARNING] diminta {rcvbuf // 1024} KB; naikkan batas OS "
+                  f"(Linux: sysctl -w net.core.rmem_max={rcvbuf})")
+        print(f"Log file: {os.path.abspath(self.sink.path)}")
         print("="*60)
         print("Press Ctrl+C to stop\n")
     
-    def _open_csv_file(self):
-        """Create and open new CSV file with timestamp."""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.csv_filename = f"udp_log_{timestamp}.csv"
-        csv_path = os.path.join(self.log_dir, self.csv_filename)
-        
-        self.csv_file = open(csv_path, 'w', newline='')
-        self.csv_writer = csv.writer(self.csv_file)
-        
-        # Write header
-        self.csv_writer.writerow([
-            "timestamp",
-            "logtick",
-            "degree",
-            "cmX",
-            "setspeed",
-            "reserved1",
-            "reserved2",
-            "reserved3"
-        ])
-        
-        self.csv_file.flush()
-    
-    def _parse_packet(self, data):
-        """
-        Parse binary packet.
-        
-        Format: <Idddddd (uint32 + 6x double = 52 bytes)
-        
-        Returns:
-            tuple or None if parse error
-        """
-        if len(data) != 52:
-            return None
-        
+    def _renew_subscription(self, op=None):
+        """Kirim (ulang) datagram subscribe ke control port broadcaster."""
+        server_ip, control_port, rate_hz, fields = self.subscribe
+        if op is None:
+            msg = encode_subscribe(port=self.port, rate_hz=rate_hz, fields=fields)
+        else:
+            msg = encode_subscribe(port=self.port, op=op)
         try:
-            # Unpack: uint32 + 6 doubles
-            unpacked = struct.unpack('<Idddddd', data)
-            logtick = unpacked[0]
-            degree = unpacked[1]
-            cmX = unpacked[2]
-            setspeed = unpacked[3]
-            r1, r2, r3 = unpacked[4:7]
-            
-            return (logtick, degree, cmX, setspeed, r1, r2, r3)
-        
-        except struct.error:
-            return None
-    
-    def _log_to_csv(self, data_tuple):
-        """Write data to CSV file."""
-        timestamp = time.time()
-        row = [timestamp] + list(data_tuple)
-        self.csv_writer.writerow(row)
-        
-        # Flush every 50 packets (~1 second @ 50Hz)
-        if self.packet_count % 50 == 0:
-            self.csv_file.flush()
+            self.sock.sendto(msg, (server_ip, control_port))
+        except OSError as e:
+            print(f"\n[WARNING] Subscribe gagal: {e}")
+        self._last_subscribe = time.time()
     
-    def _print_stats(self):
-        """Print statistics."""
+    def _print_stats(self, last=None):
+        """Print statistics (+ sample terakhir)."""
+        st = self.rx.stats()
         elapsed = time.time() - self.start_time
-        rate = self.packet_count / elapsed if elapsed > 0 else 0
+        rate = st["samples"] / elapsed if elapsed > 0 else 0
         
-        print(f"\r[Stats] Packets: {self.packet_count:6d} | "
-              f"Errors: {self.error_count:4d} | "
-              f"Rate: {rate:5.1f} Hz | "
+        print(f"\r[Stats] Packets: {st['packets']:8d} | "
+              f"Samples: {st['samples']:9d} | "
+              f"Lost: {st['lost']:5d} | "
+              f"Errors: {st['errors']:4d} | "
+              f"Rate: {rate:8.1f} Hz | "
               f"Time: {elapsed:6.1f}s", end='', flush=True)
+        if last is not None:
+            print(f"  tick={int(last['logtick']):8d} deg={last['degree']:7.2f} cmX={last['cmX']:6.1f}",
+                  end='', flush=True)
     
     def run(self):
         """Main receive loop."""
+        rx = self.rx
+        sink = self.sink
         try:
             while True:
-                # Receive packet
-                data, addr = self.sock.recvfrom(1024)
-                
-                # Parse packet
-                parsed = self._parse_packet(data)
+                now = time.time()
+                if self.subscribe and now - self._last_subscribe >= DEFAULT_LEASE_S / 3:
+                    self._renew_subscription()
                 
-                if parsed is not None:
-                    logtick, degree, cmX, setspeed, r1, r2, r3 = parsed
-                    
-                    # Log to CSV
-                    self._log_to_csv(parsed)
-                    
-                    self.packet_count += 1
-                    
-                    # Print stats every 10 packets
-                    if self.packet_count % 10 == 0:
-                        self._print_stats()
-                    
-                    # Print detail setiap 100 packets
-                    if self.packet_count % 100 == 0:
-                        print(f"\n[Data] tick={logtick:8d} deg={degree:7.2f} "
-                              f"cmX={cmX:6.1f} speed={setspeed:7.0f}")
+                # Tunggu data, lalu ambil semua datagram yang antre sekaligus
+                last = None
+                if rx.wait(STATS_INTERVAL):
+                    records = rx.drain()
+                    sink.write(records)
+                    if len(records):
+                        last = records[-1]
                 
-                else:
-                    self.error_count += 1
-                    if self.error_count % 10 == 0:
-                        print(f"\n[WARNING] Parse error (count: {self.error_count})")
+                if now - self._last_stats >= STATS_INTERVAL:
+                    self._print_stats(last)
+                    self._last_stats = now
         
         except KeyboardInterrupt:
             print("\n\n" + "="*60)
@@ -165,23 +129,27 @@ class UDPReceiver:
     
     def _print_final_stats(self):
         """Print final statistics."""
+        st = self.rx.stats()
         elapsed = time.time() - self.start_time
-        rate = self.packet_count / elapsed if elapsed > 0 else 0
+        rate = st["samples"] / elapsed if elapsed > 0 else 0
         
         print(f"\nFinal Statistics:")
-        print(f"  Total packets: {self.packet_count}")
-        print(f"  Parse errors:  {self.error_count}")
+        print(f"  Total packets: {st['packets']}")
+        print(f"  Samples:       {st['samples']}")
+        print(f"  Lost packets:  {st['lost']} ({st['loss_ratio']:.2%}), reordered {st['reordered']}")
+        print(f"  Parse errors:  {st['errors']}")
+        print(f"  Batches:       {st['drains']} (max {st['max_batch']} datagram)")
         print(f"  Duration:      {elapsed:.1f} seconds")
         print(f"  Average rate:  {rate:.1f} Hz")
-        print(f"\nData saved to: {os.path.abspath(os.path.join(self.log_dir, self.csv_filename))}")
+        print(f"\nData saved to: {os.path.abspath(self.sink.path)}")
     
     def _cleanup(self):
         """Close files and socket."""
-        if self.csv_file:
-            self.csv_file.flush()
-            self.csv_file.close()
-            print("CSV file closed.")
+        self.sink.close()
+        print("Log file closed.")
         
+        if self.subscribe:
+            self._renew_subscription(OP_UNSUBSCRIBE)
         self.sock.close()
         print("Socket closed.")
         print("\nDone!")
@@ -195,13 +163,15 @@ def main():
     # Configuration
     UDP_PORT = 5000
     LOG_DIR = "udp_logs"
+    SUBSCRIBE = None        # mis. ("192.168.1.10", 5001, 10.0, ("logtick", "degree", "cmX"))
+    MULTICAST_GROUP = None  # mis. "239.10.0.1"
     
     # Create receiver
-    receiver = UDPReceiver(port=UDP_PORT, log_dir=LOG_DIR)
+    receiver = UDPReceiver(port=UDP_PORT, log_dir=LOG_DIR, subscribe=SUBSCRIBE, multicast_group=MULTICAST_GROUP)
     
     # Start receiving
     receiver.run()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()